@@ -11,8 +11,13 @@ import logging
 from datetime import datetime, timezone
 from typing import List, Dict, Any
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.models.guest import normalize_phone
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -145,7 +150,7 @@ class OmotenashiDataMigration:
                     guest_records.append((
                         guest['guest_id'],
                         guest['name'],
-                        guest['phone_number'],
+                        normalize_phone(guest['phone_number']),  # Looked up as "+<digits>"
                         guest.get('email'),  # May not exist in JSON
                         guest['preferred_language'],
                         guest['vip_status'],
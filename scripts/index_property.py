@@ -1,24 +1,56 @@
 # file: index_property_info.py
+import argparse
+import os
+
+import httpx
+
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
-import os
+
+parser = argparse.ArgumentParser(description="Index a property's information into the vector store")
+parser.add_argument("--file", default="data/demo/villa_azul.txt", help="Property information text file")
+parser.add_argument("--property-id", default="p1", help="Join key to bookings.json")
+parser.add_argument("--persist-dir", default="data/vector_store/chroma_db")
+parser.add_argument("--api-url", help="Running API to notify so it drops cached lookups, e.g. http://localhost:8000")
+args = parser.parse_args()
 
 # Load and split property text
-loader = TextLoader("villa_azul.txt")
+loader = TextLoader(args.file)
 docs = loader.load()
 
 # Attach property_id metadata BEFORE splitting so it propagates to all chunks
 for doc in docs:
-    doc.metadata["property_id"] = "p1"  # <-- join key to bookings.json
+    doc.metadata["property_id"] = args.property_id  # <-- join key to bookings.json
 
 splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
 split_docs = splitter.split_documents(docs)
 
+# Each property gets its own collection so retrieval cost tracks one property's
+# corpus (see VectorStoreService.search). Re-indexing replaces the collection.
+collection_name = f"property_{args.property_id}"
+
 # Embed and save to vectorstore using HuggingFace embeddings
 # This is compatible with Claude migration since Claude doesn't provide embeddings
 embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-vectorstore = Chroma.from_documents(split_docs, embedding=embeddings, persist_directory="chroma_db")
-vectorstore.persist()
-print("✅ Property info indexed to vector store with HuggingFace embeddings.")
\ No newline at end of file
+existing = Chroma(collection_name=collection_name, embedding_function=embeddings, persist_directory=args.persist_dir)
+existing.delete_collection()
+vectorstore = Chroma.from_documents(split_docs, embedding=embeddings, collection_name=collection_name,
+                                    persist_directory=args.persist_dir)
+print(f"✅ Property {args.property_id} indexed to collection '{collection_name}' with HuggingFace embeddings.")
+
+# Every API worker compares this marker with the version it last resolved
+# (VectorStoreService.index_version) and drops its stale collection handle and
+# cached results, so a re-index reaches all workers without a restart
+versions_dir = os.path.join(args.persist_dir, "property_versions")
+os.makedirs(versions_dir, exist_ok=True)
+marker = os.path.join(versions_dir, args.property_id)
+with open(f"{marker}.tmp", "w") as f:
+    f.write(str(vectorstore._collection.id))
+os.replace(f"{marker}.tmp", marker)
+
+if args.api_url:
+    response = httpx.post(f"{args.api_url}/admin/properties/{args.property_id}/reindexed")
+    response.raise_for_status()
+    print(f"🔄 API cache invalidated: {response.json()}")
@@ -0,0 +1,163 @@
+"""
+LangChain callback handlers for the Omotenashi Hotel Concierge.
+Collect per-request telemetry from agent runs.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from opentelemetry import context as otel_context
+from opentelemetry.trace import Status, StatusCode
+
+from src.utils.tracing import TOOL_ATTRIBUTE, RequestTracer
+
+
+class TokenUsageTracker(BaseCallbackHandler):
+    """
+    Accumulates LLM token usage across every model call in one agent run.
+
+    Input tokens are split into tokens read from the provider prompt cache,
+    tokens written to it, and uncached tokens.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self._record(usage)
+
+    def _record(self, usage: Dict[str, Any]):
+        details = usage.get("input_token_details") or {}
+        with self._lock:
+            self.llm_calls += 1
+            self.input_tokens += usage.get("input_tokens", 0) or 0
+            self.output_tokens += usage.get("output_tokens", 0) or 0
+            self.cache_read_input_tokens += details.get("cache_read", 0) or 0
+            self.cache_creation_input_tokens += details.get("cache_creation", 0) or 0
+
+    def summary(self) -> Dict[str, int]:
+        """Token usage for the run, in the shape reported in debug_info."""
+        cached = self.cache_read_input_tokens + self.cache_creation_input_tokens
+        return {
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cache_read_input_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "uncached_input_tokens": max(self.input_tokens - cached, 0),
+            "output_tokens": self.output_tokens,
+        }
+
+
+class ToolUsageTracker(BaseCallbackHandler):
+    """
+    Records every tool call in one agent run from the tool start/end callbacks.
+
+    Each call keeps the tool name, its arguments, latency, the size of its
+    result and any error, in the order the calls started.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+        self._started: Dict[UUID, tuple] = {}
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID,
+                      inputs: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        call = {"tool": (serialized or {}).get("name") or kwargs.get("name", "unknown"),
+                "args": inputs if inputs is not None else input_str}
+        with self._lock:
+            self.calls.append(call)
+            self._started[run_id] = (call, time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, result_chars=len(str(getattr(output, "content", output))))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=str(error))
+
+    def _finish(self, run_id: UUID, **fields: Any):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            call, start = started
+            call["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            call.update(fields)
+
+    @property
+    def tools_used(self) -> List[str]:
+        """Names of the tools called, once each, in first-call order."""
+        with self._lock:
+            return list(dict.fromkeys(call["tool"] for call in self.calls))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Tool calls for the run, in the shape reported in debug_info."""
+        with self._lock:
+            return [dict(call) for call in self.calls]
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Opens a span for each LLM round-trip and tool call in one agent run.
+
+    Spans are parented to the span current when the handler is created, so they
+    land in the request's trace even when LangChain runs callbacks in a worker
+    thread.
+    """
+
+    def __init__(self, tracer: RequestTracer):
+        self._tracer = tracer
+        self._parent = otel_context.get_current()
+        self._lock = threading.Lock()
+        self._spans: Dict[UUID, Any] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm", "llm")
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm", "llm")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name", "unknown")
+        self._start(run_id, "tool", f"tool {name}", **{TOOL_ATTRIBUTE: name})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def _start(self, run_id: UUID, stage: str, name: str, **attributes: Any):
+        span = self._tracer.start_span(stage, name, parent=self._parent, **attributes)
+        with self._lock:
+            self._spans[run_id] = span
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None):
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
@@ -0,0 +1,50 @@
+"""
+Agent executor for the Omotenashi Hotel Concierge.
+LangChain's AgentExecutor gathers the tool calls of one model turn on its async
+path but runs them one after another on its sync path, which the "thread"
+execution mode uses. ConcurrentAgentExecutor runs them concurrently there too,
+so a turn asking for several tools takes as long as the slowest one.
+"""
+
+import contextvars
+from concurrent.futures import Executor, Future
+from typing import Iterator, Optional, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+
+
+class ConcurrentAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor whose sync path runs the tool calls of one model turn concurrently.
+
+    The base ``_iter_next_step`` yields every action the model asked for and
+    then performs them in order. Here performing an action submits it to
+    ``tool_executor`` and hands back the future, so every call of the turn has
+    started before any result is awaited; the steps are then yielded in the
+    order the model asked for them. Each call runs in a copy of the caller's
+    context, so the guest bound by guest_context() carries over. Without a
+    ``tool_executor`` the calls run serially as in AgentExecutor.
+    """
+
+    tool_executor: Optional[Executor] = None
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps,
+                        run_manager=None) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending = []
+        for step in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps,
+                                            run_manager):
+            if isinstance(step, Future):
+                pending.append(step)
+            else:
+                yield step
+        for future in pending:
+            yield future.result()
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        perform = super()._perform_agent_action
+        if self.tool_executor is None:
+            return perform(name_to_tool_map, color_mapping, agent_action, run_manager)
+        context = contextvars.copy_context()
+        return self.tool_executor.submit(context.run, perform, name_to_tool_map, color_mapping, agent_action,
+                                         run_manager)
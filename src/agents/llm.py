@@ -0,0 +1,218 @@
+"""
+Shared Claude client for the Omotenashi Hotel Concierge.
+Holds one pooled ChatAnthropic instance per worker so every agent reuses
+the same keep-alive HTTP connections instead of opening new ones per message.
+"""
+
+import logging
+import threading
+from functools import cached_property
+from typing import Optional
+
+import anthropic
+import httpx
+from langchain_anthropic import ChatAnthropic
+
+from src.api.config import (
+    ANTHROPIC_API_KEY, ANTHROPIC_API_URL, CLAUDE_MODEL,
+    LLM_CONNECT_TIMEOUT_SECONDS, LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS, LLM_READ_TIMEOUT_SECONDS,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------------
+# Connection Pool
+# ----------------------------------------------------------------------------
+
+class _ConnectionCounter:
+    """
+    Counts requests and new TCP connections for one client.
+
+    New connections are seen through httpcore's documented ``trace`` request
+    extension, which reports ``connection.connect_tcp.complete`` each time the
+    pool dials, so short-lived connections are counted too.
+    """
+
+    CONNECT_EVENTS = ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete")
+
+    def __init__(self):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        with self._lock:
+            self.requests_sent += 1
+
+    def on_trace(self, event: str):
+        if event in self.CONNECT_EVENTS:
+            with self._lock:
+                self.connections_opened += 1
+
+    def stats(self) -> dict:
+        return {"requests_sent": self.requests_sent, "connections_opened": self.connections_opened}
+
+class CountingTransport(httpx.HTTPTransport):
+    """HTTPTransport that reports requests and new connections to a _ConnectionCounter."""
+
+    def __init__(self, counter: _ConnectionCounter, **kwargs):
+        super().__init__(**kwargs)
+        self.counter = counter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.counter.on_request()
+        previous = request.extensions.get("trace")
+
+        def trace(event: str, info: dict):
+            self.counter.on_trace(event)
+            if previous is not None:
+                previous(event, info)
+
+        request.extensions["trace"] = trace
+        return super().handle_request(request)
+
+class AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport that reports requests and new connections to a _ConnectionCounter."""
+
+    def __init__(self, counter: _ConnectionCounter, **kwargs):
+        super().__init__(**kwargs)
+        self.counter = counter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.counter.on_request()
+        previous = request.extensions.get("trace")
+
+        async def trace(event: str, info: dict):
+            self.counter.on_trace(event)
+            if previous is not None:
+                await previous(event, info)
+
+        request.extensions["trace"] = trace
+        return await super().handle_async_request(request)
+
+class LLMConnectionPool:
+    """Owns the sync and async httpx clients used for all Claude requests."""
+
+    def __init__(self, base_url: str, max_connections: int, max_keepalive_connections: int,
+                 keepalive_expiry: float, connect_timeout: float, read_timeout: float):
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.base_url = base_url
+        self.limits = limits
+        self.timeout = timeout
+        self._sync_counter = _ConnectionCounter()
+        self._async_counter = _ConnectionCounter()
+        self.sync_client = httpx.Client(
+            base_url=base_url, timeout=timeout,
+            transport=CountingTransport(self._sync_counter, limits=limits),
+        )
+        self.async_client = httpx.AsyncClient(
+            base_url=base_url, timeout=timeout,
+            transport=AsyncCountingTransport(self._async_counter, limits=limits),
+        )
+
+    @property
+    def requests_sent(self) -> int:
+        return self._sync_counter.requests_sent + self._async_counter.requests_sent
+
+    @property
+    def connections_opened(self) -> int:
+        return self._sync_counter.connections_opened + self._async_counter.connections_opened
+
+    def stats(self) -> dict:
+        """Snapshot of pool configuration and connection usage."""
+        return {
+            "base_url": self.base_url,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "requests_sent": self.requests_sent,
+            "connections_opened": self.connections_opened,
+            "sync": self._sync_counter.stats(),
+            "async": self._async_counter.stats(),
+        }
+
+    async def aclose(self):
+        self.sync_client.close()
+        await self.async_client.aclose()
+
+class PooledChatAnthropic(ChatAnthropic):
+    """
+    ChatAnthropic that sends requests through a shared LLMConnectionPool.
+
+    The SDK attaches its client timeout to every request, overriding the one
+    on the pooled httpx client, so the clients are given the pool's timeout
+    (connect and read) rather than the single number of default_request_timeout.
+    """
+
+    def _pooled_client_params(self) -> dict:
+        return {**self._client_params, "timeout": _get_pool().timeout}
+
+    @cached_property
+    def _client(self) -> anthropic.Client:
+        return anthropic.Client(**self._pooled_client_params(), http_client=_get_pool().sync_client)
+
+    @cached_property
+    def _async_client(self) -> anthropic.AsyncClient:
+        return anthropic.AsyncClient(**self._pooled_client_params(), http_client=_get_pool().async_client)
+
+# ----------------------------------------------------------------------------
+# Shared Instance
+# ----------------------------------------------------------------------------
+
+_pool: Optional[LLMConnectionPool] = None
+_llm: Optional[PooledChatAnthropic] = None
+_init_lock = threading.Lock()
+
+def _get_pool() -> LLMConnectionPool:
+    if _pool is None:
+        init_shared_llm()
+    return _pool
+
+def init_shared_llm() -> ChatAnthropic:
+    """Create the worker's shared pooled Claude client if it does not exist yet."""
+    global _pool, _llm
+    with _init_lock:
+        if _llm is None:
+            base_url = ANTHROPIC_API_URL or "https://api.anthropic.com"
+            _pool = LLMConnectionPool(
+                base_url=base_url,
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+                connect_timeout=LLM_CONNECT_TIMEOUT_SECONDS,
+                read_timeout=LLM_READ_TIMEOUT_SECONDS,
+            )
+            _llm = PooledChatAnthropic(
+                model=CLAUDE_MODEL,
+                anthropic_api_key=ANTHROPIC_API_KEY,
+                anthropic_api_url=base_url,
+                temperature=0,
+            )
+            logger.info(f"Shared Claude client initialized (max_connections={LLM_MAX_CONNECTIONS})")
+    return _llm
+
+def get_shared_llm() -> ChatAnthropic:
+    """Get the worker's shared Claude client, creating it on first use."""
+    return _llm if _llm is not None else init_shared_llm()
+
+def get_pool_stats() -> dict:
+    """Connection pool statistics for status endpoints."""
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
+async def close_shared_llm():
+    """Close pooled connections on shutdown."""
+    global _pool, _llm
+    with _init_lock:
+        pool, _pool, _llm = _pool, None, None
+    if pool is not None:
+        await pool.aclose()
+        logger.info("Shared Claude client closed")
@@ -0,0 +1,141 @@
+"""
+Conversation memory for the Omotenashi Hotel Concierge.
+Keeps recent turns verbatim and folds older turns into a compact summary so
+prompt size and resident memory per session stay bounded.
+"""
+
+from typing import Any, Dict, List
+
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+SUMMARY_PREFIX = "Summary of our earlier conversation:"
+SUMMARY_LINE_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+
+
+def history_size(messages: List[BaseMessage], summary: str = "") -> Dict[str, int]:
+    """Message count, estimated prompt tokens and UTF-8 bytes of a conversation history."""
+    texts = [_text(m) for m in messages]
+    if summary:
+        texts.append(summary)
+    return {
+        "messages": len(messages),
+        "estimated_tokens": sum(estimate_tokens(t) for t in texts),
+        "bytes": sum(len(t.encode("utf-8")) for t in texts),
+    }
+
+
+class WindowedSummaryMemory(ConversationBufferMemory):
+    """
+    Conversation buffer that keeps the last ``window_turns`` exchanges verbatim.
+
+    Older exchanges are folded into an extractive summary (one clipped line per
+    turn, no LLM call) that is prepended to the history as a guest message. The
+    oldest turns are also folded whenever the history exceeds ``max_tokens``
+    estimated tokens or ``max_bytes``; the summary itself keeps only its most
+    recent ``summary_max_chars`` characters.
+    """
+
+    window_turns: int = 6
+    max_tokens: int = 2000
+    max_bytes: int = 32768
+    summary_max_chars: int = 1500
+    summary: str = ""
+    summarized_turns: int = 0
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        super().save_context(inputs, outputs)
+        self.compact()
+
+    async def asave_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        await super().asave_context(inputs, outputs)
+        self.compact()
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages = list(self.chat_memory.messages)
+        if self.summary:
+            messages.insert(0, HumanMessage(content=f"{SUMMARY_PREFIX}\n{self.summary}"))
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: self.buffer_as_str}
+
+    async def aload_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.load_memory_variables(inputs)
+
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ""
+        self.summarized_turns = 0
+
+    def compact(self):
+        """Fold the oldest turns into the summary until the window and size caps hold."""
+        messages = self.chat_memory.messages
+        while len(messages) > 2 and (
+            len(messages) > self.window_turns * 2 or self._over_caps(messages)
+        ):
+            self._fold(messages[:2])
+            del messages[:2]
+
+    def size(self) -> Dict[str, int]:
+        """History size for status endpoints."""
+        return {
+            **history_size(self.chat_memory.messages, self.summary),
+            "summarized_turns": self.summarized_turns,
+        }
+
+    def _over_caps(self, messages: List[BaseMessage]) -> bool:
+        size = history_size(messages, self.summary)
+        return size["estimated_tokens"] > self.max_tokens or size["bytes"] > self.max_bytes
+
+    def _fold(self, turn: List[BaseMessage]):
+        parts = []
+        for message in turn:
+            role = "Guest" if message.type == "human" else "Concierge"
+            text = " ".join(_text(message).split())
+            if len(text) > SUMMARY_LINE_CHARS:
+                text = text[:SUMMARY_LINE_CHARS - 3] + "..."
+            parts.append(f"{role}: {text}")
+        lines = self.summary.splitlines() + [" / ".join(parts)]
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > self.summary_max_chars:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+        self.summarized_turns += 1
+
+
+# ----------------------------------------------------------------------------
+# Serialization
+# ----------------------------------------------------------------------------
+
+_MESSAGE_CODES = {"human": "h", "ai": "a", "system": "s"}
+_MESSAGE_TYPES = {"h": HumanMessage, "a": AIMessage, "s": SystemMessage}
+
+
+def dump_state(memory: ConversationBufferMemory) -> Dict[str, Any]:
+    """Compact, JSON-serializable state of a conversation memory."""
+    state: Dict[str, Any] = {
+        "m": [[_MESSAGE_CODES.get(m.type, "h"), m.content] for m in memory.chat_memory.messages],
+    }
+    if getattr(memory, "summary", ""):
+        state["s"] = memory.summary
+        state["n"] = memory.summarized_turns
+    return state
+
+
+def restore_state(memory: ConversationBufferMemory, state: Dict[str, Any]):
+    """Replace a memory's history with a state produced by dump_state."""
+    memory.chat_memory.messages = [_MESSAGE_TYPES[code](content=content) for code, content in state.get("m", [])]
+    if isinstance(memory, WindowedSummaryMemory):
+        memory.summary = state.get("s", "")
+        memory.summarized_turns = state.get("n", 0)
@@ -2,21 +2,12 @@
 System prompts and prompt templates for the Omotenashi hotel concierge assistant.
 """
 
-from typing import Optional
+from typing import NamedTuple, Optional, Sequence
 
 
-def get_base_system_prompt(guest_context: str, property_name: str = "Villa Azul") -> str:
-    """
-    Generate the base system prompt for the hotel concierge assistant.
-    
-    Args:
-        guest_context: Formatted string containing guest information
-        property_name: Name of the property the guest is staying at
-        
-    Returns:
-        Complete system prompt string
-    """
-    return f"""You are a professional hotel concierge assistant at {property_name}. {guest_context}
+# Invariant concierge instructions. Kept byte-identical across guests so the
+# rendered prompt shares one static prefix; guest details follow it.
+_INSTRUCTIONS_HEAD = """You are a professional hotel concierge assistant. The property and the guest you are serving are described in the CURRENT CONTEXT section at the end of these instructions.
 
 CRITICAL TOOL SELECTION RULES:
 - Use ONLY the minimum necessary tools to answer the guest's question
@@ -24,28 +15,10 @@ CRITICAL TOOL SELECTION RULES:
 - Think carefully about which single tool best addresses the specific request
 - Only call additional tools if the first tool doesn't provide sufficient information
 
-AVAILABLE TOOLS:
-
-CORE SERVICES:
-- guest_profile: Get guest preferences and information (no parameters needed)
-- booking_details: Get reservation details (no parameters needed)  
-- property_info: Search for hotel amenities, services, and facilities information
-- schedule_cleaning: Schedule room cleaning service
-- modify_checkout_time: Change guest's checkout time
-- request_transport: Arrange airport transportation
-- escalate_to_manager: Escalate questions to property manager when you cannot find answers
-
-HIGH-IMPACT SERVICES:
-- restaurant_reservation: Make restaurant reservations and dining bookings
-- grocery_delivery: Arrange grocery and supply delivery to property
-- maintenance_request: Report property issues (AC, WiFi, appliances, etc.)
-- activity_booking: Book local tours, excursions, and experiences
-- meal_delivery: Order food delivery from local restaurants
-
-LUXURY SERVICES:
-- spa_services: Book in-villa spa treatments and wellness services
-- private_chef: Arrange private chef for in-villa dining experiences
-- local_recommendations: Get personalized local activity recommendations
+TOOLS:
+- Each tool's definition says what it does and exactly when to use it"""
+
+_INSTRUCTIONS_TAIL = """
 
 PRECISE TOOL USAGE EXAMPLES:
 
@@ -67,29 +40,6 @@ TOOL SELECTION DECISION PROCESS:
 4. Only use additional tools if the guest asks multiple distinct questions
 5. NEVER use tools "just in case" or for context
 
-SPECIFIC TOOL TRIGGERS:
-
-CORE TOOLS:
-- request_transport: ONLY when guest mentions airports, rides, cars, taxis, transportation TO somewhere
-- guest_profile: ONLY when asking about guest's name, preferences, status, dietary restrictions
-- booking_details: ONLY when asking about reservation, room, check-in/out dates, confirmation
-- property_info: ONLY when asking about hotel facilities, amenities, services, wifi, pool, etc.
-- schedule_cleaning: ONLY when requesting housekeeping with specific time
-- modify_checkout_time: ONLY when changing departure time
-- escalate_to_manager: ONLY when request is outside your capabilities
-
-HIGH-IMPACT TOOLS:
-- restaurant_reservation: ONLY when booking dinner, restaurants, dining reservations
-- grocery_delivery: ONLY when requesting groceries, food supplies, beverages for delivery
-- maintenance_request: ONLY when reporting broken AC, WiFi issues, plumbing, appliance problems
-- activity_booking: ONLY when booking tours, excursions, local experiences, activities
-- meal_delivery: ONLY when ordering food delivery, takeout, restaurant delivery
-
-LUXURY TOOLS:
-- spa_services: ONLY when requesting massage, spa treatments, wellness services to villa
-- private_chef: ONLY when requesting personal chef, private dining, special meal preparation
-- local_recommendations: ONLY when asking for area suggestions, local tips, activity recommendations
-
 IMPORTANT RULES:
 - The tools are pre-configured for this specific guest
 - NEVER ask for guest ID, property ID, phone number, or room number
@@ -126,7 +76,95 @@ Guest: "Can you arrange a helicopter tour?"
 WRONG: "I'm unable to arrange helicopter tours."
 CORRECT: First call escalation_to_manager with question="Can you arrange a helicopter tour?", then respond with tool result.
 
-Remember: You have access to all guest information through tools - use them to provide personalized service."""
+Remember: You have access to all guest information through tools - use them to provide personalized service.
+
+CRITICAL: Use EXACTLY ONE tool per request unless the guest asks multiple distinct questions. STOP after using one tool."""
+
+STATIC_SYSTEM_PROMPT = _INSTRUCTIONS_HEAD + _INSTRUCTIONS_TAIL
+
+
+def get_static_prompt(core_tools: Optional[Sequence[str]] = None) -> str:
+    """
+    The invariant instructions, noting the always-offered tools when tools are
+    selected per turn.
+    
+    Args:
+        core_tools: Tools offered on every turn, or None when every tool is
+            offered on every turn
+        
+    Returns:
+        Static prompt string, identical for every guest
+    """
+    if core_tools is None:
+        return STATIC_SYSTEM_PROMPT
+    note = "\n- Only the tools relevant to the guest's message are offered"
+    if core_tools:
+        names = ", ".join(core_tools[:-1]) + " and " + core_tools[-1] if len(core_tools) > 1 else core_tools[0]
+        note += f"; {names} {'are' if len(core_tools) > 1 else 'is'} always available"
+    return _INSTRUCTIONS_HEAD + note + _INSTRUCTIONS_TAIL
+
+
+class SystemPromptParts(NamedTuple):
+    """System prompt split into the invariant prefix and the per-guest block."""
+    static: str
+    dynamic: str
+
+    @property
+    def text(self) -> str:
+        return f"{self.static}\n\n{self.dynamic}"
+
+
+def get_dynamic_prompt(guest_context: str, property_name: str = "Villa Azul",
+                       custom_prompt: Optional[str] = None) -> str:
+    """
+    Generate the per-guest block that follows the static instructions.
+    
+    Args:
+        guest_context: Formatted string containing guest information
+        property_name: Name of the property the guest is staying at
+        custom_prompt: Optional additional instructions
+        
+    Returns:
+        Guest-specific prompt block
+    """
+    dynamic = f"CURRENT CONTEXT:\nYou are the concierge at {property_name}. {guest_context}"
+    return combine_prompts(dynamic, custom_prompt)
+
+
+def get_base_system_prompt(guest_context: str, property_name: str = "Villa Azul") -> str:
+    """
+    Generate the base system prompt for the hotel concierge assistant.
+    
+    Args:
+        guest_context: Formatted string containing guest information
+        property_name: Name of the property the guest is staying at
+        
+    Returns:
+        Complete system prompt string
+    """
+    return SystemPromptParts(STATIC_SYSTEM_PROMPT, get_dynamic_prompt(guest_context, property_name)).text
+
+
+def build_system_prompt(guest: Optional[dict], booking: Optional[dict] = None,
+                        custom_prompt: Optional[str] = None,
+                        core_tools: Optional[Sequence[str]] = None) -> SystemPromptParts:
+    """
+    Render the full system prompt for a guest as static and dynamic parts.
+    
+    Args:
+        guest: Guest profile dictionary
+        booking: Optional booking details dictionary
+        custom_prompt: Optional additional instructions
+        core_tools: Tools offered on every turn when tools are selected per
+            turn; None when every tool is offered
+        
+    Returns:
+        SystemPromptParts with the shared prefix and the guest block
+    """
+    guest_context = format_guest_context(guest, booking)
+    property_name = get_property_name_from_booking(booking)
+    return SystemPromptParts(get_static_prompt(core_tools),
+                             get_dynamic_prompt(guest_context, property_name, custom_prompt))
 
 
 def format_guest_context(guest: Optional[dict], booking: Optional[dict] = None) -> str:
@@ -205,83 +243,97 @@ TOOL_DESCRIPTIONS = {
     "schedule_cleaning": (
         "Schedule a room cleaning for the current guest. REQUIRES complete date and time information. "
         "Only use this tool when you have BOTH specific date AND time from the guest. "
+        "Use ONLY when the guest requests housekeeping with a specific time. "
         "Arguments: cleaning_time (string - complete date and time, "
         "e.g., 'Tuesday June 18th at 11:00 AM', 'Tomorrow at 2:00 PM', etc.)"
     ),
     "modify_checkout_time": (
         "Modify the current guest's checkout time. Only requires the new checkout time. "
+        "Use ONLY when the guest wants to change their departure time. "
         "Arguments: new_checkout_time (string - the new checkout time, "
         "e.g., '12:00 PM', 'late checkout 3:00 PM', etc.)"
     ),
     "request_transport": (
         "Request transport to the airport for the current guest. "
+        "Use ONLY when the guest mentions airports, rides, cars, taxis or transportation to somewhere. "
         "Arguments: pickup_time (string - when to pick up the guest), "
         "airport_code (string - destination airport code like 'SFO', 'LAX', etc.)"
     ),
     "guest_profile": (
         "Get the profile and preferences of the current guest. "
-        "Use this to get guest information. No arguments needed."
+        "Use ONLY when the guest asks about their name, preferences, status or dietary restrictions. "
+        "No arguments needed."
     ),
     "booking_details": (
         "Get the booking details for the current guest. "
-        "Use this to get reservation information. No arguments needed."
+        "Use ONLY when the guest asks about their reservation, room, check-in/out dates or confirmation. "
+        "No arguments needed."
     ),
     "property_info": (
         "Retrieve information about the current guest's property. "
-        "Use this to answer questions about the hotel/property. "
+        "Use ONLY when the guest asks about hotel facilities, amenities, services, wifi, pool, etc. "
         "Arguments: query (string - optional, what information you want to know about the property)"
     ),
     "escalate_to_manager": (
         "Escalate questions to the property manager when you cannot find answers in the database. "
-        "Use this when you've tried other tools but still can't help the guest. "
+        "Use this when you've tried other tools but still can't help the guest, "
+        "or when the request is outside your capabilities. "
         "Arguments: question (string - the guest's question or request that needs escalation), "
         "context (string - optional, additional context about the situation)"
     ),
     
     # HIGH-IMPACT TIER TOOL DESCRIPTIONS
     "restaurant_reservation": (
-        "Make restaurant reservations for guests. Use when guests want to book dining experiences. "
+        "Make restaurant reservations for guests. "
+        "Use ONLY when the guest is booking dinner, restaurants or dining reservations. "
         "Arguments: restaurant_preference (string - cuisine type or specific restaurant), "
         "date_time (string - when they want to dine), party_size (int - number of people), "
         "special_occasion (string - optional, special event or celebration)"
     ),
     "grocery_delivery": (
-        "Arrange grocery delivery to the property. Use when guests need food, beverages, or supplies. "
+        "Arrange grocery delivery to the property. "
+        "Use ONLY when the guest requests groceries, food supplies or beverages for delivery. "
         "Arguments: items_requested (string - list of items needed), "
         "delivery_time (string - when items should be delivered), "
         "special_instructions (string - optional, dietary restrictions or special requests)"
     ),
     "maintenance_request": (
-        "Report and track maintenance issues at the property. Use for broken appliances, AC, plumbing, WiFi issues. "
+        "Report and track maintenance issues at the property. "
+        "Use ONLY when the guest reports broken AC, WiFi issues, plumbing or appliance problems. "
         "Arguments: issue_description (string - what's broken or not working), "
         "location (string - where in the property), urgency (string - low/normal/high/emergency)"
     ),
     "activity_booking": (
-        "Book local activities and experiences for guests. Use for tours, excursions, entertainment. "
+        "Book local activities and experiences for guests. "
+        "Use ONLY when the guest is booking tours, excursions, local experiences or activities. "
         "Arguments: activity_type (string - type of activity requested), "
         "preferred_date (string - when they want to do it), participants (int - number of people), "
         "special_requirements (string - optional, special needs or preferences)"
     ),
     "meal_delivery": (
-        "Order meal delivery from local restaurants. Use for immediate food delivery needs. "
+        "Order meal delivery from local restaurants. "
+        "Use ONLY when the guest orders food delivery, takeout or restaurant delivery. "
         "Arguments: cuisine_type (string - type of food), meal_items (string - specific dishes), "
         "delivery_time (string - when food should arrive)"
     ),
     
     # LUXURY TIER TOOL DESCRIPTIONS
     "spa_services": (
-        "Book in-villa spa and wellness services. Use for massage, beauty treatments, wellness experiences. "
+        "Book in-villa spa and wellness services. "
+        "Use ONLY when the guest requests massage, spa treatments or wellness services to the villa. "
         "Arguments: service_type (string - massage, facial, etc.), preferred_time (string - appointment time), "
         "participants (int - number of people), special_requests (string - optional, special arrangements)"
     ),
     "private_chef": (
-        "Arrange private chef services for in-villa dining experiences. Use for special meals and celebrations. "
+        "Arrange private chef services for in-villa dining experiences. "
+        "Use ONLY when the guest requests a personal chef, private dining or special meal preparation. "
         "Arguments: meal_type (string - breakfast/lunch/dinner), date_time (string - when), "
         "guests (int - number of people), cuisine_preference (string - cuisine type), "
         "special_occasion (string - optional, celebration or theme)"
     ),
     "local_recommendations": (
         "Provide personalized local recommendations based on guest profile and preferences. "
+        "Use ONLY when the guest asks for area suggestions, local tips or activity recommendations. "
         "Arguments: activity_category (string - dining/activities/shopping/etc.), "
         "preferences (string - optional, guest interests), timeframe (string - when they want recommendations)"
     ),
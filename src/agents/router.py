@@ -0,0 +1,207 @@
+"""
+Intent pre-router for the Omotenashi Hotel Concierge.
+Answers simple profile and booking lookups ("what's my name", "when do I check
+out") straight from the guest data, skipping the agent's LLM round-trips.
+Messages are classified by nearest neighbour over labelled examples in
+character n-gram TF-IDF space, which works across scripts without a tokenizer
+or a model download.
+
+Intents are named after the tool the agent would call. Each reply states every
+field that tool returns (name, VIP status and language; property and both
+stay dates), because n-grams cannot reliably tell "check in" from "check out".
+"""
+
+import json
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+OTHER = "other"
+LOOKUP_INTENTS = ("guest_profile", "booking_details")
+
+
+class RouteDecision(NamedTuple):
+    """Classification of one message; ``tool`` is None when it should go to the agent."""
+    intent: str
+    tool: Optional[str]
+    score: float
+    margin: float
+
+
+def normalize(text: str) -> str:
+    """Casefold, drop punctuation and symbols, and map digits to 0 so times and dates match each other."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    chars = []
+    for ch in text:
+        category = unicodedata.category(ch)
+        if category[0] in "PSZ":
+            chars.append(" ")
+        elif category == "Nd":
+            chars.append("0")
+        else:
+            chars.append(ch)
+    return " " + re.sub(r"\s+", " ", "".join(chars)).strip() + " "
+
+
+class NgramIndex:
+    """
+    Labelled phrases embedded as character n-gram TF-IDF vectors.
+
+    ``best_by_label`` scores a text against every phrase by cosine similarity
+    and keeps the best score per label.
+    """
+
+    NGRAM_SIZES = (1, 2, 3, 4)
+
+    def __init__(self, texts: List[str], labels: List[str]):
+        self.texts = texts
+        self.labels = sorted(set(labels))
+        self._label_index = np.array([self.labels.index(label) for label in labels])
+
+        grams = [self._ngrams(text) for text in texts]
+        document_frequency = Counter(gram for counts in grams for gram in counts)
+        self._idf = {gram: math.log((1 + len(texts)) / (1 + df)) + 1 for gram, df in document_frequency.items()}
+        self._unknown_idf = math.log(1 + len(texts)) + 1
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for i, counts in enumerate(grams):
+            for gram, weight in self._weights(counts).items():
+                postings[gram].append((i, weight))
+        # Per n-gram (phrase indices, weights) arrays, so scoring a text is one bincount
+        self._postings = {gram: (np.array([i for i, _ in pairs]), np.array([w for _, w in pairs]))
+                          for gram, pairs in postings.items()}
+
+    def _ngrams(self, text: str) -> Counter:
+        text = normalize(text)
+        return Counter(text[i:i + n] for n in self.NGRAM_SIZES for i in range(len(text) - n + 1)
+                       if text[i:i + n].strip())
+
+    def _weights(self, counts: Counter) -> Dict[str, float]:
+        weights = {gram: (1 + math.log(count)) * self._idf.get(gram, self._unknown_idf)
+                   for gram, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {gram: w / norm for gram, w in weights.items()}
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Cosine similarity of a text to every phrase."""
+        weights, postings = [], []
+        for gram, weight in self._weights(self._ngrams(text)).items():
+            posting = self._postings.get(gram)
+            if posting is not None:
+                weights.append(weight)
+                postings.append(posting)
+        if not postings:
+            return np.zeros(len(self.texts))
+        indices, phrase_weights = zip(*postings)
+        products = np.repeat(weights, [len(i) for i in indices]) * np.concatenate(phrase_weights)
+        return np.bincount(np.concatenate(indices), products, minlength=len(self.texts))
+
+    def best_by_label(self, text: str) -> np.ndarray:
+        """Best phrase similarity per label, in ``labels`` order."""
+        best = np.full(len(self.labels), -1.0)
+        np.maximum.at(best, self._label_index, self.similarities(text))
+        return best
+
+
+class IntentRouter:
+    """
+    Nearest-neighbour intent classifier with templated replies.
+
+    A message is routed to a lookup intent only when its best matching example
+    scores at least ``min_similarity`` (cosine) and beats the best example of
+    any other intent, including "other", by ``min_margin``. Messages with
+    several clauses (split at sentence ends and at ``conjunctions``) are routed
+    only if every clause is. Everything else goes to the agent.
+    """
+
+    MAX_MESSAGE_CHARS = 120
+
+    def __init__(self, examples: Dict[str, Dict[str, List[str]]], replies: Dict[str, Dict[str, str]],
+                 conjunctions: Iterable[str] = (), min_similarity: float = 0.5, min_margin: float = 0.15):
+        self.replies = replies
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        words = "|".join(re.escape(word) for word in sorted(conjunctions, key=len, reverse=True))
+        self._clause_split = re.compile(r"[.!?;\n。！？；]+" + (rf"|(?<!\S)(?:{words})(?!\S)" if words else ""),
+                                        re.IGNORECASE)
+
+        texts, labels = [], []
+        for by_intent in examples.values():
+            for intent, phrases in by_intent.items():
+                texts.extend(phrases)
+                labels.extend([intent] * len(phrases))
+        self.index = NgramIndex(texts, labels)
+        self.labels = self.index.labels
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "IntentRouter":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["examples"], data["replies"], data.get("conjunctions", ()), **kwargs)
+
+    def classify(self, message: str) -> RouteDecision:
+        """Best intent for a message and whether it is confident enough to answer directly."""
+        if len(message) > self.MAX_MESSAGE_CHARS:
+            return RouteDecision(OTHER, None, 0.0, 0.0)
+        clauses = [clause for clause in self._clause_split.split(message) if normalize(clause).strip()] or [message]
+        decisions = [self._classify_clause(clause) for clause in clauses]
+        routed = {decision.tool for decision in decisions}
+        if len(decisions) > 1 and (None in routed or len(routed) > 1):
+            return decisions[0]._replace(tool=None)
+        return min(decisions, key=lambda decision: decision.score)
+
+    def _classify_clause(self, message: str) -> RouteDecision:
+        best = self.index.best_by_label(message)
+        first, second = np.argsort(best)[::-1][:2]
+        intent, score, margin = self.labels[first], float(best[first]), float(best[first] - best[second])
+        routed = intent in LOOKUP_INTENTS and score >= self.min_similarity and margin >= self.min_margin
+        return RouteDecision(intent, intent if routed else None, round(score, 3), round(margin, 3))
+
+    def answer(self, intent: str, guest: Optional[dict], booking: Optional[dict]) -> Optional[str]:
+        """
+        Reply for a lookup intent in the guest's preferred language.
+
+        Returns None when there is no template for the language or the guest
+        data lacks a field the reply needs, so the agent answers instead.
+        """
+        if not guest:
+            return None
+        templates = self.replies.get(guest.get("preferred_language") or "English")
+        if not templates:
+            return None
+        template = "guest_profile_vip" if intent == "guest_profile" and guest.get("vip_status") else intent
+        fields = {"name": guest.get("name")}
+        if booking:
+            fields.update(property_name=booking.get("property_name"),
+                          check_in=self._format_time(booking.get("check_in")),
+                          check_out=self._format_time(booking.get("check_out")))
+        try:
+            reply = templates[template].format_map(RequiredFields(fields))
+        except KeyError:
+            return None
+        if intent == "booking_details" and booking.get("special_requests") and "special_requests" in templates:
+            reply += " " + templates["special_requests"].format(special_requests=booking["special_requests"])
+        return reply
+
+    @staticmethod
+    def _format_time(value) -> Optional[str]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(str(value)).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            return str(value)
+
+
+class RequiredFields(dict):
+    """Template fields where an empty value counts as missing."""
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value in (None, ""):
+            raise KeyError(key)
+        return value
@@ -0,0 +1,212 @@
+"""
+Session storage backends for the Omotenashi Hotel Concierge.
+Persist conversation state (see src.agents.memory.dump_state) by phone number
+so every worker and replica serving a guest sees the same history.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.utils.cache import ExpiryScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBusyError(TimeoutError):
+    """Raised when another worker holds a guest's session for longer than the lock wait."""
+
+
+class SessionBackend(ABC):
+    """
+    Stores serialized conversation state by phone number with an idle TTL.
+
+    Stored states carry a revision token ("r") so callers can skip restoring
+    a state they wrote themselves.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def load(self, phone: str) -> Optional[Dict[str, Any]]:
+        """Return the stored state and refresh its TTL, or None if absent or expired."""
+
+    @abstractmethod
+    async def save(self, phone: str, state: Dict[str, Any]):
+        """Store a state, replacing the previous one and restarting its TTL."""
+
+    @abstractmethod
+    async def delete(self, phone: str):
+        """Remove a stored state."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Number of stored, unexpired sessions."""
+
+    @asynccontextmanager
+    async def lock(self, phone: str) -> AsyncIterator[None]:
+        """Hold a guest's session against other processes for one turn; a no-op for per-process stores."""
+        yield
+
+    def sweep(self) -> int:
+        """Drop expired states that the store does not expire natively."""
+        return 0
+
+    async def close(self):
+        pass
+
+
+class InProcessSessionBackend(SessionBackend):
+    """
+    Per-process session store; conversations are not shared between workers.
+
+    States are kept as-is (their message strings are shared with the live
+    memory objects) and expire lazily on load or in sweep().
+    """
+
+    name = "memory"
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._expiry = ExpiryScheduler()
+
+    async def load(self, phone: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        deadline = self._expiry.deadline(phone)
+        if deadline is not None and deadline < now:
+            self._drop(phone)
+            return None
+        state = self._states.get(phone)
+        if state is not None:
+            self._expiry.touch(phone, now + self.ttl_seconds)
+        return state
+
+    async def save(self, phone: str, state: Dict[str, Any]):
+        self._states[phone] = state
+        self._expiry.touch(phone, time.monotonic() + self.ttl_seconds)
+
+    async def delete(self, phone: str):
+        self._drop(phone)
+
+    async def count(self) -> int:
+        return len(self._states)
+
+    def sweep(self) -> int:
+        expired = self._expiry.pop_expired(time.monotonic())
+        for phone in expired:
+            self._states.pop(phone, None)
+        return len(expired)
+
+    def _drop(self, phone: str):
+        self._states.pop(phone, None)
+        self._expiry.discard(phone)
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Redis session store shared by all workers and replicas.
+
+    Each session is one compact JSON string under ``<prefix><phone>`` with a
+    native key TTL, refreshed on every load, so nothing is ever scanned. A
+    sorted set of last-activity times backs the session count. Related commands
+    are sent in a single pipelined round trip.
+
+    ``lock`` serializes a guest's turns across workers with a ``SET NX PX`` key
+    that expires after ``lock_ttl_seconds`` if its holder dies, so two workers
+    never run the same guest's turn at once and overwrite each other's save.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: Optional[str], ttl_seconds: int, prefix: str = "omotenashi:session:",
+                 client: Any = None, lock_ttl_seconds: float = 60, lock_wait_seconds: float = 35):
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+        self.index_key = f"{prefix}index"
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.lock_wait_seconds = lock_wait_seconds
+        if client is None:
+            # Imported lazily so the in-process backend works without redis installed
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+
+    def _key(self, phone: str) -> str:
+        return f"{self.prefix}{phone}"
+
+    async def load(self, phone: str) -> Optional[Dict[str, Any]]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(phone))
+            pipe.expire(self._key(phone), self.ttl_seconds)
+            pipe.zadd(self.index_key, {phone: time.time()}, xx=True)
+            raw, _, _ = await pipe.execute()
+        return json.loads(raw) if raw else None
+
+    async def save(self, phone: str, state: Dict[str, Any]):
+        payload = json.dumps(state, separators=(",", ":"), ensure_ascii=False)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(phone), payload, ex=self.ttl_seconds)
+            pipe.zadd(self.index_key, {phone: time.time()})
+            await pipe.execute()
+
+    async def delete(self, phone: str):
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.delete(self._key(phone))
+            pipe.zrem(self.index_key, phone)
+            await pipe.execute()
+
+    async def count(self) -> int:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(self.index_key, "-inf", time.time() - self.ttl_seconds)
+            pipe.zcard(self.index_key)
+            _, count = await pipe.execute()
+        return count
+
+    @asynccontextmanager
+    async def lock(self, phone: str) -> AsyncIterator[None]:
+        key = f"{self.prefix}lock:{phone}"
+        token = os.urandom(8).hex().encode()
+        deadline = time.monotonic() + self.lock_wait_seconds
+        delay = 0.01
+        while not await self.client.set(key, token, nx=True, px=int(self.lock_ttl_seconds * 1000)):
+            if time.monotonic() >= deadline:
+                raise SessionBusyError(f"Session {phone} is busy in another worker")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        try:
+            yield
+        finally:
+            await self._release(key, token)
+
+    async def _release(self, key: str, token: bytes):
+        """Delete a lock only while this holder still owns it; it may have expired and been taken since."""
+        from redis.exceptions import WatchError
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) == token:
+                    pipe.multi()
+                    pipe.delete(key)
+                    await pipe.execute()
+            except WatchError:
+                pass
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_session_backend(kind: str, ttl_seconds: float, redis_url: Optional[str] = None,
+                           prefix: str = "omotenashi:session:", lock_ttl_seconds: float = 60,
+                           lock_wait_seconds: float = 35) -> SessionBackend:
+    """Build the configured session backend ("memory" or "redis")."""
+    if kind == "redis":
+        logger.info(f"Using Redis session backend at {redis_url}")
+        return RedisSessionBackend(redis_url, ttl_seconds, prefix, lock_ttl_seconds=lock_ttl_seconds,
+                                   lock_wait_seconds=lock_wait_seconds)
+    return InProcessSessionBackend(ttl_seconds)
@@ -0,0 +1,79 @@
+"""
+Per-turn tool selection for the Omotenashi Hotel Concierge.
+Offers the agent only the tools relevant to the guest's message instead of
+every tool schema on every LLM request. Tools are ranked by similarity between
+the message and each tool's description sentences plus short phrases in the
+guest languages, embedded in the same character n-gram TF-IDF space as the
+intent router, so ranking works across scripts without a model download.
+A core set of tools is always offered.
+"""
+
+import json
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from src.agents.router import NgramIndex
+
+# Lookups and the escalation fallback, offered on every turn
+DEFAULT_CORE_TOOLS = ("guest_profile", "booking_details", "property_info", "escalate_to_manager")
+
+
+def description_sentences(description: str) -> List[str]:
+    """Sentences of a tool description that say what it is for, without the argument list."""
+    sentences = re.split(r"(?<=\.)\s+", description)
+    return [s for s in sentences if s and not s.startswith(("Arguments:", "No arguments"))]
+
+
+class ToolSelector:
+    """
+    Ranks tools against a message and picks the subset to offer the agent.
+
+    ``select`` returns the core tools plus, for each text given, the ``top_k``
+    other tools scoring at least ``min_similarity``. The core tools come first
+    and each group is in catalogue order, so every subset starts with the same
+    core definitions (a prompt-cache prefix shared by all turns) and a
+    recurring subset renders byte-identical tool definitions.
+    """
+
+    def __init__(self, tool_names: Sequence[str], descriptions: Dict[str, str],
+                 examples: Dict[str, Dict[str, List[str]]], core: Iterable[str] = DEFAULT_CORE_TOOLS,
+                 top_k: int = 3, min_similarity: float = 0.1):
+        self.tool_names = tuple(tool_names)
+        self.core = frozenset(core) & set(self.tool_names)
+        self.core_tools = tuple(name for name in self.tool_names if name in self.core)
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+
+        texts, labels = [], []
+        for name in self.tool_names:
+            if name in self.core:
+                continue
+            phrases = description_sentences(descriptions.get(name, ""))
+            for by_tool in examples.values():
+                phrases += by_tool.get(name, [])
+            texts.extend(phrases)
+            labels.extend([name] * len(phrases))
+        self.index = NgramIndex(texts, labels)
+
+    @classmethod
+    def from_file(cls, path: str, tool_names: Sequence[str], descriptions: Dict[str, str],
+                  **kwargs) -> "ToolSelector":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(tool_names, descriptions, data["examples"], **kwargs)
+
+    def rank(self, text: str) -> List[Tuple[str, float]]:
+        """Non-core tools by descending similarity to a text."""
+        best = self.index.best_by_label(text)
+        return [(self.index.labels[i], round(float(best[i]), 3)) for i in np.argsort(best)[::-1]]
+
+    def select(self, *texts: str) -> Tuple[str, ...]:
+        """Core tools, then the best matching tools for each non-empty text, each in catalogue order."""
+        chosen = set()
+        for text in texts:
+            if text and text.strip():
+                chosen.update(name for name, score in self.rank(text)[:self.top_k]
+                              if score >= self.min_similarity)
+        return self.core_tools + tuple(name for name in self.tool_names if name in chosen)
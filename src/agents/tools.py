@@ -3,10 +3,17 @@ Agent Tools for Omotenashi Hotel Concierge
 Contains all tool definitions for the AI concierge agent.
 """
 
+import asyncio
 import json
 import logging
-from typing import List
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
 from langchain.tools import StructuredTool
+from langchain_anthropic.chat_models import convert_to_anthropic_tool
 from pydantic import BaseModel, Field
 
 from src.agents.prompts import TOOL_DESCRIPTIONS
@@ -14,6 +21,75 @@ from src.agents.prompts import TOOL_DESCRIPTIONS
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# ----------------------------------------------------------------------------
+# Request Context
+# ----------------------------------------------------------------------------
+
+# Phone number of the guest whose turn is being processed. Tools are shared
+# across guests, so they resolve the caller from here at call time.
+_current_phone: ContextVar[Optional[str]] = ContextVar("current_guest_phone", default=None)
+
+def get_current_phone() -> Optional[str]:
+    """Get the phone number of the guest the current request is serving."""
+    return _current_phone.get()
+
+@contextmanager
+def guest_context(phone_number: str) -> Iterator[None]:
+    """Bind a guest to the current request so shared tools act on their behalf."""
+    token = _current_phone.set(phone_number)
+    try:
+        yield
+    finally:
+        _current_phone.reset(token)
+
+# ----------------------------------------------------------------------------
+# Escalation Notifications
+# ----------------------------------------------------------------------------
+
+class EscalationNotifier:
+    """
+    Posts escalations as JSON to the property manager's webhook.
+    
+    Without a URL escalations are only logged. Delivery failures are logged
+    and never fail the tool, so the guest's turn is not lost to a webhook outage.
+    One sync and one async client are kept for the notifier's lifetime, so
+    escalations reuse open connections; close them with aclose() on shutdown.
+    """
+    
+    def __init__(self, url: Optional[str] = None, timeout_seconds: float = 5.0):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+        self.sync_client = httpx.Client(timeout=timeout_seconds) if url else None
+        self.async_client = httpx.AsyncClient(timeout=timeout_seconds) if url else None
+    
+    def send(self, details: dict) -> bool:
+        """Deliver an escalation, blocking until the webhook answers."""
+        if not self.url:
+            return False
+        try:
+            self.sync_client.post(self.url, json=details).raise_for_status()
+            return True
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to deliver escalation to {self.url}: {e}")
+            return False
+    
+    async def asend(self, details: dict) -> bool:
+        """Deliver an escalation without blocking the event loop."""
+        if not self.url:
+            return False
+        try:
+            (await self.async_client.post(self.url, json=details)).raise_for_status()
+            return True
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to deliver escalation to {self.url}: {e}")
+            return False
+    
+    async def aclose(self):
+        """Close the webhook connections."""
+        if self.sync_client is not None:
+            self.sync_client.close()
+            await self.async_client.aclose()
+
 # ----------------------------------------------------------------------------
 # Tool Input Schemas
 # ----------------------------------------------------------------------------
@@ -86,16 +162,24 @@ class LocalRecommendationsInput(BaseModel):
 # Tool Functions
 # ----------------------------------------------------------------------------
 
-def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[StructuredTool]:
-    """Create tools pre-configured for a specific guest."""
+def create_guest_tools(guest_service, vector_store,
+                       notifier: Optional[EscalationNotifier] = None) -> List[StructuredTool]:
+    """
+    Create the guest tools. Each tool resolves the calling guest from the
+    request context set by guest_context(), so the list can be shared by
+    every guest and built once per process.
+    
+    The I/O-bound tools (property retrieval and escalation) also have
+    coroutines, so async agent runs await them instead of blocking a thread.
+    """
+    notifier = notifier or EscalationNotifier()
     
     def schedule_cleaning(cleaning_time: str) -> str:
         """Schedule room cleaning with complete date and time information."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-        
-        booking = guest_service.get_booking(guest["guest_id"])
         if not booking:
             return "Booking not found."
         
@@ -119,6 +203,7 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
     
     def modify_checkout_time(new_checkout_time: str) -> str:
         """Modify guest's checkout time."""
+        phone_number = get_current_phone()
         guest = guest_service.get_guest(phone_number)
         if not guest:
             return "Guest not found."
@@ -128,6 +213,7 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
     
     def request_transport(pickup_time: str, airport_code: str) -> str:
         """Request airport transport."""
+        phone_number = get_current_phone()
         guest = guest_service.get_guest(phone_number)
         if not guest:
             return "Guest not found."
@@ -137,26 +223,26 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
     
     def get_guest_profile() -> str:
         """Get guest profile information."""
+        phone_number = get_current_phone()
         guest = guest_service.get_guest(phone_number)
         return json.dumps(guest, indent=2) if guest else "Guest not found."
     
     def get_booking_details() -> str:
         """Get guest booking details."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
         
-        booking = guest_service.get_booking(guest["guest_id"])
         return json.dumps(booking, indent=2) if booking else "Booking not found."
     
     def get_property_info(query: str = "general information") -> str:
         """Get property information."""
+        phone_number = get_current_phone()
         try:
-            guest = guest_service.get_guest(phone_number)
+            guest, booking = guest_service.get_guest_and_booking(phone_number)
             if not guest:
                 return "Guest not found."
-            
-            booking = guest_service.get_booking(guest["guest_id"])
             if not booking:
                 return "Booking not found."
             
@@ -166,18 +252,21 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
             logger.error(f"Error in get_property_info tool: {e}", exc_info=True)
             return "Sorry, I'm having trouble accessing property information right now."
     
-    def escalate_to_manager(question: str, context: str = "") -> str:
-        """Escalate questions to property manager when unable to find answers."""
-        guest = guest_service.get_guest(phone_number)
+    async def aget_property_info(query: str = "general information") -> str:
+        """Get property information; the Chroma search runs in a worker thread."""
+        return await asyncio.to_thread(get_property_info, query)
+    
+    def prepare_escalation(question: str, context: str) -> Tuple[Optional[dict], str]:
+        """Escalation details for the manager (None if the guest is unknown) and the reply for the guest."""
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
-            return "Unable to escalate - guest information not found."
+            return None, "Unable to escalate - guest information not found."
         
-        booking = guest_service.get_booking(guest["guest_id"])
         property_name = booking.get('property_name', 'Unknown Property') if booking else 'Unknown Property'
         
-        # Log the escalation (in a real implementation, this would send notifications)
         escalation_details = {
-            "timestamp": "2025-01-01T12:00:00Z",  # In real implementation, use actual timestamp
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "guest_name": guest.get('name', 'Unknown Guest'),
             "guest_phone": phone_number,
             "property": property_name,
@@ -188,24 +277,32 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
         
         logger.info(f"ESCALATION: {escalation_details}")
         
-        # Stub implementation - in reality, this would:
-        # - Send notification to property manager
-        # - Create a ticket in management system
-        # - Send email/SMS to admin
-        # - Log in database
-        
-        return (f"I've escalated your question to the property manager at {property_name}. "
-                f"They will get back to you shortly regarding: '{question}'. "
-                f"Thank you for your patience!")
+        return escalation_details, (f"I've escalated your question to the property manager at {property_name}. "
+                                    f"They will get back to you shortly regarding: '{question}'. "
+                                    f"Thank you for your patience!")
+    
+    def escalate_to_manager(question: str, context: str = "") -> str:
+        """Escalate questions to property manager when unable to find answers."""
+        details, reply = prepare_escalation(question, context)
+        if details:
+            notifier.send(details)
+        return reply
+    
+    async def aescalate_to_manager(question: str, context: str = "") -> str:
+        """Escalate questions to property manager, notifying them without blocking the event loop."""
+        details, reply = prepare_escalation(question, context)
+        if details:
+            await notifier.asend(details)
+        return reply
     
     # HIGH-IMPACT TIER TOOLS
     def restaurant_reservation(restaurant_preference: str, date_time: str, party_size: int, special_occasion: str = "") -> str:
         """Make restaurant reservations for guests."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
         
-        booking = guest_service.get_booking(guest["guest_id"])
         location = booking.get('property_name', 'your area') if booking else 'your area'
         
         occasion_text = f" for {special_occasion}" if special_occasion else ""
@@ -220,11 +317,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
 
     def grocery_delivery(items_requested: str, delivery_time: str, special_instructions: str = "") -> str:
         """Arrange grocery delivery to the property."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         property_name = booking.get('property_name', 'your property') if booking else 'your property'
         
         instruction_text = f" Special instructions: {special_instructions}." if special_instructions else ""
@@ -237,11 +334,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
 
     def maintenance_request(issue_description: str, location: str, urgency: str = "normal") -> str:
         """Report and track maintenance issues at the property."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         property_name = booking.get('property_name', 'the property') if booking else 'the property'
         
         urgency_responses = {
@@ -272,11 +369,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
 
     def activity_booking(activity_type: str, preferred_date: str, participants: int, special_requirements: str = "") -> str:
         """Book local activities and experiences for guests."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         location = booking.get('property_name', 'your area') if booking else 'your area'
         
         requirements_text = f" Special arrangements: {special_requirements}." if special_requirements else ""
@@ -290,11 +387,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
 
     def meal_delivery(cuisine_type: str, meal_items: str, delivery_time: str) -> str:
         """Order meal delivery from local restaurants."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         property_name = booking.get('property_name', 'your villa') if booking else 'your villa'
         
         dietary_info = ""
@@ -310,11 +407,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
     # LUXURY TIER TOOLS
     def spa_services(service_type: str, preferred_time: str, participants: int, special_requests: str = "") -> str:
         """Book in-villa spa and wellness services."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         property_name = booking.get('property_name', 'your villa') if booking else 'your villa'
         
         requests_text = f" Special arrangements: {special_requests}." if special_requests else ""
@@ -327,11 +424,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
 
     def private_chef(meal_type: str, date_time: str, guests: int, cuisine_preference: str, special_occasion: str = "") -> str:
         """Arrange private chef services for in-villa dining."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         property_name = booking.get('property_name', 'your villa') if booking else 'your villa'
         
         occasion_text = f" celebrating {special_occasion}" if special_occasion else ""
@@ -348,11 +445,11 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
 
     def local_recommendations(activity_category: str, preferences: str = "", timeframe: str = "today") -> str:
         """Provide personalized local recommendations based on guest profile."""
-        guest = guest_service.get_guest(phone_number)
+        phone_number = get_current_phone()
+        guest, booking = guest_service.get_guest_and_booking(phone_number)
         if not guest:
             return "Guest not found."
-            
-        booking = guest_service.get_booking(guest["guest_id"])
+        
         location = booking.get('property_name', 'your area') if booking else 'your area'
         
         preferences_text = f" matching your interests in {preferences}" if preferences else ""
@@ -397,12 +494,14 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
         ),
         StructuredTool.from_function(
             func=get_property_info,
+            coroutine=aget_property_info,
             args_schema=PropertyInfoInput,
             name="property_info",
             description=TOOL_DESCRIPTIONS["property_info"]
         ),
         StructuredTool.from_function(
             func=escalate_to_manager,
+            coroutine=aescalate_to_manager,
             args_schema=EscalationInput,
             name="escalate_to_manager",
             description=TOOL_DESCRIPTIONS["escalate_to_manager"]
@@ -461,6 +560,40 @@ def create_guest_tools(phone_number: str, guest_service, vector_store) -> List[S
         ),
     ]
 
+# ----------------------------------------------------------------------------
+# Tool Registry
+# ----------------------------------------------------------------------------
+
+# Tools that only read property-level data. A turn that called nothing else has
+# no side effects and no guest-specific content, so its reply can be reused.
+CACHEABLE_TOOLS = frozenset({"property_info", "local_recommendations"})
+
+class GuestToolRegistry:
+    """
+    Holds the guest tools, built once at startup.
+    
+    Per-message tool setup is a constant-time lookup; the caller binds the
+    guest with guest_context() around the agent run.
+    """
+    
+    def __init__(self, guest_service, vector_store, notifier: Optional[EscalationNotifier] = None):
+        self.tools: List[StructuredTool] = create_guest_tools(guest_service, vector_store, notifier)
+        self.tools_by_name: Dict[str, StructuredTool] = {tool.name: tool for tool in self.tools}
+        # Converting a tool's pydantic schema costs milliseconds, so do it once
+        # rather than on every agent build
+        self.definitions: Dict[str, dict] = {tool.name: dict(convert_to_anthropic_tool(tool))
+                                             for tool in self.tools}
+    
+    def get(self, name: str) -> Optional[StructuredTool]:
+        """Get a tool by name."""
+        return self.tools_by_name.get(name)
+    
+    def get_definitions(self, names: Optional[Iterable[str]] = None) -> List[dict]:
+        """Anthropic tool definitions for the named tools, or for every tool when None."""
+        if names is None:
+            return list(self.definitions.values())
+        return [self.definitions[name] for name in names]
+
 # ----------------------------------------------------------------------------
 # Tool Management Functions
 # ----------------------------------------------------------------------------
@@ -3,15 +3,25 @@ Omotenashi Hotel Concierge API
 A FastAPI application providing AI-powered hotel concierge services.
 """
 
+import asyncio
+import contextvars
+import hashlib
 import json
 import logging
 import os
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
@@ -22,12 +32,43 @@ from langchain.schema import BaseMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel
 from langchain_chroma import Chroma
-from langchain_anthropic import ChatAnthropic
 
 # Local imports
-from src.api.config import MEMORY_EXPIRY_HOURS, ANTHROPIC_API_KEY, CLAUDE_MODEL, PORT
-from src.agents.prompts import combine_prompts, format_guest_context, get_base_system_prompt, get_property_name_from_booking
-from src.agents.tools import create_guest_tools
+from src.api.config import (
+    MEMORY_EXPIRY_HOURS, PORT,
+    MEMORY_MODE, MEMORY_WINDOW_TURNS, MEMORY_MAX_TOKENS, MEMORY_MAX_BYTES, MEMORY_SUMMARY_MAX_CHARS,
+    SESSION_BACKEND, SESSION_KEY_PREFIX, SESSION_SWEEP_INTERVAL_SECONDS, SESSION_LOCK_TTL_SECONDS,
+    SESSION_LOCK_WAIT_SECONDS, REDIS_URL,
+    WS_SEND_QUEUE_SIZE, WS_SEND_TIMEOUT_SECONDS, TRACING_ENABLED, LATENCY_WINDOW_SIZE,
+    INTENT_ROUTER_ENABLED, INTENT_ROUTER_EXAMPLES, INTENT_ROUTER_MIN_SIMILARITY, INTENT_ROUTER_MIN_MARGIN,
+    TOOL_SELECTION_ENABLED, TOOL_SELECTION_EXAMPLES, TOOL_SELECTION_CORE_TOOLS, TOOL_SELECTION_TOP_K,
+    TOOL_SELECTION_MIN_SIMILARITY,
+    GUESTS_FILE, BOOKINGS_FILE, GUEST_DATA_WATCH_INTERVAL_SECONDS, GUEST_DATA_BACKEND, DATABASE_URL,
+    DATABASE_POOL_MIN_SIZE, DATABASE_POOL_MAX_SIZE, GUEST_CACHE_TTL_SECONDS, GUEST_CACHE_MAX_ENTRIES,
+    AGENT_CACHE_MAX_SIZE, AGENT_CACHE_TTL_SECONDS, AGENT_EXECUTION_MODE, AGENT_MAX_CONCURRENCY,
+    TOOL_MAX_CONCURRENCY, ESCALATION_WEBHOOK_URL, ESCALATION_WEBHOOK_TIMEOUT_SECONDS,
+    PROMPT_CACHE_MAX_SIZE, PROMPT_CACHING_ENABLED, VECTOR_STORE_WARMUP,
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS,
+    QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_PROPERTIES, QUERY_CACHE_SIMILARITY, QUERY_CACHE_TTL_SECONDS,
+    EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+)
+from src.agents.prompts import SystemPromptParts, build_system_prompt, get_property_name_from_booking
+from src.agents.callbacks import TokenUsageTracker, ToolUsageTracker, TracingCallbackHandler
+from src.agents.executor import ConcurrentAgentExecutor
+from src.agents.router import IntentRouter, RouteDecision
+from src.agents.tool_selection import ToolSelector
+from src.agents.memory import WindowedSummaryMemory, dump_state, history_size, restore_state
+from src.agents.sessions import SessionBackend, create_session_backend
+from src.agents.llm import close_shared_llm, get_pool_stats, get_shared_llm, init_shared_llm
+from src.agents.tools import CACHEABLE_TOOLS, EscalationNotifier, GuestToolRegistry, guest_context
+from src.models.guest import GuestDataChange, GuestIndex, normalize_phone, record_version
+from src.models.guest_repository import PostgresGuestService
+from src.utils.cache import ExpiryScheduler, LRUCache, SemanticCache, normalize_query
+from src.utils.embeddings import CachedEmbeddings
+from src.utils.metrics import (
+    RESPONSE_CACHE_LOOKUPS, RETRIEVAL_DURATION, ROUTER_ANSWERS, SESSIONS, MetricsMiddleware, record_agent_run, render_metrics,
+)
+from src.utils.tracing import RequestTracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -37,10 +78,42 @@ logger = logging.getLogger(__name__)
 # FastAPI Application Setup
 # ----------------------------------------------------------------------------
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared per-worker resources on startup and release them on shutdown."""
+    start = time.perf_counter()
+    init_shared_llm()
+    startup_timings["llm_client"] = round(time.perf_counter() - start, 4)
+    
+    # Warm the embedding model and Chroma in the background so the worker
+    # starts accepting traffic immediately; /health/ready reports completion
+    warmup_task = None
+    if VECTOR_STORE_WARMUP:
+        warmup_task = asyncio.create_task(asyncio.to_thread(vector_store.warm_up))
+    background_tasks = [asyncio.create_task(memory_service.run_expiry(SESSION_SWEEP_INTERVAL_SECONDS))]
+    if GUEST_DATA_BACKEND == "json" and GUEST_DATA_WATCH_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(guest_service.watch(GUEST_DATA_WATCH_INTERVAL_SECONDS)))
+    yield
+    if streamed_turns:
+        # Let turns whose clients went away finish and persist their sessions
+        await asyncio.wait(streamed_turns, timeout=30)
+    for task in background_tasks:
+        task.cancel()
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    vector_store.close()
+    await asyncio.to_thread(guest_service.close)
+    await memory_service.backend.close()
+    await escalation_notifier.aclose()
+    await close_shared_llm()
+
+startup_timings: Dict[str, float] = {}
+
 app = FastAPI(
     title="Omotenashi Hotel Concierge API",
     description="AI-powered hotel concierge services",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -50,6 +123,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Static file serving
 static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "frontend", "static")
@@ -74,6 +148,8 @@ class MessageResponse(BaseModel):
 class SessionResponse(BaseModel):
     session_id: str
     messages: List[dict]
+    summary: Optional[str] = None
+    history_size: Optional[dict] = None
 
 # ----------------------------------------------------------------------------
 # Service Classes
@@ -82,41 +158,216 @@ class SessionResponse(BaseModel):
 class VectorStoreService:
     """Manages the vector store for property information retrieval."""
     
-    def __init__(self):
+    PROPERTY_COLLECTION_PREFIX = "property_"
+    # scripts/index_property.py replaces <persist dir>/property_versions/<id> after each re-index
+    PROPERTY_VERSIONS_DIR = "property_versions"
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    RETRIEVAL_K = 4
+    
+    def __init__(self, persist_directory: str = "data/vector_store/chroma_db"):
+        self.persist_directory = persist_directory
         self._vectorstore = None
-        self._retriever = None
+        self._embeddings = None
+        self._property_stores: Dict[str, Chroma] = {}
+        self._property_collections: set = set()
+        # Index version each property's handle and cached results were resolved at
+        self._property_versions: Dict[str, str] = {}
+        self._init_lock = threading.Lock()
+        self.query_cache = SemanticCache(
+            max_entries=QUERY_CACHE_MAX_ENTRIES,
+            max_namespaces=QUERY_CACHE_MAX_PROPERTIES,
+            ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+            similarity_threshold=QUERY_CACHE_SIMILARITY,
+        )
+        self.startup_timings: Dict[str, float] = {}
+        self.init_error: Optional[str] = None
     
     @property
-    def retriever(self):
-        """Lazy-load the vector store retriever."""
-        if self._retriever is None:
+    def is_ready(self) -> bool:
+        """Whether the embedding model and Chroma store are loaded."""
+        return self._vectorstore is not None
+    
+    @property
+    def vectorstore(self):
+        """Lazy-load the shared vector store if startup warm-up has not finished."""
+        if self._vectorstore is None:
+            self.warm_up()
+        return self._vectorstore
+    
+    def warm_up(self) -> bool:
+        """
+        Load the embedding model, run a dummy embedding and open the Chroma store.
+        
+        Called in the background at startup so the first guest does not pay for
+        model loading; records the time spent in each stage.
+        """
+        with self._init_lock:
+            if self._vectorstore is not None:
+                return True
             try:
+                timings = {}
+                start = time.perf_counter()
                 # Note: Claude doesn't provide embeddings, so we'll use a different approach
                 # For now, we'll use a local embedding model or keep OpenAI embeddings
                 # This is a common pattern when using Claude for LLM but needing embeddings elsewhere
                 from langchain_community.embeddings import HuggingFaceEmbeddings
-                embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-                self._vectorstore = Chroma(
-                    persist_directory="data/vector_store/chroma_db", 
+                # MiniLM is uncased, so queries differing only in case share a cache entry
+                embeddings = CachedEmbeddings(
+                    HuggingFaceEmbeddings(model_name=self.EMBEDDING_MODEL),
+                    max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+                    persist_path=EMBEDDING_CACHE_PATH or None,
+                    max_disk_entries=EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+                    lowercase=True,
+                    model_name=self.EMBEDDING_MODEL,
+                )
+                timings["embedding_model_load"] = time.perf_counter() - start
+                
+                stage = time.perf_counter()
+                embeddings.embed_query("warm-up")
+                timings["dummy_embedding"] = time.perf_counter() - stage
+                
+                stage = time.perf_counter()
+                vectorstore = Chroma(
+                    persist_directory=self.persist_directory, 
                     embedding_function=embeddings
                 )
-                self._retriever = self._vectorstore.as_retriever(search_kwargs={"k": 4})
-                logger.info("Vector store initialized successfully")
+                vectorstore._collection.count()
+                self._embeddings = embeddings
+                self._property_collections = self._list_property_collections(vectorstore)
+                self._vectorstore = vectorstore
+                timings["chroma_open"] = time.perf_counter() - stage
+                
+                timings["total"] = time.perf_counter() - start
+                self.startup_timings = {name: round(value, 4) for name, value in timings.items()}
+                self.init_error = None
+                logger.info(f"Vector store initialized successfully: {self.startup_timings}")
+                return True
             except Exception as e:
+                self.init_error = str(e)
                 logger.error(f"Failed to initialize vector store: {e}")
-                return None
-        return self._retriever
+                return False
+    
+    @classmethod
+    def _list_property_collections(cls, vectorstore) -> set:
+        """Names of the per-property collections present in the Chroma store."""
+        collections = vectorstore._client.list_collections()
+        names = (getattr(c, "name", c) for c in collections)
+        return {name for name in names if name.startswith(cls.PROPERTY_COLLECTION_PREFIX)}
+    
+    def index_version(self, property_id: str) -> str:
+        """
+        Version of a property's index, read from the marker file index_property.py
+        replaces after a re-index; "" if it has none. Every worker reads the same
+        file, so all of them notice a re-index, not only the one notified over HTTP.
+        """
+        try:
+            st = os.stat(os.path.join(self.persist_directory, self.PROPERTY_VERSIONS_DIR, property_id))
+        except (OSError, ValueError):
+            return ""
+        return f"{st.st_ino}.{st.st_mtime_ns}"
+    
+    def _sync_property(self, property_id: str, version: str):
+        """Invalidate a property whose index version changed since this worker last resolved it."""
+        if self._property_versions.get(property_id, "") != version:
+            self.invalidate_property(property_id, version)
+    
+    def _refresh_collection(self, property_id: str):
+        """Drop a property's collection handle and re-read which properties have a collection."""
+        self._property_stores.pop(f"{self.PROPERTY_COLLECTION_PREFIX}{property_id}", None)
+        if self._vectorstore is not None:
+            self._property_collections = self._list_property_collections(self._vectorstore)
+    
+    def _property_store(self, property_id: str) -> Optional[Chroma]:
+        """Get the dedicated collection for a property, if it has been indexed into one."""
+        name = f"{self.PROPERTY_COLLECTION_PREFIX}{property_id}"
+        if name not in self._property_collections:
+            return None
+        store = self._property_stores.get(name)
+        if store is None:
+            store = Chroma(
+                client=self._vectorstore._client,
+                collection_name=name,
+                embedding_function=self._embeddings
+            )
+            self._property_stores[name] = store
+        return store
+    
+    def search(self, property_id: str, query: str) -> list:
+        """
+        Search one property's documents.
+        
+        Repeated questions are answered from the per-property query cache, first
+        by normalized text and then by embedding similarity. Cached results are
+        keyed by the property's index version (see index_version), which every
+        worker reads, and a changed version also drops the property's collection
+        handle. On a miss, searches the property's dedicated collection when it
+        exists, so query cost tracks that property's corpus; otherwise filters
+        the shared collection on the property_id metadata stamped by
+        scripts/index_property.py.
+        """
+        with request_tracer.span("retrieval", property_id=property_id), RETRIEVAL_DURATION.time():
+            return self._search(property_id, query)
+    
+    def _search(self, property_id: str, query: str) -> list:
+        version = self.index_version(property_id)
+        self._sync_property(property_id, version)
+        # Results are cached under the index version they were read from
+        namespace = (property_id, version)
+        docs = self.query_cache.get_exact(namespace, query)
+        if docs is not None:
+            return docs
+        
+        vector = self._embeddings.embed_query(query)
+        docs = self.query_cache.get_similar(namespace, vector)
+        if docs is not None:
+            return docs
+        
+        try:
+            docs = self._search_collection(property_id, vector)
+        except Exception as e:
+            # The collection may have been replaced without a version marker; resolve it again once
+            logger.warning(f"Property {property_id} search failed, re-resolving its collection: {e}")
+            self._refresh_collection(property_id)
+            docs = self._search_collection(property_id, vector)
+        self.query_cache.set(namespace, query, docs, vector)
+        return docs
+    
+    def _search_collection(self, property_id: str, vector: List[float]) -> list:
+        store = self._property_store(property_id)
+        if store is not None:
+            return store.similarity_search_by_vector(vector, k=self.RETRIEVAL_K)
+        return self._vectorstore.similarity_search_by_vector(
+            vector, k=self.RETRIEVAL_K, filter={"property_id": property_id}
+        )
+    
+    def invalidate_property(self, property_id: str, version: Optional[str] = None) -> int:
+        """Forget cached results and collection handles after a property is re-indexed."""
+        removed = self.query_cache.invalidate_where(lambda namespace: namespace[0] == property_id)
+        self._refresh_collection(property_id)
+        self._property_versions[property_id] = self.index_version(property_id) if version is None else version
+        logger.info(f"Invalidated {removed} cached queries for property {property_id}")
+        return removed
+    
+    def embedding_cache_stats(self) -> Optional[dict]:
+        """Embedding cache counters, once the model is loaded."""
+        if isinstance(self._embeddings, CachedEmbeddings):
+            return self._embeddings.stats()
+        return None
+    
+    def close(self):
+        """Persist pending embedding cache rows."""
+        if isinstance(self._embeddings, CachedEmbeddings):
+            self._embeddings.flush()
     
     def get_property_info(self, property_id: str, query: str) -> str:
         """Retrieve property information based on query."""
-        if not self.retriever:
+        if not self.vectorstore:
             return "Property knowledge base not available."
         
         try:
             logger.info(f"Searching property info for property_id: {property_id}, query: {query}")
             
-            # Use the new invoke method instead of deprecated get_relevant_documents
-            docs = self.retriever.invoke(query)
+            docs = self.search(property_id, query)
             
             if docs:
                 result = "\n---\n".join(d.page_content for d in docs)
@@ -130,136 +381,685 @@ class VectorStoreService:
             logger.error(f"Error retrieving property info for {property_id}: {e}", exc_info=True)
             return "Error retrieving property information."
 
+class _GuestData(NamedTuple):
+    """One consistent snapshot of the guest data, swapped in as a whole."""
+    index: GuestIndex
+    versions_by_guest: Dict[str, str]
+    file_stamps: Optional[tuple]
+
 class GuestService:
-    """Manages guest profiles and booking information."""
+    """
+    Manages guest profiles and booking information.
     
-    def __init__(self):
-        self.guests_by_phone: Dict[str, dict] = {}
-        self.bookings_by_guest: Dict[str, dict] = {}
+    Records live in a GuestIndex. Reloads build a new snapshot off to the side
+    and swap it in with a single assignment, so readers never see a partial
+    update. Guests and bookings are returned as plain dicts in the shape of the
+    JSON files.
+    """
+    
+    def __init__(self, guests_path: str = GUESTS_FILE, bookings_path: str = BOOKINGS_FILE):
+        self.guests_path = guests_path
+        self.bookings_path = bookings_path
+        self._data = _GuestData(GuestIndex((), ()), {}, None)
+        self._reload_lock = threading.Lock()
+        self._reload_listeners: List[Callable[[GuestDataChange], None]] = []
         self._load_data()
     
-    def _load_data(self):
-        """Load guest and booking data from JSON files."""
+    @property
+    def index(self) -> GuestIndex:
+        return self._data.index
+    
+    def add_reload_listener(self, listener: Callable[[GuestDataChange], None]):
+        """Register a callback invoked with the changed guests after a reload."""
+        self._reload_listeners.append(listener)
+    
+    def reload(self) -> Optional[GuestDataChange]:
+        """Reload guest and booking data and notify dependent caches. Returns None on failure."""
+        change = self._load_data()
+        if change and change.guest_ids:
+            for listener in self._reload_listeners:
+                try:
+                    listener(change)
+                except Exception as e:
+                    logger.error(f"Guest reload listener failed: {e}")
+        return change
+    
+    def reload_if_modified(self) -> Optional[GuestDataChange]:
+        """Reload when either data file's modification time or size has changed."""
         try:
-            with open("data/demo/guests.json", "r", encoding="utf-8") as f:
-                guests = json.load(f)
-            with open("data/demo/bookings.json", "r", encoding="utf-8") as f:
-                bookings = json.load(f)
-            
-            self.guests_by_phone = {g["phone_number"]: g for g in guests}
-            self.bookings_by_guest = {b["guest_id"]: b for b in bookings}
+            stamps = self._file_stamps()
+        except OSError as e:
+            logger.error(f"Cannot stat guest data files: {e}")
+            return None
+        if stamps == self._data.file_stamps:
+            return None
+        return self.reload()
+    
+    async def prefetch(self, phone_number: str):
+        """Records are held in memory; nothing to fetch before a request."""
+    
+    async def prefetch_counts(self):
+        """Counts come from the in-memory index; nothing to fetch."""
+    
+    def close(self):
+        pass
+    
+    def stats(self) -> dict:
+        return {"backend": "json", "guests_path": self.guests_path, "bookings_path": self.bookings_path}
+    
+    async def watch(self, interval_seconds: float):
+        """Background task polling the data files and reloading on change."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.reload_if_modified)
+            except Exception as e:
+                logger.error(f"Guest data watch failed: {e}")
+    
+    def _file_stamps(self) -> tuple:
+        stats = [os.stat(path) for path in (self.guests_path, self.bookings_path)]
+        return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+    
+    def _load_data(self) -> Optional[GuestDataChange]:
+        """Load guest and booking data from JSON files and swap in the new snapshot."""
+        with self._reload_lock:
+            try:
+                # Stamped before reading: a write during the read triggers another reload
+                stamps = self._file_stamps()
+                with open(self.guests_path, "r", encoding="utf-8") as f:
+                    guests = json.load(f)
+                with open(self.bookings_path, "r", encoding="utf-8") as f:
+                    bookings = json.load(f)
+                
+                index = GuestIndex.from_records(guests, bookings)
+                versions = {
+                    guest_id: record_version(
+                        guest.to_dict(), [b.to_dict() for b in index.bookings_for_guest(guest_id)]
+                    )
+                    for guest_id, guest in index.guests_by_id.items()
+                }
+            except FileNotFoundError as e:
+                logger.error(f"Data file not found: {e}")
+                return None
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON in data file: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"Error loading data: {e}")
+                return None
             
-            logger.info(f"Loaded {len(guests)} guests and {len(bookings)} bookings")
-        except FileNotFoundError as e:
-            logger.error(f"Data file not found: {e}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in data file: {e}")
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
+            previous = self._data
+            self._data = _GuestData(index, versions, stamps)
+        
+        change = self._diff(previous, self._data)
+        logger.info(f"Loaded {len(guests)} guests and {len(bookings)} bookings "
+                    f"({len(change.guest_ids)} guests changed)")
+        return change
+    
+    @staticmethod
+    def _diff(old: _GuestData, new: _GuestData) -> GuestDataChange:
+        guest_ids = frozenset(
+            guest_id for guest_id in old.versions_by_guest.keys() | new.versions_by_guest.keys()
+            if old.versions_by_guest.get(guest_id) != new.versions_by_guest.get(guest_id)
+        )
+        phones = set()
+        for data in (old, new):
+            for guest_id in guest_ids:
+                guest = data.index.guest_by_id(guest_id)
+                if guest is not None and guest.phone_number:
+                    phones.add(normalize_phone(guest.phone_number))
+        return GuestDataChange(guest_ids, frozenset(phones))
+    
+    @property
+    def guest_count(self) -> int:
+        return len(self.index)
+    
+    @property
+    def booking_count(self) -> int:
+        return self.index.booking_count
+    
+    def all_guests(self) -> List[dict]:
+        """Every guest profile."""
+        return [guest.to_dict() for guest in self.index.guests_by_id.values()]
+    
+    async def aall_guests(self) -> List[dict]:
+        """Every guest profile; see all_guests."""
+        return self.all_guests()
     
     def get_guest(self, phone_number: str) -> Optional[dict]:
-        """Get guest by phone number."""
-        return self.guests_by_phone.get(phone_number)
+        """Get guest by phone number (any common formatting)."""
+        guest = self.index.guest_by_phone(phone_number)
+        return guest.to_dict() if guest else None
+    
+    def get_booking(self, guest_id: str, at: Optional[datetime] = None) -> Optional[dict]:
+        """Get the guest's booking at a time (default now); see GuestIndex.active_booking."""
+        booking = self.index.active_booking(guest_id, at)
+        return booking.to_dict() if booking else None
+    
+    def get_bookings(self, guest_id: str) -> List[dict]:
+        """Every booking of a guest, by check-in."""
+        return [b.to_dict() for b in self.index.bookings_for_guest(guest_id)]
+    
+    def get_property_bookings(self, property_id: str) -> List[dict]:
+        """Every booking at a property, by check-in."""
+        return [b.to_dict() for b in self.index.bookings_for_property(property_id)]
+    
+    def get_guest_and_booking(self, phone_number: str) -> Tuple[Optional[dict], Optional[dict]]:
+        """Resolve a guest and their current booking in one lookup."""
+        index = self.index
+        guest = index.guest_by_phone(phone_number)
+        if guest is None:
+            return None, None
+        booking = index.active_booking(guest.guest_id)
+        return guest.to_dict(), booking.to_dict() if booking else None
+    
+    def get_version(self, phone_number: str) -> str:
+        """
+        Get a digest of the guest and booking records, used to key per-guest caches.
+        Includes which booking is current, so caches roll over when a new stay starts.
+        """
+        data = self._data
+        guest = data.index.guest_by_phone(phone_number)
+        if guest is None:
+            return "unknown"
+        booking = data.index.active_booking(guest.guest_id)
+        position = data.index.bookings_for_guest(guest.guest_id).index(booking) if booking else -1
+        return f"{data.versions_by_guest[guest.guest_id]}.{position}"
     
-    def get_booking(self, guest_id: str) -> Optional[dict]:
-        """Get booking by guest ID."""
-        return self.bookings_by_guest.get(guest_id)
 
 class MemoryService:
-    """Manages conversation memory for each guest session."""
+    """
+    Manages conversation memory for each guest session.
+    
+    memory_store holds this worker's live memory objects; the session backend
+    holds the authoritative state. Each turn syncs the local memory from the
+    backend before the agent runs and persists it afterwards, so with a shared
+    backend any worker can serve a guest's next message.
+    """
     
-    def __init__(self):
+    def __init__(self, backend: Optional[SessionBackend] = None):
         self.memory_store: Dict[str, ConversationBufferMemory] = {}
-        self.last_activity: Dict[str, datetime] = {}
+        # Idle deadline per phone; expired sessions are collected by run_expiry
+        self.expiry_schedule = ExpiryScheduler()
         self.expiry = timedelta(hours=MEMORY_EXPIRY_HOURS)
+        self.backend = backend or create_session_backend(
+            SESSION_BACKEND, self.expiry.total_seconds(), REDIS_URL, SESSION_KEY_PREFIX,
+            lock_ttl_seconds=SESSION_LOCK_TTL_SECONDS, lock_wait_seconds=SESSION_LOCK_WAIT_SECONDS,
+        )
+        # Revision of the backend state each local memory was last synced to
+        self._revisions: Dict[str, str] = {}
+        self._expiry_listeners: List[Callable[[str], None]] = []
+    
+    def add_expiry_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the phone number whenever a session ends."""
+        self._expiry_listeners.append(listener)
+    
+    def _notify_expired(self, phone: str):
+        for listener in self._expiry_listeners:
+            try:
+                listener(phone)
+            except Exception as e:
+                logger.error(f"Session expiry listener failed for {phone}: {e}")
     
     def get_memory(self, phone: str) -> ConversationBufferMemory:
         """Get or create conversation memory for a guest."""
         if phone not in self.memory_store:
-            self.memory_store[phone] = ConversationBufferMemory(
-                memory_key="chat_history", 
-                return_messages=True
-            )
-        self.last_activity[phone] = datetime.utcnow()
+            self.memory_store[phone] = self._new_memory()
+        self.expiry_schedule.touch(phone, time.monotonic() + self.expiry.total_seconds())
         return self.memory_store[phone]
     
-    def cleanup_expired(self):
-        """Remove expired conversation memories."""
-        now = datetime.utcnow()
-        expired = [
-            phone for phone, last_time in self.last_activity.items() 
-            if now - last_time > self.expiry
-        ]
+    @staticmethod
+    def _new_memory() -> ConversationBufferMemory:
+        if MEMORY_MODE == "buffer":
+            return ConversationBufferMemory(memory_key="chat_history", output_key="output", return_messages=True)
+        return WindowedSummaryMemory(
+            memory_key="chat_history",
+            output_key="output",
+            return_messages=True,
+            window_turns=MEMORY_WINDOW_TURNS,
+            max_tokens=MEMORY_MAX_TOKENS,
+            max_bytes=MEMORY_MAX_BYTES,
+            summary_max_chars=MEMORY_SUMMARY_MAX_CHARS,
+        )
+    
+    @asynccontextmanager
+    async def turn(self, phone: str):
+        """
+        Hold a guest's session for one turn that changes it: against this
+        worker's other tasks, and through the backend against other workers.
+        """
+        async with get_session_lock(phone), self.backend.lock(phone):
+            yield
+    
+    async def sync(self, phone: str) -> ConversationBufferMemory:
+        """Bring a guest's local memory up to date with the session backend."""
+        memory = self.get_memory(phone)
+        try:
+            state = await self.backend.load(phone)
+        except Exception as e:
+            logger.error(f"Failed to load session {phone}, using local history: {e}")
+            return memory
+        if state is None:
+            # Expired or deleted in the backend since this worker last saw it
+            if self._revisions.pop(phone, None) is not None:
+                memory.clear()
+        elif state.get("r") != self._revisions.get(phone):
+            restore_state(memory, state)
+            self._revisions[phone] = state.get("r")
+        return memory
+    
+    async def persist(self, phone: str):
+        """Write a guest's local memory to the session backend."""
+        memory = self.memory_store.get(phone)
+        if memory is None:
+            return
+        revision = os.urandom(6).hex()
+        state = dump_state(memory)
+        state["r"] = revision
+        try:
+            await self.backend.save(phone, state)
+            self._revisions[phone] = revision
+        except Exception as e:
+            logger.error(f"Failed to save session {phone}: {e}")
+    
+    async def load_session(self, phone: str) -> Optional[ConversationBufferMemory]:
+        """Return a guest's synced memory, or None if no session exists."""
+        if phone not in self.memory_store and await self.backend.load(phone) is None:
+            return None
+        return await self.sync(phone)
+    
+    def cleanup_expired(self) -> int:
+        """Remove expired conversation memories. Cost tracks the number expired, not the number live."""
+        expired = self.expiry_schedule.pop_expired(time.monotonic())
         for phone in expired:
             self.memory_store.pop(phone, None)
-            self.last_activity.pop(phone, None)
+            self._revisions.pop(phone, None)
+            self._notify_expired(phone)
+        self.backend.sweep()
         
         if expired:
             logger.info(f"Cleaned up {len(expired)} expired sessions")
+        return len(expired)
+    
+    async def run_expiry(self, interval_seconds: float):
+        """Background task collecting expired sessions every interval_seconds."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.cleanup_expired()
+                await self.report_count()
+            except Exception as e:
+                logger.error(f"Session expiry sweep failed: {e}")
+    
+    async def report_count(self):
+        """Publish the number of stored sessions to the concierge_sessions gauge."""
+        SESSIONS.set(await self.backend.count())
     
     def get_session_messages(self, phone: str) -> Optional[List[BaseMessage]]:
         """Get conversation messages for a guest."""
         memory = self.memory_store.get(phone)
         return memory.chat_memory.messages if memory else None
     
-    def delete_session(self, phone: str):
+    def get_session_summary(self, phone: str) -> Optional[str]:
+        """Summary of turns folded out of the verbatim window, if any."""
+        return getattr(self.memory_store.get(phone), "summary", None) or None
+    
+    def get_session_size(self, phone: str) -> Optional[dict]:
+        """History size of one session: messages, estimated tokens and bytes."""
+        memory = self.memory_store.get(phone)
+        if memory is None:
+            return None
+        if isinstance(memory, WindowedSummaryMemory):
+            return memory.size()
+        return {**history_size(memory.chat_memory.messages), "summarized_turns": 0}
+    
+    async def stats(self) -> dict:
+        """Aggregate history size across this worker's live sessions."""
+        totals = {"messages": 0, "estimated_tokens": 0, "bytes": 0, "summarized_turns": 0}
+        largest = 0
+        for phone in list(self.memory_store):
+            size = self.get_session_size(phone)
+            if size is None:
+                continue
+            for name in totals:
+                totals[name] += size[name]
+            largest = max(largest, size["estimated_tokens"])
+        return {
+            "mode": MEMORY_MODE,
+            "backend": self.backend.name,
+            "stored_sessions": await self.backend.count(),
+            "sessions": len(self.memory_store),
+            **totals,
+            "largest_session_tokens": largest,
+        }
+    
+    async def delete_session(self, phone: str):
         """Delete a guest's conversation session."""
         self.memory_store.pop(phone, None)
-        self.last_activity.pop(phone, None)
+        self.expiry_schedule.discard(phone)
+        self._revisions.pop(phone, None)
+        await self.backend.delete(phone)
+        self._notify_expired(phone)
+
+def _digest(text: Optional[str]) -> str:
+    """Short stable digest of optional text, used in cache keys."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12] if text else ""
+
+class PromptCache:
+    """
+    Caches rendered system prompts and their chat prompt templates.
+    
+    Entries are keyed on (guest_id, guest/booking version, property name, custom
+    prompt digest) and dropped for guests whose records change on reload.
+    ``core_tools`` names the tools offered on every turn when tools are
+    selected per turn, and None when every tool is always offered.
+    """
+    
+    def __init__(self, max_size: int = PROMPT_CACHE_MAX_SIZE, core_tools: Optional[Tuple[str, ...]] = None):
+        self._cache = LRUCache(max_size=max_size)
+        self.core_tools = core_tools
+    
+    def get_prompt(self, guest: Optional[dict], booking: Optional[dict], version: str,
+                   custom_prompt: Optional[str] = None) -> ChatPromptTemplate:
+        """Return the chat prompt for a guest, rendering it on a cache miss."""
+        guest_id = guest.get("guest_id") if guest else None
+        key = (guest_id, version, get_property_name_from_booking(booking), _digest(custom_prompt))
+        prompt = self._cache.get(key)
+        if prompt is None:
+            parts = build_system_prompt(guest, booking, custom_prompt, self.core_tools)
+            prompt = ChatPromptTemplate.from_messages([
+                self._system_message(parts),
+                ("placeholder", "{chat_history}"),
+                ("human", "{input}"),
+                ("placeholder", "{agent_scratchpad}"),
+            ])
+            self._cache.set(key, prompt)
+        return prompt
+    
+    @staticmethod
+    def _system_message(parts: SystemPromptParts) -> SystemMessage:
+        """
+        Build the system message as literal content blocks.
+        
+        Anthropic caches the request prefix in order tools -> system -> messages, so a
+        cache breakpoint at the end of the static block covers the tool definitions
+        and the shared instructions; only the guest block is sent uncached. With
+        per-turn tool selection that prefix only repeats for the same tool subset;
+        see _build_agent for the breakpoint after the core tools.
+        """
+        static_block = {"type": "text", "text": parts.static}
+        if PROMPT_CACHING_ENABLED:
+            static_block["cache_control"] = {"type": "ephemeral"}
+        return SystemMessage(content=[static_block, {"type": "text", "text": parts.dynamic}])
+    
+    def invalidate(self, guest_ids: Optional[Iterable[str]] = None) -> int:
+        """Drop cached prompts for the given guests, or all prompts when None."""
+        if guest_ids is None:
+            removed = len(self._cache)
+            self._cache.clear()
+            return removed
+        guest_ids = set(guest_ids)
+        return self._cache.pop_where(lambda key: key[0] in guest_ids)
+    
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+class AgentCache:
+    """
+    Caches compiled per-guest AgentExecutor instances.
+    
+    Entries are keyed on (phone, custom prompt digest, guest/booking version,
+    offered tools) and evicted by LRU, by idle TTL, when the guest's conversation memory expires, or
+    when the guest's records change on reload.
+    """
+    
+    def __init__(self, max_size: int = AGENT_CACHE_MAX_SIZE, ttl_seconds: float = AGENT_CACHE_TTL_SECONDS):
+        self._cache = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+    
+    @staticmethod
+    def make_key(phone: str, custom_prompt: Optional[str], version: str,
+                 tool_names: Optional[Tuple[str, ...]] = None) -> tuple:
+        """Build the cache key for a guest's agent; ``tool_names`` None means every tool is offered."""
+        return (phone, _digest(custom_prompt), version, tool_names)
+    
+    def get(self, key: tuple):
+        return self._cache.get(key)
+    
+    def set(self, key: tuple, agent: AgentExecutor):
+        self._cache.set(key, agent)
+    
+    def evict_phone(self, phone: str) -> int:
+        """Drop every cached agent belonging to a phone number."""
+        return self._cache.evict_where(lambda key: key[0] == phone)
+    
+    def evict_phones(self, phones: Iterable[str]) -> int:
+        """Drop cached agents for any formatting of the given normalized phone numbers."""
+        phones = set(phones)
+        return self._cache.evict_where(lambda key: normalize_phone(key[0]) in phones)
+    
+    def stats(self) -> dict:
+        self._cache.expire()
+        return self._cache.stats()
+
+class ResponseCache:
+    """
+    Caches /message replies to side-effect-free turns: greetings, thanks and
+    property FAQs answered without tools or with CACHEABLE_TOOLS only.
+    
+    Entries are keyed on (property, property index version, language, guest
+    digest, previous reply digest, normalized message). The index version is
+    read from the marker every worker sees (VectorStoreService.index_version),
+    so a re-index retires a property's replies in all workers. The guest digest covers the guest fields that
+    change an informational answer (VIP status) and the custom prompt. The
+    guest's name is stored as a placeholder so one entry serves every guest at
+    the property; replies mentioning any other personal detail are not cached.
+    Keying on the previous reply keeps follow-ups such as "yes, please" from
+    being answered out of context. Entries expire ttl_seconds after they were
+    stored, however often they are read.
+    
+    Messages containing digits bypass the cache entirely: every booking tool
+    takes a time, date or count, so such a turn could have side effects.
+    """
+    
+    NAME = "\x00name\x00"
+    FIRST_NAME = "\x00first_name\x00"
+    
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._cache = LRUCache(max_size=max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.skipped = 0
+    
+    @staticmethod
+    def bypasses(message: str) -> bool:
+        """Whether a message could lead to a booking tool call and must always reach the agent."""
+        return any(ch.isdigit() for ch in message)
+    
+    def make_key(self, guest: Optional[dict], booking: Optional[dict], custom_prompt: Optional[str],
+                 previous_reply: Optional[str], message: str, index_version: str = "") -> tuple:
+        """Build the cache key for a guest's message."""
+        guest = guest or {}
+        return (
+            booking.get("property_id") if booking else None,
+            index_version,
+            guest.get("preferred_language"),
+            bool(guest.get("vip_status")),
+            _digest(custom_prompt),
+            _digest(self._anonymize(previous_reply, guest) if previous_reply else None),
+            normalize_query(message),
+        )
+    
+    def get(self, key: tuple, guest: Optional[dict]) -> Optional[Tuple[str, List[str]]]:
+        """Return (reply, tools_used) personalized for the guest, or None."""
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() >= entry[2]:
+            self._cache.pop(key)
+            entry = None
+        reply = self._personalize(entry[0], guest) if entry is not None else None
+        if reply is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return reply, entry[1]
+    
+    def store(self, key: tuple, reply: str, tool_usage: ToolUsageTracker,
+              guest: Optional[dict], booking: Optional[dict]) -> bool:
+        """Cache a reply if the turn had no side effects and no personal details. Returns whether it was stored."""
+        calls = tool_usage.summary()
+        template = self._anonymize(reply, guest or {})
+        if (any(call["tool"] not in CACHEABLE_TOOLS or "error" in call for call in calls)
+                or self._mentions_personal_details(template, guest, booking)):
+            self.skipped += 1
+            return False
+        self._cache.set(key, (template, tool_usage.tools_used, time.monotonic() + self.ttl_seconds))
+        self.stored += 1
+        return True
+    
+    def invalidate_property(self, property_id: str) -> int:
+        """Drop cached replies for a property, e.g. after its knowledge base changes."""
+        return self._cache.pop_where(lambda key: key[0] == property_id)
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self._cache.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "skipped": self.skipped,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+    
+    @classmethod
+    def _anonymize(cls, text: str, guest: dict) -> str:
+        name = (guest.get("name") or "").strip()
+        if not name:
+            return text
+        text = text.replace(name, cls.NAME)
+        return re.sub(rf"\b{re.escape(name.split()[0])}\b", cls.FIRST_NAME, text)
+    
+    @classmethod
+    def _personalize(cls, template: str, guest: Optional[dict]) -> Optional[str]:
+        name = ((guest or {}).get("name") or "").strip()
+        if not name:
+            return None if cls.NAME in template or cls.FIRST_NAME in template else template
+        return template.replace(cls.NAME, name).replace(cls.FIRST_NAME, name.split()[0])
+    
+    @staticmethod
+    def _mentions_personal_details(text: str, guest: Optional[dict], booking: Optional[dict]) -> bool:
+        """Whether text contains guest or booking details other than the name, language and property."""
+        values = [part for part in ((guest or {}).get("name") or "").split()[1:]]
+        values += [value for field, value in (guest or {}).items()
+                   if field not in ("name", "preferred_language", "vip_status")]
+        for field, value in (booking or {}).items():
+            if field in ("guest_id", "property_id", "property_name"):
+                continue
+            values.append(value)
+            try:
+                moment = datetime.fromisoformat(str(value))
+            except ValueError:
+                continue
+            values += [moment.date().isoformat(), f"{moment:%B} {moment.day}", f"{moment.day} {moment:%B}"]
+        text = text.casefold()
+        return any(len(str(value)) >= 3 and str(value).casefold() in text for value in values)
 
 # ----------------------------------------------------------------------------
 # Service Instances
 # ----------------------------------------------------------------------------
 
+def create_guest_service():
+    """Build the configured guest data backend ("json" or "postgres")."""
+    if GUEST_DATA_BACKEND == "postgres":
+        logger.info("Using PostgreSQL guest data backend")
+        return PostgresGuestService(
+            DATABASE_URL,
+            cache_ttl_seconds=GUEST_CACHE_TTL_SECONDS,
+            cache_max_entries=GUEST_CACHE_MAX_ENTRIES,
+            pool_min_size=DATABASE_POOL_MIN_SIZE,
+            pool_max_size=DATABASE_POOL_MAX_SIZE,
+        )
+    return GuestService()
+
+def create_intent_router() -> Optional[IntentRouter]:
+    """Build the intent router, or None when it is disabled."""
+    if not INTENT_ROUTER_ENABLED:
+        return None
+    logger.info(f"Intent router enabled with examples from {INTENT_ROUTER_EXAMPLES}")
+    return IntentRouter.from_file(INTENT_ROUTER_EXAMPLES, min_similarity=INTENT_ROUTER_MIN_SIMILARITY,
+                                  min_margin=INTENT_ROUTER_MIN_MARGIN)
+
+def create_tool_selector(tools: list) -> Optional[ToolSelector]:
+    """Build the per-turn tool selector, or None when every tool is offered on every turn."""
+    if not TOOL_SELECTION_ENABLED:
+        return None
+    logger.info(f"Tool selection enabled: core {TOOL_SELECTION_CORE_TOOLS} plus top {TOOL_SELECTION_TOP_K}")
+    return ToolSelector.from_file(TOOL_SELECTION_EXAMPLES, [tool.name for tool in tools],
+                                  {tool.name: tool.description for tool in tools},
+                                  core=TOOL_SELECTION_CORE_TOOLS, top_k=TOOL_SELECTION_TOP_K,
+                                  min_similarity=TOOL_SELECTION_MIN_SIMILARITY)
+
+request_tracer = RequestTracer(enabled=TRACING_ENABLED, window_size=LATENCY_WINDOW_SIZE)
 vector_store = VectorStoreService()
-guest_service = GuestService()
+guest_service = create_guest_service()
 memory_service = MemoryService()
-
-# ----------------------------------------------------------------------------
-# Tool Creation (moved to tools.py)
-# ----------------------------------------------------------------------------
+escalation_notifier = EscalationNotifier(ESCALATION_WEBHOOK_URL, ESCALATION_WEBHOOK_TIMEOUT_SECONDS)
+tool_registry = GuestToolRegistry(guest_service, vector_store, escalation_notifier)
+agent_cache = AgentCache()
+intent_router = create_intent_router()
+tool_selector = create_tool_selector(tool_registry.tools)
+prompt_cache = PromptCache(core_tools=tool_selector.core_tools if tool_selector is not None else None)
+response_cache = ResponseCache() if RESPONSE_CACHE_ENABLED else None
+guest_service.add_reload_listener(lambda change: prompt_cache.invalidate(change.guest_ids))
+guest_service.add_reload_listener(lambda change: agent_cache.evict_phones(change.phones))
+memory_service.add_expiry_listener(agent_cache.evict_phone)
 
 # ----------------------------------------------------------------------------
 # Agent Creation
 # ----------------------------------------------------------------------------
 
-def create_agent(phone: str, custom_prompt: Optional[str] = None):
-    """Create a personalized agent for a specific guest."""
+def create_agent(phone: str, custom_prompt: Optional[str] = None,
+                 tool_names: Optional[Tuple[str, ...]] = None):
+    """Create a personalized agent for a specific guest, offering the model only ``tool_names`` if given."""
+    with request_tracer.span("agent_build"):
+        return _build_agent(phone, custom_prompt, tool_names)
+
+def _build_agent(phone: str, custom_prompt: Optional[str] = None,
+                 tool_names: Optional[Tuple[str, ...]] = None) -> AgentExecutor:
     try:
-        guest = guest_service.get_guest(phone)
-        booking = None
+        guest, booking = guest_service.get_guest_and_booking(phone)
         
-        if guest and "guest_id" in guest:
-            booking = guest_service.get_booking(guest["guest_id"])
+        # Personalized system prompt, rendered once per guest/booking version
+        prompt = prompt_cache.get_prompt(guest, booking, guest_service.get_version(phone), custom_prompt)
         
-        # Create personalized system prompt
-        guest_context = format_guest_context(guest, booking)
-        property_name = get_property_name_from_booking(booking)
-        base_prompt = get_base_system_prompt(guest_context, property_name)
-        final_prompt = combine_prompts(base_prompt, custom_prompt)
-        
-        # Create guest-specific tools and agent
-        tools = create_guest_tools(phone, guest_service, vector_store)
-        llm = ChatAnthropic(
-            model=CLAUDE_MODEL,
-            anthropic_api_key=ANTHROPIC_API_KEY,
-            temperature=0
-        )
+        # Shared tools resolve the guest from the request context at call time. The
+        # model is offered the selected subset; the executor can still run any tool.
+        tools = tool_registry.tools
+        offered = tool_registry.get_definitions(tool_names)
+        if tool_names is not None and tool_selector is not None and PROMPT_CACHING_ENABLED:
+            # Selected subsets all start with the core tools: a breakpoint after them
+            # keeps that prefix cached whichever other tools a turn adds
+            last_core = len(tool_selector.core_tools) - 1
+            if last_core >= 0:
+                offered[last_core] = {**offered[last_core], "cache_control": {"type": "ephemeral"}}
+        llm = get_shared_llm()
         
-        logger.info(f"Creating agent for phone: {phone}, guest found: {guest is not None}")
+        logger.info(f"Creating agent for phone: {phone}, guest found: {guest is not None}, "
+                    f"offering {len(offered)} tools")
         
-        # Modern tool-calling agent for Claude native function calling
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", final_prompt + "\n\nCRITICAL: Use EXACTLY ONE tool per request unless the guest asks multiple distinct questions. STOP after using one tool."),
-            ("placeholder", "{chat_history}"),
-            ("human", "{input}"),
-            ("placeholder", "{agent_scratchpad}"),
-        ])
-        
-        agent = create_tool_calling_agent(llm, tools, prompt)
-        return AgentExecutor(
+        # Modern tool-calling agent for Claude native function calling, bound to
+        # the pre-converted tool definitions
+        agent = create_tool_calling_agent(llm, offered, prompt)
+        # Tool calls from one model turn run concurrently: gathered by the async
+        # path, on tool_thread_pool in "thread" mode
+        return ConcurrentAgentExecutor(
             agent=agent, 
             tools=tools, 
+            tool_executor=tool_thread_pool,
             memory=memory_service.get_memory(phone),
             verbose=False,  # Disable verbose to improve performance
             handle_parsing_errors=True,
@@ -270,6 +1070,344 @@ def create_agent(phone: str, custom_prompt: Optional[str] = None):
         logger.error(f"Error creating agent for phone {phone}: {e}")
         raise
 
+def get_agent(phone: str, custom_prompt: Optional[str] = None,
+              tool_names: Optional[Tuple[str, ...]] = None) -> AgentExecutor:
+    """Return the cached agent for a guest and tool subset, building it on a cache miss."""
+    key = AgentCache.make_key(phone, custom_prompt, guest_service.get_version(phone), tool_names)
+    memory = memory_service.get_memory(phone)
+    agent = agent_cache.get(key)
+    
+    # A cached agent is only reusable while it still holds the live session memory
+    if agent is not None and agent.memory is memory:
+        return agent
+    
+    agent = create_agent(phone, custom_prompt, tool_names)
+    agent_cache.set(key, agent)
+    return agent
+
+# ----------------------------------------------------------------------------
+# Agent Execution
+# ----------------------------------------------------------------------------
+
+# Bounds concurrent agent runs per worker so a traffic spike queues instead of
+# opening an unbounded number of LLM calls
+agent_semaphore = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+agent_thread_pool = ThreadPoolExecutor(max_workers=AGENT_MAX_CONCURRENCY, thread_name_prefix="agent")
+tool_thread_pool = ThreadPoolExecutor(max_workers=TOOL_MAX_CONCURRENCY, thread_name_prefix="tool")
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# Streamed agent turns still running, kept referenced until they finish
+streamed_turns: "set[asyncio.Task]" = set()
+_TURN_END = object()
+# Agent runs holding a slot and waiting for one, for /debug/status
+agent_runs = {"running": 0, "waiting": 0}
+
+def get_session_lock(phone: str) -> asyncio.Lock:
+    """Get the lock serializing turns of one guest's conversation."""
+    lock = _session_locks.get(phone)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[phone] = lock
+    return lock
+
+@asynccontextmanager
+async def agent_slot():
+    """Hold one of the worker's AGENT_MAX_CONCURRENCY agent slots, counting runs in flight."""
+    agent_runs["waiting"] += 1
+    try:
+        await agent_semaphore.acquire()
+    finally:
+        agent_runs["waiting"] -= 1
+    agent_runs["running"] += 1
+    try:
+        yield
+    finally:
+        agent_runs["running"] -= 1
+        agent_semaphore.release()
+
+def agent_callbacks(callbacks: Optional[list] = None) -> list:
+    """Callbacks for one agent run, plus LLM and tool spans when tracing is enabled."""
+    callbacks = list(callbacks or [])
+    if request_tracer.enabled:
+        callbacks.append(TracingCallbackHandler(request_tracer))
+    return callbacks
+
+async def save_turn(phone: str, message: str, reply: str):
+    """Record an exchange answered without the agent in the guest's session memory."""
+    async with memory_service.turn(phone):
+        memory = await memory_service.sync(phone)
+        memory.save_context({"input": message}, {"output": reply})
+        await memory_service.persist(phone)
+
+async def response_cache_key(phone: str, message: str, custom_prompt: Optional[str] = None) -> tuple:
+    """Response cache key for a guest's message, given the last reply in their session."""
+    guest, booking = guest_service.get_guest_and_booking(phone)
+    async with get_session_lock(phone):
+        memory = await memory_service.sync(phone)
+    previous_reply = next((agent_response_text(m.content) for m in reversed(memory.chat_memory.messages)
+                           if m.type == "ai"), None)
+    index_version = vector_store.index_version(booking["property_id"]) if booking and booking.get("property_id") else ""
+    return response_cache.make_key(guest, booking, custom_prompt, previous_reply, message, index_version)
+
+async def answer_directly(phone: str, message: str,
+                          custom_prompt: Optional[str] = None) -> Optional[Tuple[str, RouteDecision]]:
+    """
+    Answer a pure profile or booking lookup from the guest data without the agent.
+    
+    Returns (reply, decision), or None when the router is disabled, a custom
+    prompt is set, or the message is not a confident lookup. The exchange is
+    saved to the session memory like an agent turn.
+    """
+    if intent_router is None or custom_prompt:
+        return None
+    with request_tracer.span("routing"):
+        decision = intent_router.classify(message)
+        if decision.tool is None:
+            return None
+        guest, booking = guest_service.get_guest_and_booking(phone)
+        reply = intent_router.answer(decision.intent, guest, booking)
+    if reply is None:
+        return None
+    await save_turn(phone, message, reply)
+    ROUTER_ANSWERS.labels(decision.intent).inc()
+    logger.info(f"Answered {decision.intent} lookup for {phone} without the agent (score {decision.score})")
+    return reply, decision
+
+async def select_tools(phone: str, message: str) -> Optional[Tuple[str, ...]]:
+    """
+    Tools to offer the agent for a guest's message, or None to offer all of them.
+    
+    Tools are matched against the message and the guest's previous message, so
+    a follow-up like "3 PM please" keeps the tool the last turn was about.
+    """
+    if tool_selector is None:
+        return None
+    async with get_session_lock(phone):
+        memory = await memory_service.sync(phone)
+    previous = next((m.content for m in reversed(memory.chat_memory.messages)
+                     if m.type == "human" and isinstance(m.content, str)), None)
+    with request_tracer.span("tool_selection"):
+        return tool_selector.select(message, previous)
+
+async def run_agent(agent: AgentExecutor, phone: str, message: str, callbacks: Optional[list] = None) -> dict:
+    """Run an agent turn without blocking the event loop."""
+    config = {"callbacks": agent_callbacks(callbacks)}
+    # Turns for the same guest share one memory object, so they must not interleave
+    async with memory_service.turn(phone), agent_slot():
+        await memory_service.sync(phone)
+        with guest_context(phone):
+            if AGENT_EXECUTION_MODE == "thread":
+                # Carry the guest context into the worker thread
+                context = contextvars.copy_context()
+                loop = asyncio.get_running_loop()
+                invoke = partial(agent.invoke, {"input": message}, config)
+                result = await loop.run_in_executor(agent_thread_pool, context.run, invoke)
+            else:
+                result = await agent.ainvoke({"input": message}, config)
+        await memory_service.persist(phone)
+        return result
+
+async def stream_agent(agent: AgentExecutor, phone: str, message: str,
+                       callbacks: Optional[list] = None) -> AsyncIterator[dict]:
+    """
+    Run an agent turn, yielding LangChain v2 stream events as they happen.
+    Streaming always runs on the event loop, whatever AGENT_EXECUTION_MODE is.
+    
+    The turn runs in its own task and hands events over one at a time, so a
+    slow reader still pauses it. A reader that stops early, such as a client
+    that disconnects, does not cut it short: the turn finishes unobserved, and
+    its exchange is saved to the session memory and persisted, with the session
+    lock released, like any other.
+    """
+    config = {"callbacks": agent_callbacks(callbacks)}
+    handoff: "asyncio.Queue" = asyncio.Queue(maxsize=1)
+    reader_gone = asyncio.Event()
+    
+    async def deliver(item):
+        if not reader_gone.is_set():
+            await handoff.put(item)
+    
+    async def run_turn():
+        try:
+            async with memory_service.turn(phone), agent_slot():
+                await memory_service.sync(phone)
+                try:
+                    with guest_context(phone):
+                        async for event in agent.astream_events({"input": message}, config, version="v2"):
+                            await deliver(event)
+                finally:
+                    await memory_service.persist(phone)
+        except Exception as e:
+            await deliver(e)
+        finally:
+            await deliver(_TURN_END)
+    
+    task = asyncio.create_task(run_turn())
+    streamed_turns.add(task)
+    task.add_done_callback(streamed_turns.discard)
+    try:
+        while (item := await handoff.get()) is not _TURN_END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        reader_gone.set()
+        # Unblock a turn waiting to hand over an event nobody will read
+        while not handoff.empty():
+            handoff.get_nowait()
+
+async def stream_reply(agent: AgentExecutor, phone: str, message: str) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Run an agent turn as (event, data) pairs for streaming clients: tool_start and
+    tool_end around each tool call, token for each piece of reply text, then done
+    with the full response and tools_used, or error.
+    """
+    token_usage = TokenUsageTracker()
+    tool_usage = ToolUsageTracker()
+    output = None
+    try:
+        async with aclosing(stream_agent(agent, phone, message, callbacks=[token_usage, tool_usage])) as events:
+            async for event in events:
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    text = chunk_text(event["data"]["chunk"].content)
+                    if text:
+                        yield "token", {"text": text}
+                elif kind == "on_tool_start":
+                    yield "tool_start", {"tool": event["name"], "input": event["data"].get("input")}
+                elif kind == "on_tool_end":
+                    result = event["data"].get("output")
+                    yield "tool_end", {"tool": event["name"], "output": str(getattr(result, "content", result))}
+                elif kind == "on_chain_end" and not event["parent_ids"]:
+                    output = event["data"].get("output")
+    except Exception as e:
+        logger.error(f"Agent stream error: {e}", exc_info=True)
+        yield "error", {"detail": "I'm sorry, I'm experiencing technical difficulties. Please try again."}
+        return
+    finally:
+        record_agent_run(token_usage, tool_usage)
+    
+    logger.info(f"Agent response streamed successfully. Tools used: {tool_usage.tools_used}")
+    yield "done", {
+        "response": agent_response_text(output.get("output") if isinstance(output, dict) else output),
+        "session_id": phone,
+        "tools_used": tool_usage.tools_used,
+        "debug_info": {"token_usage": token_usage.summary(), "tool_calls": tool_usage.summary()},
+    }
+
+async def direct_reply_events(phone: str, reply: str, decision: RouteDecision) -> AsyncIterator[Tuple[str, dict]]:
+    """A router answer as the same (event, data) pairs stream_reply produces."""
+    yield "token", {"text": reply}
+    yield "done", {
+        "response": reply,
+        "session_id": phone,
+        "tools_used": [decision.tool],
+        "debug_info": {"router": decision._asdict()},
+    }
+
+def agent_response_text(output) -> str:
+    """Reply text from an agent output, which may be a string or a list of content blocks."""
+    if isinstance(output, list) and len(output) > 0:
+        if isinstance(output[0], dict) and "text" in output[0]:
+            return output[0]["text"]
+        return str(output[0])
+    if isinstance(output, str):
+        return output
+    return str(output)
+
+def chunk_text(content) -> str:
+    """Text in a streamed model chunk, skipping tool-call argument deltas."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content
+                   if isinstance(block, dict) and block.get("type") in ("text", "text_delta"))
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+# ----------------------------------------------------------------------------
+# Conversation Channels
+# ----------------------------------------------------------------------------
+
+class ConversationChannel:
+    """
+    One guest's WebSocket connection.
+    
+    Holds the guest's agent for the life of the connection and rebuilds it only
+    when the guest's records, the custom prompt or the session memory change.
+    Outgoing frames go through a bounded queue drained by a sender task: when
+    the client reads slowly the queue fills and the agent's stream pauses
+    instead of buffering without limit, and a client that stops reading for
+    WS_SEND_TIMEOUT_SECONDS is disconnected.
+    """
+    
+    def __init__(self, websocket: WebSocket, phone: str):
+        self.websocket = websocket
+        self.phone = phone
+        self.agent: Optional[AgentExecutor] = None
+        self.agent_key: Optional[tuple] = None
+        self.outbox: "asyncio.Queue[str]" = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.turns = 0
+        self.agents_built = 0
+    
+    async def get_agent(self, custom_prompt: Optional[str], message: str) -> AgentExecutor:
+        """The connection's agent, re-resolved only if its cache key, offered tools or memory changed."""
+        await guest_service.prefetch(self.phone)
+        tool_names = await select_tools(self.phone, message)
+        key = AgentCache.make_key(self.phone, custom_prompt, guest_service.get_version(self.phone), tool_names)
+        if self.agent is None or key != self.agent_key or self.agent.memory is not memory_service.get_memory(self.phone):
+            self.agent = get_agent(self.phone, custom_prompt, tool_names)
+            self.agent_key = key
+            self.agents_built += 1
+        return self.agent
+    
+    async def push(self, event: str, data: dict):
+        """Queue a frame for the client, waiting while the queue is full."""
+        await self.outbox.put(json.dumps({"event": event, **data}, default=str, ensure_ascii=False))
+    
+    async def send_loop(self):
+        """Drain the outbox to the socket; returns when the client goes away or stops reading."""
+        try:
+            while True:
+                payload = await self.outbox.get()
+                await asyncio.wait_for(self.websocket.send_text(payload), WS_SEND_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Closing WebSocket for {self.phone}: client stopped reading")
+            await self.websocket.close(code=1013)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+    
+    async def run_turn(self, frame: dict):
+        """Handle one client message, pushing the streamed reply."""
+        message = frame.get("message") if isinstance(frame, dict) else None
+        if not isinstance(message, str) or not message.strip():
+            await self.push("error", {"detail": "Message cannot be empty"})
+            return
+        self.turns += 1
+        try:
+            await guest_service.prefetch(self.phone)
+            direct = await answer_directly(self.phone, message, frame.get("system_prompt"))
+            agent = None if direct else await self.get_agent(frame.get("system_prompt"), message)
+        except Exception as e:
+            logger.error(f"Error creating agent for phone {self.phone}: {e}", exc_info=True)
+            await self.push("error", {"detail": "I'm sorry, I'm experiencing technical difficulties. Please try again."})
+            return
+        replies = direct_reply_events(self.phone, *direct) if direct else stream_reply(agent, self.phone, message)
+        async with aclosing(replies):
+            async for event, data in replies:
+                await self.push(event, data)
+
+_channels: "weakref.WeakSet[ConversationChannel]" = weakref.WeakSet()
+
+def channel_stats() -> dict:
+    """Open WebSocket connections and their queued outgoing frames."""
+    channels = list(_channels)
+    return {
+        "connections": len(channels),
+        "queued_frames": sum(c.outbox.qsize() for c in channels),
+        "send_queue_size": WS_SEND_QUEUE_SIZE,
+    }
+
 # ----------------------------------------------------------------------------
 # API Endpoints
 # ----------------------------------------------------------------------------
@@ -284,7 +1422,7 @@ async def serve_frontend():
 async def get_all_guests():
     """Get all guest profiles."""
     try:
-        guests = list(guest_service.guests_by_phone.values())
+        guests = await guest_service.aall_guests()
         return guests
     except Exception as e:
         logger.error(f"Error retrieving guest profiles: {e}")
@@ -293,17 +1431,106 @@ async def get_all_guests():
 @app.get("/debug/status")
 async def debug_status():
     """Debug endpoint to check system status."""
+    await guest_service.prefetch_counts()
     return {
         "status": "ok",
-        "guests_loaded": len(guest_service.guests_by_phone),
-        "bookings_loaded": len(guest_service.bookings_by_guest),
+        "guests_loaded": guest_service.guest_count,
+        "bookings_loaded": guest_service.booking_count,
+        "guest_data": guest_service.stats(),
         "active_sessions": len(memory_service.memory_store),
-        "vector_store_ready": vector_store.retriever is not None
+        "memory": await memory_service.stats(),
+        "agent_cache": agent_cache.stats(),
+        "prompt_cache": prompt_cache.stats(),
+        "response_cache": response_cache.stats() if response_cache is not None else None,
+        "agent_execution": {
+            "mode": AGENT_EXECUTION_MODE,
+            "max_concurrency": AGENT_MAX_CONCURRENCY,
+            "running": agent_runs["running"],
+            "waiting": agent_runs["waiting"],
+            "available_slots": AGENT_MAX_CONCURRENCY - agent_runs["running"],
+        },
+        "llm_pool": get_pool_stats(),
+        "websockets": channel_stats(),
+        "vector_store_ready": vector_store.is_ready,
+        "property_query_cache": vector_store.query_cache.stats(),
+        "embedding_cache": vector_store.embedding_cache_stats(),
+        "startup_timings": {**startup_timings, "vector_store": vector_store.startup_timings},
+    }
+
+@app.get("/debug/latency")
+async def debug_latency():
+    """Rolling p50/p95/p99 latency per request stage and per tool, for this worker."""
+    return request_tracer.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics, aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set."""
+    try:
+        await memory_service.report_count()
+    except Exception as e:
+        logger.error(f"Failed to count sessions for metrics: {e}")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the worker is up and serving requests."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: the worker has finished warming its dependencies."""
+    await guest_service.prefetch_counts()
+    ready = vector_store.is_ready and guest_service.guest_count > 0
+    body = {
+        "status": "ready" if ready else "starting",
+        "vector_store_ready": vector_store.is_ready,
+        "guests_loaded": guest_service.guest_count,
+        "startup_timings": {**startup_timings, "vector_store": vector_store.startup_timings},
+    }
+    if vector_store.init_error:
+        body["vector_store_error"] = vector_store.init_error
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+@app.post("/admin/properties/{property_id}/reindexed")
+async def property_reindexed(property_id: str):
+    """Invalidate cached property lookups after scripts/index_property.py re-indexes a property."""
+    removed = await asyncio.to_thread(vector_store.invalidate_property, property_id)
+    if response_cache is not None:
+        removed += response_cache.invalidate_property(property_id)
+    return {"status": "invalidated", "property_id": property_id, "entries_removed": removed}
+
+@app.post("/admin/guests/reload")
+async def reload_guest_data():
+    """
+    Reload guest data in this worker now: re-read guests.json and bookings.json,
+    or drop the PostgreSQL read-through cache. Other workers pick file changes up
+    from their watcher within GUEST_DATA_WATCH_INTERVAL_SECONDS.
+    """
+    start = time.perf_counter()
+    change = await asyncio.to_thread(guest_service.reload)
+    if change is None:
+        raise HTTPException(status_code=500, detail="Failed to reload guest data; previous data kept")
+    await guest_service.prefetch_counts()
+    return {
+        "status": "reloaded",
+        "guests_loaded": guest_service.guest_count,
+        "bookings_loaded": guest_service.booking_count,
+        "changed_guests": len(change.guest_ids),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
     }
 
 @app.post("/message", response_model=MessageResponse)
 async def handle_message(request: MessageRequest):
-    """Handle chat message from guest."""
+    """Handle chat message from guest, reporting per-stage latency in a Server-Timing header."""
+    with request_tracer.request("POST /message") as timing:
+        reply = await answer_message(request)
+        with request_tracer.span("serialization"):
+            body = reply.model_dump_json()
+    return Response(content=body, media_type="application/json", headers=timing.headers())
+
+async def answer_message(request: MessageRequest) -> MessageResponse:
+    """Run the guest's agent on one message."""
     try:
         logger.info(f"Handling message from phone: {request.phone_number}")
         logger.info(f"Message: {request.message[:100]}...")  # Log first 100 chars
@@ -314,106 +1541,67 @@ async def handle_message(request: MessageRequest):
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        agent = create_agent(request.phone_number, request.system_prompt)
-        logger.info("Agent created successfully")
+        await guest_service.prefetch(request.phone_number)
+        direct = await answer_directly(request.phone_number, request.message, request.system_prompt)
+        if direct:
+            reply, decision = direct
+            return MessageResponse(
+                response=reply,
+                session_id=request.phone_number,
+                tools_used=[decision.tool],
+                debug_info={"router": decision._asdict()}
+            )
+        
+        cache_key = None
+        if response_cache is not None and not response_cache.bypasses(request.message):
+            cache_key = await response_cache_key(request.phone_number, request.message, request.system_prompt)
+            cached = response_cache.get(cache_key, guest_service.get_guest(request.phone_number))
+            RESPONSE_CACHE_LOOKUPS.labels("hit" if cached else "miss").inc()
+            if cached:
+                reply, tools_used = cached
+                await save_turn(request.phone_number, request.message, reply)
+                return MessageResponse(
+                    response=reply,
+                    session_id=request.phone_number,
+                    tools_used=tools_used,
+                    debug_info={"response_cache": "hit"}
+                )
+        
+        tool_names = await select_tools(request.phone_number, request.message)
+        agent = get_agent(request.phone_number, request.system_prompt, tool_names)
+        logger.info("Agent ready")
         
         # Try to invoke the agent with detailed error handling
+        token_usage = TokenUsageTracker()
+        tool_usage = ToolUsageTracker()
         try:
             logger.info("About to invoke agent...")
-            result = agent.invoke({"input": request.message})
+            result = await run_agent(agent, request.phone_number, request.message,
+                                     callbacks=[token_usage, tool_usage])
             logger.info(f"Agent invoke result type: {type(result)}")
             logger.info(f"Agent invoke result keys: {result.keys() if isinstance(result, dict) else 'Not a dict'}")
             
-            # Extract tools used from intermediate steps and response patterns
-            tools_used = []
+            # Tool calls are recorded by the ToolUsageTracker callback as they happen
+            tools_used = tool_usage.tools_used
             debug_info = {}
             
             if isinstance(result, dict):
-                # Extract intermediate steps to see which tools were called
-                if "intermediate_steps" in result:
-                    intermediate_steps = result["intermediate_steps"]
-                    logger.info(f"Intermediate steps: {len(intermediate_steps)} steps")
-                    
-                    for step in intermediate_steps:
-                        if isinstance(step, tuple) and len(step) >= 2:
-                            action, observation = step[0], step[1]
-                            if hasattr(action, 'tool'):
-                                tool_name = action.tool
-                                tools_used.append(tool_name)
-                                logger.info(f"Tool called: {tool_name}")
-                            elif hasattr(action, 'log'):
-                                # Try to extract tool name from log
-                                log_text = action.log.lower()
-                                all_tools = [
-                                    # Core tools
-                                    "guest_profile", "booking_details", "property_info", "schedule_cleaning", 
-                                    "modify_checkout_time", "request_transport", "escalate_to_manager",
-                                    # High-impact tools
-                                    "restaurant_reservation", "grocery_delivery", "maintenance_request", 
-                                    "activity_booking", "meal_delivery",
-                                    # Luxury tools
-                                    "spa_services", "private_chef", "local_recommendations"
-                                ]
-                                for tool in all_tools:
-                                    if tool in log_text:
-                                        tools_used.append(tool)
-                                        logger.info(f"Tool detected from log: {tool}")
-                                        break
-                
-                # Fallback: Analyze response patterns to detect likely tool usage
-                if "output" in result:
-                    response_text = str(result["output"]).lower()
-                    
-                    # Pattern-based tool detection (same as evaluation patterns)
-                    tool_patterns = {
-                        # CORE TOOLS
-                        "guest_profile": ["your name is", "you are", "vip guest", "carlos", "guest profile", "guest information"],
-                        "booking_details": ["check out", "check-out", "reservation", "booking", "room type", "confirmation", "villa azul"],
-                        "property_info": ["wifi", "pool", "gym", "amenities", "facilities", "restaurant", "spa", "property"],
-                        "schedule_cleaning": ["cleaning scheduled", "housekeeping", "cleaning team", "room cleaning"],
-                        "modify_checkout_time": ["checkout time", "checkout updated", "departure time", "late checkout"],
-                        "request_transport": ["transport requested", "arranged your transportation", "car has been", "pickup", "airport"],
-                        "escalate_to_manager": ["escalated", "property manager", "get back to you"],
-                        
-                        # HIGH-IMPACT TOOLS
-                        "restaurant_reservation": ["reservation for", "restaurant", "dining", "table booked", "secured a reservation"],
-                        "grocery_delivery": ["grocery delivery", "groceries", "arranged grocery", "food supplies", "beverage delivery"],
-                        "maintenance_request": ["reported", "maintenance", "repair", "broken", "not working", "issue"],
-                        "activity_booking": ["arranged", "activity", "tour", "experience", "excursion", "booked"],
-                        "meal_delivery": ["ordered", "meal", "food delivery", "restaurant delivery", "takeout"],
-                        
-                        # LUXURY TOOLS
-                        "spa_services": ["spa", "massage", "wellness", "relaxation", "therapeutic"],
-                        "private_chef": ["private chef", "chef", "culinary", "dining experience", "meal preparation"],
-                        "local_recommendations": ["recommend", "suggest", "local", "area", "best", "options"]
-                    }
-                    
-                    for tool_name, patterns in tool_patterns.items():
-                        for pattern in patterns:
-                            if pattern in response_text:
-                                tools_used.append(tool_name)
-                                logger.info(f"Tool detected from response pattern '{pattern}': {tool_name}")
-                                break
-                
                 debug_info = {
                     "result_keys": list(result.keys()) if isinstance(result, dict) else [],
                     "intermediate_steps_count": len(result.get("intermediate_steps", [])),
-                    "raw_result_type": str(type(result))
+                    "raw_result_type": str(type(result)),
+                    "token_usage": token_usage.summary(),
+                    "tool_calls": tool_usage.summary(),
                 }
                 
                 if "output" in result:
-                    output = result["output"]
-                    # Handle different response formats from modern agent
-                    if isinstance(output, list) and len(output) > 0:
-                        # Extract text from list format
-                        if isinstance(output[0], dict) and "text" in output[0]:
-                            response = output[0]["text"]
-                        else:
-                            response = str(output[0])
-                    elif isinstance(output, str):
-                        response = output
-                    else:
-                        response = str(output)
+                    response = agent_response_text(result["output"])
+                    if cache_key is not None:
+                        guest, booking = guest_service.get_guest_and_booking(request.phone_number)
+                        debug_info["response_cache"] = (
+                            "stored" if response_cache.store(cache_key, response, tool_usage, guest, booking)
+                            else "skipped"
+                        )
                 else:
                     logger.error(f"Unexpected agent result format: {result}")
                     response = "I apologize, but I'm having trouble processing your request right now."
@@ -426,15 +1614,15 @@ async def handle_message(request: MessageRequest):
             response = "I'm sorry, I'm experiencing technical difficulties. Please try again."
             tools_used = []
             debug_info = {"error": str(agent_error)}
+        finally:
+            record_agent_run(token_usage, tool_usage)
         
         logger.info(f"Agent response generated successfully. Tools used: {tools_used}")
         
-        memory_service.cleanup_expired()
-        
         return MessageResponse(
             response=response, 
             session_id=request.phone_number,
-            tools_used=list(set(tools_used)),  # Remove duplicates
+            tools_used=tools_used,
             debug_info=debug_info
         )
     except HTTPException:
@@ -443,10 +1631,89 @@ async def handle_message(request: MessageRequest):
         logger.error(f"Error handling message from {request.phone_number}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/message/stream")
+async def handle_message_stream(request: MessageRequest):
+    """
+    Handle chat message from guest, streaming the reply as Server-Sent Events.
+    
+    Events: ``tool_start`` and ``tool_end`` around each tool call, ``token`` for
+    each piece of reply text, then ``done`` with the full response and
+    tools_used, or ``error`` if the agent fails.
+    """
+    if not request.phone_number:
+        raise HTTPException(status_code=400, detail="Phone number is required")
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    logger.info(f"Streaming message from phone: {request.phone_number}")
+    try:
+        await guest_service.prefetch(request.phone_number)
+        direct = await answer_directly(request.phone_number, request.message, request.system_prompt)
+        if direct:
+            agent = None
+        else:
+            tool_names = await select_tools(request.phone_number, request.message)
+            agent = get_agent(request.phone_number, request.system_prompt, tool_names)
+    except Exception as e:
+        logger.error(f"Error handling message from {request.phone_number}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    
+    async def events():
+        if direct:
+            replies = direct_reply_events(request.phone_number, *direct)
+        else:
+            replies = stream_reply(agent, request.phone_number, request.message)
+        async with aclosing(replies):
+            async for event, data in replies:
+                yield sse_event(event, data)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.websocket("/ws/{phone}")
+async def conversation_socket(websocket: WebSocket, phone: str):
+    """
+    Conversation channel for one guest.
+    
+    Each client frame is JSON {"message": ..., "system_prompt": optional}. The
+    reply is pushed as JSON frames {"event": ..., ...} carrying the same events
+    as /message/stream. Turns are handled one at a time in arrival order.
+    """
+    await websocket.accept()
+    channel = ConversationChannel(websocket, phone)
+    _channels.add(channel)
+    sender = asyncio.create_task(channel.send_loop())
+    logger.info(f"WebSocket opened for phone: {phone}")
+    try:
+        while True:
+            receive = asyncio.create_task(websocket.receive_json())
+            done, _ = await asyncio.wait({receive, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if receive not in done:
+                receive.cancel()
+                break
+            turn = asyncio.create_task(channel.run_turn(receive.result()))
+            done, _ = await asyncio.wait({turn, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if turn not in done:
+                turn.cancel()
+                break
+            turn.result()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket error for {phone}: {e}", exc_info=True)
+    finally:
+        sender.cancel()
+        _channels.discard(channel)
+        logger.info(f"WebSocket closed for phone: {phone} after {channel.turns} turns")
+
 @app.get("/session/{phone}", response_model=SessionResponse)
 async def get_session(phone: str):
     """Get conversation session for a guest."""
     try:
+        await memory_service.load_session(phone)
         messages = memory_service.get_session_messages(phone)
         if not messages:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -454,6 +1721,8 @@ async def get_session(phone: str):
         return SessionResponse(
             session_id=phone,
             messages=[m.dict() for m in messages],
+            summary=memory_service.get_session_summary(phone),
+            history_size=memory_service.get_session_size(phone),
         )
     except HTTPException:
         raise
@@ -465,7 +1734,7 @@ async def get_session(phone: str):
 async def delete_session(phone: str):
     """Delete a guest's conversation session."""
     try:
-        memory_service.delete_session(phone)
+        await memory_service.delete_session(phone)
         return {"status": "deleted"}
     except Exception as e:
         logger.error(f"Error deleting session: {e}")
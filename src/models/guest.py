@@ -0,0 +1,217 @@
+"""
+Guest and booking records for the Omotenashi Hotel Concierge.
+Compact __slots__ records and an in-memory index with O(1) lookups by phone,
+guest ID and property, supporting multiple bookings per guest.
+"""
+
+import hashlib
+import json
+import re
+import sys
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """
+    Normalize a phone number to E.164-style "+<digits>".
+
+    Strips spaces and punctuation, treats a leading "00" as "+", and assumes
+    the US country code for bare 10-digit numbers.
+    """
+    if not phone:
+        return ""
+    phone = phone.strip()
+    digits = _NON_DIGITS.sub("", phone)
+    if phone.startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    if len(digits) == 10:
+        return f"+1{digits}"
+    return f"+{digits}"
+
+
+def record_version(guest: Dict[str, Any], bookings: List[Dict[str, Any]]) -> str:
+    """Digest of a guest's records, used to key per-guest caches."""
+    payload = json.dumps([guest, bookings], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class GuestDataChange(NamedTuple):
+    """Guests whose records were added, removed or modified by a reload."""
+    guest_ids: FrozenSet[str]
+    phones: FrozenSet[str]
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert an aware datetime to naive local time; naive values are returned
+    unchanged. Booking times are compared as naive local times, so one aware
+    value such as "2025-06-10T15:00:00Z" cannot break sorting or lookups.
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return local_naive(datetime.fromisoformat(value)) if value else None
+    except ValueError:
+        return None
+
+
+class Guest:
+    """Guest profile. Fields not modelled here are kept in ``extra``."""
+
+    __slots__ = ("guest_id", "name", "phone_number", "preferred_language", "vip_status", "extra")
+
+    FIELDS = ("guest_id", "name", "phone_number", "preferred_language", "vip_status")
+
+    def __init__(self, guest_id: str, name: str, phone_number: str, preferred_language: Optional[str] = None,
+                 vip_status: Optional[bool] = None, extra: Optional[Dict[str, Any]] = None):
+        self.guest_id = _intern(guest_id)
+        self.name = name
+        self.phone_number = phone_number
+        self.preferred_language = _intern(preferred_language)
+        self.vip_status = vip_status
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Guest":
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        return cls(data["guest_id"], data.get("name"), data.get("phone_number"),
+                   data.get("preferred_language"), data.get("vip_status"), extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The guest as the JSON record it was loaded from."""
+        data = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Booking:
+    """Stay at a property. Absent optional fields are None and omitted from to_dict()."""
+
+    __slots__ = ("guest_id", "property_id", "property_name", "check_in", "check_out",
+                 "special_requests", "extra")
+
+    FIELDS = ("guest_id", "property_id", "property_name", "check_in", "check_out", "special_requests")
+
+    def __init__(self, guest_id: str, property_id: str, property_name: Optional[str] = None,
+                 check_in: Optional[datetime] = None, check_out: Optional[datetime] = None,
+                 special_requests: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        self.guest_id = _intern(guest_id)
+        self.property_id = _intern(property_id)
+        self.property_name = _intern(property_name)
+        self.check_in = check_in
+        self.check_out = check_out
+        self.special_requests = special_requests
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Booking":
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        return cls(data["guest_id"], data.get("property_id"), data.get("property_name"),
+                   _parse_time(data.get("check_in")), _parse_time(data.get("check_out")),
+                   data.get("special_requests"), extra)
+
+    def is_active(self, at: datetime) -> bool:
+        return (self.check_in is None or self.check_in <= at) and (self.check_out is None or at < self.check_out)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The booking as the JSON record it was loaded from."""
+        data = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value.isoformat() if isinstance(value, datetime) else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class GuestIndex:
+    """
+    Immutable index over guests and bookings.
+
+    Guests are looked up by normalized phone or guest ID; bookings are kept per
+    guest and per property, sorted by check-in.
+    """
+
+    __slots__ = ("guests_by_id", "guest_id_by_phone", "bookings_by_guest", "bookings_by_property",
+                 "booking_count")
+
+    def __init__(self, guests: Iterable[Guest], bookings: Iterable[Booking]):
+        self.guests_by_id: Dict[str, Guest] = {}
+        self.guest_id_by_phone: Dict[str, str] = {}
+        for guest in guests:
+            self.guests_by_id[guest.guest_id] = guest
+            if guest.phone_number:
+                phone = normalize_phone(guest.phone_number)
+                # Share the record's string when it is already normalized
+                self.guest_id_by_phone[guest.phone_number if phone == guest.phone_number else phone] = guest.guest_id
+
+        by_guest: Dict[str, List[Booking]] = {}
+        by_property: Dict[str, List[Booking]] = {}
+        count = 0
+        for booking in bookings:
+            by_guest.setdefault(booking.guest_id, []).append(booking)
+            by_property.setdefault(booking.property_id, []).append(booking)
+            count += 1
+        self.bookings_by_guest: Dict[str, Tuple[Booking, ...]] = {
+            guest_id: tuple(sorted(items, key=_check_in_key)) for guest_id, items in by_guest.items()
+        }
+        self.bookings_by_property: Dict[str, Tuple[Booking, ...]] = {
+            property_id: tuple(sorted(items, key=_check_in_key)) for property_id, items in by_property.items()
+        }
+        self.booking_count = count
+
+    @classmethod
+    def from_records(cls, guests: Iterable[Dict[str, Any]], bookings: Iterable[Dict[str, Any]]) -> "GuestIndex":
+        return cls((Guest.from_dict(g) for g in guests), (Booking.from_dict(b) for b in bookings))
+
+    def __len__(self) -> int:
+        return len(self.guests_by_id)
+
+    def guest_by_phone(self, phone: str) -> Optional[Guest]:
+        guest_id = self.guest_id_by_phone.get(normalize_phone(phone))
+        return self.guests_by_id.get(guest_id) if guest_id is not None else None
+
+    def guest_by_id(self, guest_id: str) -> Optional[Guest]:
+        return self.guests_by_id.get(guest_id)
+
+    def bookings_for_guest(self, guest_id: str) -> Tuple[Booking, ...]:
+        return self.bookings_by_guest.get(guest_id, ())
+
+    def bookings_for_property(self, property_id: str) -> Tuple[Booking, ...]:
+        return self.bookings_by_property.get(property_id, ())
+
+    def active_booking(self, guest_id: str, at: Optional[datetime] = None) -> Optional[Booking]:
+        """
+        The guest's booking at time ``at`` (default now): the stay in progress,
+        else the next upcoming stay, else the most recent past stay.
+        """
+        bookings = self.bookings_by_guest.get(guest_id)
+        if not bookings:
+            return None
+        at = local_naive(at) or datetime.now()
+        position = bisect_right(bookings, at, key=_check_in_key)
+        if position and bookings[position - 1].is_active(at):
+            return bookings[position - 1]
+        if position < len(bookings):
+            return bookings[position]
+        return bookings[-1]
+
+
+def _check_in_key(booking: Booking) -> datetime:
+    return booking.check_in or datetime.min
@@ -0,0 +1,330 @@
+"""
+PostgreSQL guest repository for the Omotenashi Hotel Concierge.
+Serves guest profiles and bookings migrated by data/migrations/migration_strategy.py
+through the same interface as the JSON-backed GuestService.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src.models.guest import (
+    Booking, Guest, GuestDataChange, GuestIndex, local_naive, normalize_phone, record_version,
+)
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_GUEST_WITH_BOOKINGS_SQL = """
+    SELECT g.guest_id, g.name, g.phone_number, g.preferred_language, g.vip_status,
+           g.email, g.dietary_restrictions, g.accessibility_needs,
+           b.booking_id, b.property_id, p.property_name, b.check_in_date, b.check_out_date,
+           b.special_requests, b.room_type, b.number_of_guests, b.booking_status
+    FROM guests g
+    LEFT JOIN bookings b ON b.guest_id = g.guest_id AND b.booking_status <> 'cancelled'
+    LEFT JOIN properties p ON p.property_id = b.property_id
+    WHERE {where}
+    ORDER BY b.check_in_date
+"""
+
+# Statements are issued with identical text so asyncpg prepares each once per
+# pooled connection and reuses it from the connection's statement cache.
+# Phone numbers are stored normalized (the migration writes normalize_phone()
+# output and the schema checks for "+<digits>"), so the lookup compares the
+# column itself and uses its unique index.
+GUEST_BY_PHONE_SQL = _GUEST_WITH_BOOKINGS_SQL.format(where="g.phone_number = $1")
+GUEST_BY_ID_SQL = _GUEST_WITH_BOOKINGS_SQL.format(where="g.guest_id = $1")
+BOOKINGS_BY_PROPERTY_SQL = """
+    SELECT b.booking_id, b.guest_id, b.property_id, p.property_name, b.check_in_date, b.check_out_date,
+           b.special_requests, b.room_type, b.number_of_guests, b.booking_status
+    FROM bookings b
+    LEFT JOIN properties p ON p.property_id = b.property_id
+    WHERE b.property_id = $1 AND b.booking_status <> 'cancelled'
+    ORDER BY b.check_in_date
+"""
+ALL_GUESTS_SQL = """
+    SELECT guest_id, name, phone_number, preferred_language, vip_status,
+           email, dietary_restrictions, accessibility_needs
+    FROM guests ORDER BY guest_id
+"""
+COUNTS_SQL = """
+    SELECT (SELECT count(*) FROM guests),
+           (SELECT count(*) FROM bookings WHERE booking_status <> 'cancelled')
+"""
+
+_GUEST_EXTRA = ("email", "dietary_restrictions", "accessibility_needs")
+_BOOKING_EXTRA = ("booking_id", "room_type", "number_of_guests", "booking_status")
+
+
+class _GuestRecords(NamedTuple):
+    """One guest's profile and bookings as of ``loaded_at``; ``index`` is None for unknown guests."""
+    index: Optional[GuestIndex]
+    guest: Optional[Guest]
+    version: str
+    loaded_at: float
+
+
+def _extra(row: Any, names: Tuple[str, ...]) -> Dict[str, Any]:
+    return {name: row[name] for name in names if row[name] is not None}
+
+
+def _guest_from_row(row: Any) -> Guest:
+    return Guest(row["guest_id"], row["name"], row["phone_number"], row["preferred_language"],
+                 row["vip_status"], _extra(row, _GUEST_EXTRA))
+
+
+def _booking_from_row(row: Any, guest_id: str) -> Booking:
+    return Booking(guest_id, row["property_id"], row["property_name"], local_naive(row["check_in_date"]),
+                   local_naive(row["check_out_date"]), row["special_requests"], _extra(row, _BOOKING_EXTRA))
+
+
+class PostgresGuestService:
+    """
+    Guest profiles and bookings read from PostgreSQL.
+
+    Lookups go through a read-through cache of per-guest records (including
+    unknown phone numbers) that are re-read after ``cache_ttl_seconds``; a miss
+    runs one joined query on a pooled asyncpg connection. If the database is
+    unreachable, an expired entry is served rather than failing the request.
+
+    The pool runs on a private event loop thread so the synchronous accessors
+    used by tools and agent construction can be called from any thread. Async
+    request handlers call prefetch() first so those accessors hit the cache,
+    and prefetch_counts() before reading guest_count and booking_count, which
+    only ever serve the counts cached by it.
+    """
+
+    def __init__(self, database_url: str, cache_ttl_seconds: float = 30.0, cache_max_entries: int = 10_000,
+                 pool_min_size: int = 1, pool_max_size: int = 10, query_timeout: float = 5.0):
+        self.database_url = database_url
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.query_timeout = query_timeout
+        self._cache = LRUCache(max_size=cache_max_entries)
+        self._counts: Optional[Tuple[int, int, float]] = None
+        self._reload_listeners: List[Callable[[GuestDataChange], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+        self.queries = 0
+
+    # ------------------------------------------------------------------
+    # Event loop and pool
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="guest-db", daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def _get_pool(self):
+        async with self._pool_lock:
+            if self._pool is None:
+                # Imported lazily so the JSON-backed service works without asyncpg installed
+                import asyncpg
+                self._pool = await asyncpg.create_pool(
+                    self.database_url,
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    command_timeout=self.query_timeout,
+                )
+                logger.info(f"Guest database pool ready ({self.pool_min_size}-{self.pool_max_size} connections)")
+            return self._pool
+
+    async def _fetch(self, sql: str, *args) -> list:
+        pool = await self._get_pool()
+        self.queries += 1
+        return await pool.fetch(sql, *args)
+
+    def _submit(self, sql: str, *args):
+        return asyncio.run_coroutine_threadsafe(self._fetch(sql, *args), self._ensure_loop())
+
+    def _query(self, sql: str, *args) -> list:
+        """Run a query from synchronous code, on any thread."""
+        return self._submit(sql, *args).result(timeout=self.query_timeout * 2)
+
+    async def _aquery(self, sql: str, *args) -> list:
+        """Run a query from the caller's event loop without blocking it."""
+        return await asyncio.wait_for(asyncio.wrap_future(self._submit(sql, *args)), self.query_timeout * 2)
+
+    def close(self):
+        """Close the connection pool and stop the database thread."""
+        if self._loop is None:
+            return
+        if self._pool is not None:
+            asyncio.run_coroutine_threadsafe(self._pool.close(), self._loop).result(timeout=self.query_timeout * 2)
+            self._pool = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+
+    # ------------------------------------------------------------------
+    # Read-through cache
+    # ------------------------------------------------------------------
+
+    def _records_from_rows(self, rows: list) -> _GuestRecords:
+        now = time.monotonic()
+        if not rows:
+            return _GuestRecords(None, None, "unknown", now)
+        guest = _guest_from_row(rows[0])
+        bookings = [_booking_from_row(row, guest.guest_id) for row in rows if row["booking_id"] is not None]
+        index = GuestIndex([guest], bookings)
+        version = record_version(guest.to_dict(), [b.to_dict() for b in index.bookings_for_guest(guest.guest_id)])
+        return _GuestRecords(index, guest, version, now)
+
+    def _store(self, key: tuple, records: _GuestRecords) -> _GuestRecords:
+        self._cache.set(key, records)
+        if records.guest is not None:
+            self._cache.set(("id", records.guest.guest_id), records)
+            if records.guest.phone_number:
+                self._cache.set(("phone", normalize_phone(records.guest.phone_number)), records)
+        return records
+
+    def _cached(self, key: tuple) -> Tuple[Optional[_GuestRecords], bool]:
+        """The cached records for key and whether they are still fresh."""
+        records = self._cache.get(key)
+        if records is None:
+            return None, False
+        return records, time.monotonic() - records.loaded_at < self.cache_ttl_seconds
+
+    def _lookup(self, key: tuple, sql: str) -> _GuestRecords:
+        records, fresh = self._cached(key)
+        if fresh:
+            return records
+        try:
+            return self._store(key, self._records_from_rows(self._query(sql, key[1])))
+        except Exception as e:
+            if records is None:
+                raise
+            logger.warning(f"Guest database unavailable, serving cached records for {key[0]} lookup: {e}")
+            return records
+
+    def _by_phone(self, phone_number: str) -> _GuestRecords:
+        return self._lookup(("phone", normalize_phone(phone_number)), GUEST_BY_PHONE_SQL)
+
+    def _by_id(self, guest_id: str) -> _GuestRecords:
+        return self._lookup(("id", guest_id), GUEST_BY_ID_SQL)
+
+    async def prefetch(self, phone_number: str):
+        """Load a guest's records into the cache without blocking the event loop."""
+        key = ("phone", normalize_phone(phone_number))
+        records, fresh = self._cached(key)
+        if fresh:
+            return
+        try:
+            self._store(key, self._records_from_rows(await self._aquery(GUEST_BY_PHONE_SQL, key[1])))
+        except Exception as e:
+            if records is None:
+                raise
+            logger.warning(f"Guest database unavailable, serving cached records: {e}")
+
+    # ------------------------------------------------------------------
+    # GuestService interface
+    # ------------------------------------------------------------------
+
+    def add_reload_listener(self, listener: Callable[[GuestDataChange], None]):
+        """Register a callback invoked with the affected guests after a reload."""
+        self._reload_listeners.append(listener)
+
+    def reload(self) -> Optional[GuestDataChange]:
+        """Drop the read-through cache so the next lookups read the database."""
+        guest_ids, phones = set(), set()
+
+        def collect(key: tuple) -> bool:
+            # Found guests are cached under both their ID and phone keys
+            (guest_ids if key[0] == "id" else phones).add(key[1])
+            return True
+
+        self._cache.pop_where(collect)
+        if self._counts is not None:
+            # Stale but kept, so a failed recount does not report an empty database
+            self._counts = (*self._counts[:2], float("-inf"))
+        change = GuestDataChange(frozenset(guest_ids), frozenset(phones))
+        if change.guest_ids:
+            for listener in self._reload_listeners:
+                try:
+                    listener(change)
+                except Exception as e:
+                    logger.error(f"Guest reload listener failed: {e}")
+        return change
+
+    async def prefetch_counts(self):
+        """Refresh the cached guest and booking counts without blocking the event loop."""
+        if self._counts is not None and time.monotonic() - self._counts[2] < self.cache_ttl_seconds:
+            return
+        try:
+            guests, bookings = (await self._aquery(COUNTS_SQL))[0]
+            self._counts = (guests, bookings, time.monotonic())
+        except Exception as e:
+            logger.error(f"Cannot count guests and bookings: {e}")
+
+    @property
+    def guest_count(self) -> int:
+        """Guests as of the last prefetch_counts(); 0 before the first."""
+        return self._counts[0] if self._counts else 0
+
+    @property
+    def booking_count(self) -> int:
+        """Bookings as of the last prefetch_counts(); 0 before the first."""
+        return self._counts[1] if self._counts else 0
+
+    def all_guests(self) -> List[dict]:
+        """Every guest profile."""
+        return [_guest_from_row(row).to_dict() for row in self._query(ALL_GUESTS_SQL)]
+
+    async def aall_guests(self) -> List[dict]:
+        """Every guest profile, without blocking the event loop."""
+        return [_guest_from_row(row).to_dict() for row in await self._aquery(ALL_GUESTS_SQL)]
+
+    def get_guest(self, phone_number: str) -> Optional[dict]:
+        """Get guest by phone number (any common formatting)."""
+        guest = self._by_phone(phone_number).guest
+        return guest.to_dict() if guest else None
+
+    def get_booking(self, guest_id: str, at: Optional[datetime] = None) -> Optional[dict]:
+        """Get the guest's booking at a time (default now); see GuestIndex.active_booking."""
+        index = self._by_id(guest_id).index
+        booking = index.active_booking(guest_id, at) if index else None
+        return booking.to_dict() if booking else None
+
+    def get_bookings(self, guest_id: str) -> List[dict]:
+        """Every booking of a guest, by check-in."""
+        index = self._by_id(guest_id).index
+        return [b.to_dict() for b in index.bookings_for_guest(guest_id)] if index else []
+
+    def get_property_bookings(self, property_id: str) -> List[dict]:
+        """Every booking at a property, by check-in."""
+        rows = self._query(BOOKINGS_BY_PROPERTY_SQL, property_id)
+        return [_booking_from_row(row, row["guest_id"]).to_dict() for row in rows]
+
+    def get_guest_and_booking(self, phone_number: str) -> Tuple[Optional[dict], Optional[dict]]:
+        """Resolve a guest and their current booking in one lookup."""
+        records = self._by_phone(phone_number)
+        if records.guest is None:
+            return None, None
+        booking = records.index.active_booking(records.guest.guest_id)
+        return records.guest.to_dict(), booking.to_dict() if booking else None
+
+    def get_version(self, phone_number: str) -> str:
+        """Digest of the guest's records plus which booking is current; see GuestService.get_version."""
+        records = self._by_phone(phone_number)
+        if records.guest is None:
+            return "unknown"
+        bookings = records.index.bookings_for_guest(records.guest.guest_id)
+        booking = records.index.active_booking(records.guest.guest_id)
+        position = bookings.index(booking) if booking else -1
+        return f"{records.version}.{position}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "postgres", "queries": self.queries, "cache": self._cache.stats()}
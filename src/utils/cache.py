@@ -0,0 +1,336 @@
+"""
+In-process caching utilities for the Omotenashi Hotel Concierge.
+Provides a thread-safe LRU cache with idle-TTL eviction and hit/miss counters,
+a semantic cache that also matches near-duplicate queries by embedding, and a
+heap-based expiry scheduler for idle sessions.
+"""
+
+import heapq
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with optional idle-TTL eviction.
+
+    Entries are evicted when the cache grows past ``max_size`` (least recently
+    used first) or when they have not been accessed for ``ttl_seconds``.
+    An optional ``on_evict`` callback receives ``(key, value)`` for every
+    entry removed by size or TTL eviction.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: Optional[float] = None,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, refreshing its recency."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self.ttl_seconds is not None and now - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                expired = entry[0]
+            else:
+                entry[1] = now
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        self._notify_evicted([(key, expired)])
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting the least recently used entries."""
+        evicted = []
+        with self._lock:
+            self._entries[key] = [value, time.monotonic()]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                evicted.append(self._entries.popitem(last=False))
+                self.evictions += 1
+        self._notify_evicted([(k, entry[0]) for k, entry in evicted])
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key without counting it as an eviction."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches predicate. Returns the count removed."""
+        with self._lock:
+            keys = [k for k in self._entries if predicate(k)]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def evict_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Evict every entry whose key matches predicate, counting evictions. Returns the count evicted."""
+        with self._lock:
+            evicted = [(k, entry[0]) for k, entry in self._entries.items() if predicate(k)]
+            for k, _ in evicted:
+                del self._entries[k]
+            self.evictions += len(evicted)
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def expire(self) -> int:
+        """Evict all entries idle for longer than the TTL. Returns the count evicted."""
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = time.monotonic() - self.ttl_seconds
+        evicted = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[1] < cutoff:
+                    del self._entries[key]
+                    evicted.append((key, entry[0]))
+            self.evictions += len(evicted)
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def clear(self):
+        """Drop every entry and keep the counters."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for status endpoints."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _notify_evicted(self, evicted):
+        if self.on_evict is None:
+            return
+        for key, value in evicted:
+            self.on_evict(key, value)
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query for exact matching: lowercase, no punctuation, single spaces."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class SemanticCache:
+    """
+    Namespaced query-result cache with an exact-match tier and a near-duplicate tier.
+
+    Each namespace (e.g. a property) holds at most ``max_entries`` results keyed by
+    normalized query text, with LRU and TTL eviction. Lookups that miss the exact
+    tier can fall back to the most similar cached query embedding whose cosine
+    similarity reaches ``similarity_threshold``.
+    """
+
+    def __init__(self, max_entries: int = 256, max_namespaces: int = 1024,
+                 ttl_seconds: Optional[float] = 3600, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # namespace -> normalized query -> [value, unit vector or None, last access]
+        self._namespaces: "OrderedDict[Hashable, OrderedDict[str, List[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_exact(self, namespace: Hashable, query: str) -> Any:
+        """Return the value cached for the normalized query, or None."""
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None or self._expired(entry, now):
+                if entry is not None:
+                    del entries[key]
+                    self.evictions += 1
+                return None
+            entry[2] = now
+            entries.move_to_end(key)
+            self._namespaces.move_to_end(namespace)
+            self.exact_hits += 1
+            return entry[0]
+
+    def get_similar(self, namespace: Hashable, vector: Sequence[float]) -> Any:
+        """
+        Return the value of the most similar cached query, or None.
+        Counts a miss when nothing clears the similarity threshold.
+        """
+        query_vector = self._unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            best_key, best_score = None, self.similarity_threshold
+            for key, entry in list((entries or {}).items()):
+                if self._expired(entry, now):
+                    del entries[key]
+                    self.evictions += 1
+                    continue
+                if entry[1] is None:
+                    continue
+                score = float(np.dot(query_vector, entry[1]))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                self.misses += 1
+                return None
+            entry = entries[best_key]
+            entry[2] = now
+            entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return entry[0]
+
+    def set(self, namespace: Hashable, query: str, value: Any, vector: Optional[Sequence[float]] = None):
+        """Cache a value for a query, with its embedding for near-duplicate matching."""
+        unit = self._unit(vector) if vector is not None else None
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if entries is None:
+                entries = self._namespaces[namespace] = OrderedDict()
+                while len(self._namespaces) > self.max_namespaces:
+                    _, dropped = self._namespaces.popitem(last=False)
+                    self.evictions += len(dropped)
+            self._namespaces.move_to_end(namespace)
+            key = normalize_query(query)
+            entries[key] = [value, unit, time.monotonic()]
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: Hashable) -> int:
+        """Drop every cached result in a namespace. Returns the count removed."""
+        with self._lock:
+            entries = self._namespaces.pop(namespace, None)
+            self.invalidations += 1
+        return len(entries) if entries else 0
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every namespace matching predicate. Returns the count of results removed."""
+        with self._lock:
+            namespaces = [ns for ns in self._namespaces if predicate(ns)]
+            removed = sum(len(self._namespaces.pop(ns)) for ns in namespaces)
+            self.invalidations += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._namespaces.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for status endpoints."""
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "namespaces": len(self._namespaces),
+            "entries": sum(len(entries) for entries in self._namespaces.values()),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _expired(self, entry: List[Any], now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry[2] > self.ttl_seconds
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+
+
+class ExpiryScheduler:
+    """
+    Tracks a deadline per key and yields keys whose deadline has passed.
+
+    Deadlines live in a dict and a min-heap holds at most one entry per key.
+    Touching a tracked key only updates the dict (O(1)); when its stale heap
+    entry surfaces, it is re-pushed at the key's current deadline. Collecting
+    expired keys costs O(k log n) for k due entries, independent of how many
+    keys are live.
+    """
+
+    def __init__(self):
+        self._deadlines: Dict[Hashable, float] = {}
+        # Deadline of each key's single heap entry (kept after discard until it surfaces)
+        self._scheduled: Dict[Hashable, float] = {}
+        self._heap: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def touch(self, key: Hashable, deadline: float):
+        """Set or extend a key's deadline (an earlier deadline applies from the scheduled one)."""
+        with self._lock:
+            if key not in self._scheduled:
+                heapq.heappush(self._heap, (deadline, key))
+                self._scheduled[key] = deadline
+            self._deadlines[key] = deadline
+
+    def discard(self, key: Hashable):
+        """Stop tracking a key; its heap entry is dropped when it surfaces."""
+        with self._lock:
+            self._deadlines.pop(key, None)
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        return self._deadlines.get(key)
+
+    def pop_expired(self, now: float) -> List[Hashable]:
+        """Remove and return every key whose deadline is at or before now."""
+        expired = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                _, key = heapq.heappop(heap)
+                current = self._deadlines.get(key)
+                if current is None:
+                    del self._scheduled[key]
+                elif current > now:
+                    heapq.heappush(heap, (current, key))
+                    self._scheduled[key] = current
+                else:
+                    del self._deadlines[key]
+                    del self._scheduled[key]
+                    expired.append(key)
+        return expired
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
@@ -0,0 +1,213 @@
+"""
+Embedding cache for the Omotenashi Hotel Concierge.
+Wraps a LangChain embedding model so repeated query strings skip the model's
+forward pass, with an optional on-disk tier shared across restarts.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Content-addressed cache in front of an embedding model's ``embed_query``.
+
+    Query text is whitespace-normalized (and lowercased when the model is
+    uncased) and hashed; vectors are kept in an in-memory LRU. When
+    ``persist_path`` is set, vectors are also appended to a memory-mapped
+    float32 array (``<path>.f32``) up to ``max_disk_entries`` rows, with the
+    hash of each row's text in a parallel array (``<path>.keys``) and the model
+    and shape in ``<path>.json``. Several worker processes can share one path:
+    rows are created and appended under an exclusive ``fcntl`` lock on
+    ``<path>.lock``, each worker indexes the rows the others appended, and a
+    row is only returned when its stored hash matches the text looked up.
+    Document embeddings (indexing) are not cached.
+    """
+
+    KEY_BYTES = 32
+
+    def __init__(self, embeddings: Embeddings, max_entries: int = 4096,
+                 persist_path: Optional[str] = None, max_disk_entries: int = 100_000,
+                 lowercase: bool = False, model_name: str = "", flush_every: int = 64):
+        self.embeddings = embeddings
+        self.lowercase = lowercase
+        self.model_name = model_name
+        self.persist_path = persist_path
+        self.max_disk_entries = max_disk_entries
+        self.flush_every = flush_every
+        self.memory = LRUCache(max_size=max_entries)
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._dimensions: Optional[int] = None
+        self._next_row = 0
+        self._unflushed = 0
+        self.disk_hits = 0
+        self.computed = 0
+        if persist_path:
+            self._load()
+
+    def key(self, text: str) -> str:
+        """Content address for a query string."""
+        normalized = " ".join(text.split())
+        if self.lowercase:
+            normalized = normalized.lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.key(text)
+        vector = self.memory.get(key)
+        if vector is None:
+            vector = self._read_disk(key)
+            if vector is None:
+                vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+                self.computed += 1
+                self._write_disk(key, vector)
+            self.memory.set(key, vector)
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for status endpoints."""
+        return {
+            "memory": self.memory.stats(),
+            "disk_entries": len(self._index),
+            "disk_hits": self.disk_hits,
+            "computed": self.computed,
+        }
+
+    def flush(self):
+        """Write pending disk-tier rows."""
+        with self._lock:
+            self._flush_locked()
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    @property
+    def _vectors_path(self) -> str:
+        return f"{self.persist_path}.f32"
+
+    @property
+    def _keys_path(self) -> str:
+        return f"{self.persist_path}.keys"
+
+    @property
+    def _meta_path(self) -> str:
+        return f"{self.persist_path}.json"
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process using persist_path."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+        with open(f"{self.persist_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            with self._lock, self._file_lock():
+                if self._attach():
+                    logger.info(f"Loaded {len(self._index)} cached embeddings from {self.persist_path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to load embedding cache at {self.persist_path}: {e}")
+            self._index, self._vectors, self._keys, self._dimensions = {}, None, None, None
+
+    def _attach(self) -> bool:
+        """Open the store if it exists and was built for this model. Call with the file lock held."""
+        paths = (self._meta_path, self._vectors_path, self._keys_path)
+        if not all(os.path.exists(path) for path in paths):
+            return False
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name or meta.get("lowercase") != self.lowercase:
+            logger.info(f"Ignoring embedding cache at {self.persist_path}: built for another model")
+            return False
+        self._open(meta["dimensions"], meta["capacity"], mode="r+")
+        self._catch_up()
+        return True
+
+    def _create(self, dimensions: int):
+        """Create an empty store, replacing any incompatible one. Call with the file lock held."""
+        self._open(dimensions, self.max_disk_entries, mode="w+")
+        self._index, self._next_row = {}, 0
+        meta = {
+            "model": self.model_name,
+            "lowercase": self.lowercase,
+            "dimensions": dimensions,
+            "capacity": self.max_disk_entries,
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _open(self, dimensions: int, capacity: int, mode: str):
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=mode,
+                                  shape=(capacity, dimensions))
+        self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode=mode, shape=(capacity, self.KEY_BYTES))
+        self._dimensions = dimensions
+        self.max_disk_entries = capacity
+
+    def _catch_up(self):
+        """Index rows appended since this process last looked, by it or by other workers."""
+        while self._next_row < self.max_disk_entries and self._keys[self._next_row].any():
+            self._index[self._keys[self._next_row].tobytes().hex()] = self._next_row
+            self._next_row += 1
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if self._vectors is None:
+            return None
+        row = self._index.get(key)
+        if row is None or self._keys[row].tobytes() != bytes.fromhex(key):
+            return None
+        self.disk_hits += 1
+        return np.array(self._vectors[row])
+
+    def _write_disk(self, key: str, vector: np.ndarray):
+        if not self.persist_path:
+            return
+        with self._lock, self._file_lock():
+            if self._vectors is None and not self._attach():
+                self._create(len(vector))
+            if len(vector) != self._dimensions:
+                return
+            self._catch_up()
+            if key in self._index or self._next_row >= self.max_disk_entries:
+                return
+            row = self._next_row
+            # The key marks the row complete, so it is written after the vector
+            self._vectors[row] = vector
+            self._keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+            self._index[key] = row
+            self._next_row += 1
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._vectors is None or not self._unflushed:
+            return
+        self._vectors.flush()
+        self._keys.flush()
+        self._unflushed = 0
@@ -0,0 +1,128 @@
+"""
+Prometheus metrics for the Omotenashi Hotel Concierge.
+Request rate and latency per endpoint, agent iterations, tool mix, token spend,
+retrieval latency and session counts. With PROMETHEUS_MULTIPROC_DIR set (as
+under gunicorn), every worker writes its samples to that directory and
+/metrics aggregates them across workers.
+"""
+
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+from src.api.config import SESSION_BACKEND
+
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+TOOL_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUESTS = Counter(
+    "concierge_http_requests_total", "HTTP requests handled, by route template and status code",
+    ["method", "endpoint", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "concierge_http_request_duration_seconds", "Time to send the full response, by route template",
+    ["method", "endpoint"], buckets=REQUEST_LATENCY_BUCKETS,
+)
+AGENT_ITERATIONS = Histogram(
+    "concierge_agent_iterations", "LLM round-trips per guest message",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15),
+)
+TOOL_CALLS = Counter("concierge_tool_calls_total", "Guest tool calls, by tool and outcome", ["tool", "status"])
+TOOL_DURATION = Histogram(
+    "concierge_tool_duration_seconds", "Guest tool latency, by tool", ["tool"], buckets=TOOL_LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "concierge_llm_tokens_total",
+    "LLM tokens: input (all prompt tokens), cache_read and cache_creation (parts of input), output",
+    ["type"],
+)
+RETRIEVAL_DURATION = Histogram(
+    "concierge_retrieval_duration_seconds", "Property knowledge base search latency, including cache hits",
+    buckets=TOOL_LATENCY_BUCKETS,
+)
+ROUTER_ANSWERS = Counter(
+    "concierge_router_answers_total", "Guest messages answered by the intent router without the agent", ["intent"],
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "concierge_response_cache_lookups_total", "/message response cache lookups, by result", ["result"],
+)
+# Resolved once so recording a run skips the label lookup
+_TOKEN_COUNTERS = {kind: LLM_TOKENS.labels(kind) for kind in ("input", "output", "cache_read", "cache_creation")}
+# A shared Redis store reports the same total from every worker; per-worker stores add up
+SESSIONS = Gauge(
+    "concierge_sessions", "Unexpired conversation sessions in the session store",
+    multiprocess_mode="max" if SESSION_BACKEND == "redis" else "livesum",
+)
+
+
+def record_agent_run(token_usage, tool_usage):
+    """Record one agent run from its TokenUsageTracker and ToolUsageTracker."""
+    if token_usage.llm_calls:
+        AGENT_ITERATIONS.observe(token_usage.llm_calls)
+    for kind, tokens in (("input", token_usage.input_tokens), ("output", token_usage.output_tokens),
+                         ("cache_read", token_usage.cache_read_input_tokens),
+                         ("cache_creation", token_usage.cache_creation_input_tokens)):
+        if tokens:
+            _TOKEN_COUNTERS[kind].inc(tokens)
+    for call in tool_usage.summary():
+        TOOL_CALLS.labels(call["tool"], "error" if "error" in call else "ok").inc()
+        if "latency_ms" in call:
+            TOOL_DURATION.labels(call["tool"]).observe(call["latency_ms"] / 1000)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metrics in the Prometheus text format, aggregated across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting HTTP requests and timing them until the last body byte.
+
+    Requests are labelled by route template (``/session/{phone}``), not the raw
+    path, so label cardinality stays bounded. Streaming responses are timed to
+    the end of the stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._endpoints: Optional[Dict[object, str]] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            endpoint = self._endpoint(scope)
+            HTTP_REQUESTS.labels(scope["method"], endpoint, str(status)).inc()
+            HTTP_REQUEST_DURATION.labels(scope["method"], endpoint).observe(time.perf_counter() - start)
+
+    def _endpoint(self, scope) -> str:
+        # The router stores the matched endpoint in the scope; map it back to its path template
+        if self._endpoints is None:
+            app = scope.get("app")
+            if app is None:
+                return "unmatched"
+            self._endpoints = {getattr(route, "endpoint", getattr(route, "app", None)): route.path
+                               for route in app.routes}
+        return self._endpoints.get(scope.get("endpoint"), "unmatched")
@@ -0,0 +1,197 @@
+"""
+Request tracing for the Omotenashi Hotel Concierge.
+Records OpenTelemetry spans for the stages of a request (agent build, LLM calls,
+tools, retrieval, serialization) and exports them in process into rolling
+latency windows per stage, plus per-request totals for a Server-Timing header.
+"""
+
+import math
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+
+STAGE_ATTRIBUTE = "omotenashi.stage"
+TOOL_ATTRIBUTE = "omotenashi.tool"
+
+# Reporting order; any other stage is listed after these
+STAGES = ("total", "routing", "tool_selection", "agent_build", "llm", "tool", "retrieval", "serialization")
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def latency_summary(values: Sequence[float]) -> dict:
+    """Count and p50/p95/p99/max in milliseconds for one latency window."""
+    ordered = sorted(values)
+    summary = {"count": len(ordered)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(ordered, pct), 2)
+    summary["max_ms"] = round(ordered[-1], 2)
+    return summary
+
+
+class LatencyExporter(SpanExporter):
+    """
+    In-process span exporter keeping the last ``window_size`` durations per stage.
+
+    Spans without a stage attribute are ignored. Durations of spans belonging to
+    a trace opened with ``begin_trace`` are also summed per stage until
+    ``end_trace`` collects them.
+    """
+
+    def __init__(self, window_size: int = 1000):
+        self.window_size = window_size
+        self._lock = threading.Lock()
+        self._stages: Dict[str, deque] = {}
+        self._tools: Dict[str, deque] = {}
+        self._traces: Dict[int, Dict[str, List[float]]] = {}
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            self._record(span)
+        return SpanExportResult.SUCCESS
+
+    def _record(self, span: ReadableSpan):
+        attributes = span.attributes or {}
+        stage = attributes.get(STAGE_ATTRIBUTE)
+        if stage is None or span.end_time is None:
+            return
+        duration_ms = (span.end_time - span.start_time) / 1e6
+        with self._lock:
+            self._window(self._stages, stage).append(duration_ms)
+            tool = attributes.get(TOOL_ATTRIBUTE)
+            if tool:
+                self._window(self._tools, tool).append(duration_ms)
+            totals = self._traces.get(span.context.trace_id)
+            if totals is not None:
+                entry = totals.setdefault(stage, [0.0, 0])
+                entry[0] += duration_ms
+                entry[1] += 1
+
+    def _window(self, windows: Dict[str, deque], name: str) -> deque:
+        window = windows.get(name)
+        if window is None:
+            window = windows[name] = deque(maxlen=self.window_size)
+        return window
+
+    def begin_trace(self, trace_id: int):
+        with self._lock:
+            self._traces[trace_id] = {}
+
+    def end_trace(self, trace_id: int) -> Dict[str, List[float]]:
+        """Per-stage [total_ms, span_count] for a trace opened with begin_trace."""
+        with self._lock:
+            return self._traces.pop(trace_id, {})
+
+    def stats(self) -> dict:
+        with self._lock:
+            stages = {name: list(window) for name, window in self._stages.items() if window}
+            tools = {name: list(window) for name, window in self._tools.items() if window}
+        order = {name: i for i, name in enumerate(STAGES)}
+        return {
+            "stages": {name: latency_summary(stages[name])
+                       for name in sorted(stages, key=lambda name: (order.get(name, len(order)), name))},
+            "tools": {name: latency_summary(tools[name]) for name in sorted(tools)},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._tools.clear()
+
+    def shutdown(self):
+        pass
+
+
+class RequestTiming:
+    """Per-stage totals of one traced request, filled in when the request span ends."""
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+
+    def server_timing(self) -> Optional[str]:
+        """Server-Timing header value, e.g. ``llm;dur=812.4;desc="2 calls", total;dur=830.1``."""
+        if not self.stages:
+            return None
+        order = {name: i for i, name in enumerate(STAGES)}
+        metrics = []
+        for stage in sorted(self.stages, key=lambda name: (order.get(name, len(order)), name)):
+            total_ms, count = self.stages[stage]
+            metric = f"{stage};dur={total_ms:.1f}"
+            if count > 1:
+                metric += f';desc="{count} calls"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def headers(self) -> Dict[str, str]:
+        value = self.server_timing()
+        return {"Server-Timing": value} if value else {}
+
+
+class RequestTracer:
+    """
+    Creates the stage spans for the API.
+
+    Spans go through a private OpenTelemetry TracerProvider to a LatencyExporter;
+    further span processors (e.g. an OTLP exporter) can be added to ``provider``.
+    When disabled, spans are no-ops and no timings are collected.
+    """
+
+    def __init__(self, enabled: bool = True, window_size: int = 1000):
+        self.enabled = enabled
+        self.exporter = LatencyExporter(window_size)
+        self.provider = TracerProvider()
+        if enabled:
+            self.provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+            self._tracer = self.provider.get_tracer("omotenashi")
+        else:
+            self._tracer = trace.NoOpTracer()
+
+    @contextmanager
+    def span(self, stage: str, name: Optional[str] = None, **attributes: Any) -> Iterator[trace.Span]:
+        """Time a block as a child of the current span."""
+        with self._tracer.start_as_current_span(name or stage,
+                                                attributes={STAGE_ATTRIBUTE: stage, **attributes}) as span:
+            yield span
+
+    def start_span(self, stage: str, name: Optional[str] = None,
+                   parent: Optional[otel_context.Context] = None, **attributes: Any) -> trace.Span:
+        """Start a span ended by the caller, for work reported through start/end callbacks."""
+        return self._tracer.start_span(name or stage, context=parent,
+                                       attributes={STAGE_ATTRIBUTE: stage, **attributes})
+
+    @contextmanager
+    def request(self, name: str) -> Iterator[RequestTiming]:
+        """
+        Trace one request as a root "total" span.
+
+        The yielded RequestTiming holds the per-stage totals once the block exits.
+        """
+        timing = RequestTiming()
+        span = self._tracer.start_span(name, context=otel_context.Context(),
+                                       attributes={STAGE_ATTRIBUTE: "total"})
+        trace_id = span.get_span_context().trace_id
+        if self.enabled:
+            self.exporter.begin_trace(trace_id)
+        try:
+            with trace.use_span(span, end_on_exit=False):
+                yield timing
+        finally:
+            # End the root span before collecting so it is counted in its own trace
+            span.end()
+            if self.enabled:
+                timing.stages = self.exporter.end_trace(trace_id)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "window_size": self.exporter.window_size, **self.exporter.stats()}
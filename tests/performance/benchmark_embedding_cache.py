@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the query embedding cache (CachedEmbeddings).
+Measures embed_query latency on a cache miss (model forward pass), an
+in-memory hit, and a disk hit after reopening the memory-mapped store, and
+checks that trivially different strings share one entry. Also has several
+processes fill one store at once, as gunicorn workers sharing
+EMBEDDING_CACHE_PATH do, and checks every stored row against its text.
+
+By default a fake model with a fixed forward-pass delay stands in for
+MiniLM; pass --model to load the real sentence-transformers model.
+
+Run from the repository root:
+    python tests/performance/benchmark_embedding_cache.py --queries 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import numpy as np
+
+from src.utils.embeddings import CachedEmbeddings
+from tests.performance.fakes import HashEmbeddings
+
+
+class SlowHashEmbeddings(HashEmbeddings):
+    """HashEmbeddings with a fixed delay standing in for the transformer forward pass."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        return super().embed_query(text)
+
+
+def fill_shared(path: str, worker: int, queries: list):
+    """One worker process embedding an overlapping share of the queries into a shared store."""
+    cached = CachedEmbeddings(SlowHashEmbeddings(0.001), persist_path=path, model_name="fake", flush_every=8)
+    for query in queries[worker::2] + queries[::3]:
+        cached.embed_query(query)
+    cached.flush()
+
+
+def check_shared(path: str, queries: list, workers: int) -> bool:
+    """Fill one store from several processes at once, then verify each row belongs to its text."""
+    processes = [multiprocessing.Process(target=fill_shared, args=(path, n % 2, queries)) for n in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    model = HashEmbeddings()
+    reopened = CachedEmbeddings(SlowHashEmbeddings(0.001), persist_path=path, model_name="fake")
+    wrong = sum(
+        1 for query in queries
+        if not np.allclose(reopened.embed_query(query), model.embed_query(query), atol=1e-6)
+    )
+    print(f"\n{workers} workers sharing one store: {reopened.disk_hits}/{len(queries)} disk hits, "
+          f"{reopened.stats()['disk_entries']} rows, {wrong} wrong vectors")
+    return (wrong == 0 and reopened.disk_hits == len(queries) and reopened.stats()["disk_entries"] == len(queries)
+            and all(p.exitcode == 0 for p in processes))
+
+
+def timed(embeddings, queries) -> list:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<14} mean {statistics.mean(latencies) * 1e3:>8.3f}ms   p95 {p95 * 1e3:>8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query embedding cache benchmark")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.008, help="Fake forward-pass time in seconds")
+    parser.add_argument("--workers", type=int, default=4, help="Processes sharing one store")
+    parser.add_argument("--model", help="Real model to load, e.g. sentence-transformers/all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    if args.model:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        make_model = lambda: HuggingFaceEmbeddings(model_name=args.model)
+    else:
+        make_model = lambda: SlowHashEmbeddings(args.delay)
+
+    queries = [f"What time does guest request number {i} need the pool to open?" for i in range(args.queries)]
+    variants = [f"  what time does GUEST request number {i} need the pool  to open? " for i in range(args.queries)]
+    ok = True
+
+    print("🧮 Query Embedding Cache Benchmark")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "queries")
+        cached = CachedEmbeddings(make_model(), max_entries=args.queries * 2, persist_path=path,
+                                  lowercase=True, model_name=args.model or "fake")
+        miss = timed(cached, queries)
+        memory_hit = timed(cached, queries)
+        variant_hit = timed(cached, variants)
+        cached.flush()
+        computed = cached.computed
+
+        reopened = CachedEmbeddings(make_model(), max_entries=args.queries * 2, persist_path=path,
+                                    lowercase=True, model_name=args.model or "fake")
+        disk_hit = timed(reopened, queries)
+
+        report("miss", miss)
+        report("memory hit", memory_hit)
+        report("variant hit", variant_hit)
+        report("disk hit", disk_hit)
+        print(f"\nSpeed-up (memory hit): {statistics.mean(miss) / statistics.mean(memory_hit):.0f}x")
+        print(f"Forward passes:        {computed} for {len(queries) * 3} calls")
+        print(f"After reopen:          {reopened.computed} forward passes, {reopened.disk_hits} disk hits")
+        ok &= computed == len(queries)
+        ok &= reopened.computed == 0 and reopened.disk_hits == len(queries)
+
+        ok &= check_shared(os.path.join(cache_dir, "shared"), queries, args.workers)
+
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
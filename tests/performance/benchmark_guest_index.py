@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the guest and booking index (src/models/guest.py).
+Generates synthetic guests with several bookings each and reports resident
+memory per 100k guests for the previous dicts of JSON records versus the
+__slots__ GuestIndex, plus lookup latency by phone, guest ID, active booking
+and property. Also checks multi-booking, active-at-T and phone normalization.
+
+Run from the repository root:
+    python tests/performance/benchmark_guest_index.py --guests 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from src.models.guest import GuestIndex
+
+LANGUAGES = ["English", "Spanish", "Japanese", "French", "German"]
+
+
+def synthetic_records(guests: int, properties: int, bookings_per_guest: int):
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1, 15)
+    guest_records, booking_records = [], []
+    for i in range(guests):
+        guest_records.append({
+            "guest_id": f"g{i}",
+            "name": f"Guest Number {i}",
+            "phone_number": f"+1415{i:07d}",
+            "preferred_language": rng.choice(LANGUAGES),
+            "vip_status": rng.random() < 0.1,
+        })
+        for n in range(bookings_per_guest):
+            check_in = start + timedelta(days=n * 60 + rng.randrange(30))
+            property_id = f"p{rng.randrange(properties)}"
+            booking_records.append({
+                "guest_id": f"g{i}",
+                "property_id": property_id,
+                "property_name": f"Villa {property_id}",
+                "check_in": check_in.isoformat(),
+                "check_out": (check_in + timedelta(days=7, hours=-4)).isoformat(),
+                "special_requests": "",
+            })
+    # Round-trip through JSON so strings are not shared the way generated ones are
+    return json.loads(json.dumps(guest_records)), json.loads(json.dumps(booking_records))
+
+
+def previous_service(guests: list, bookings: list, keep_all: bool):
+    """GuestService's previous dicts of JSON records, optionally keeping every booking."""
+    guests_by_phone = {g["phone_number"]: g for g in guests}
+    if not keep_all:
+        return guests_by_phone, {b["guest_id"]: b for b in bookings}
+    bookings_by_guest = {}
+    for booking in bookings:
+        bookings_by_guest.setdefault(booking["guest_id"], []).append(booking)
+    return guests_by_phone, bookings_by_guest
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def per_call(fn, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guest index benchmark")
+    parser.add_argument("--guests", type=int, default=100_000)
+    parser.add_argument("--bookings-per-guest", type=int, default=3)
+    parser.add_argument("--properties", type=int, default=1_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    per_100k = 100_000 / args.guests
+    guest_json = json.dumps(synthetic_records(args.guests, args.properties, args.bookings_per_guest))
+
+    previous, previous_size = measure(lambda: previous_service(*json.loads(guest_json), keep_all=False))
+    del previous
+    previous, previous_all_size = measure(lambda: previous_service(*json.loads(guest_json), keep_all=True))
+    del previous
+    index, index_size = measure(lambda: GuestIndex.from_records(*json.loads(guest_json)))
+
+    rng = random.Random(7)
+    phones = [f"+1415{rng.randrange(args.guests):07d}" for _ in range(args.lookups)]
+    guest_ids = [f"g{rng.randrange(args.guests)}" for _ in range(args.lookups)]
+    property_ids = [f"p{rng.randrange(args.properties)}" for _ in range(args.lookups)]
+    at = datetime(2025, 3, 5)
+
+    print("🗂️  Guest Index Benchmark")
+    print("=" * 60)
+    print(f"Guests: {args.guests:,}  bookings: {index.booking_count:,}  properties: {args.properties:,}")
+    print(f"\nMemory per 100k guests")
+    print(f"  previous dicts (1 booking kept/guest): {previous_size * per_100k / 2**20:>7.1f} MiB")
+    print(f"  previous dicts (all bookings kept):    {previous_all_size * per_100k / 2**20:>7.1f} MiB")
+    print(f"  GuestIndex (all bookings):             {index_size * per_100k / 2**20:>7.1f} MiB")
+    print(f"\nLookup latency")
+    print(f"  guest by phone:      {per_call(index.guest_by_phone, phones) * 1e9:>7.0f} ns")
+    print(f"  guest by id:         {per_call(index.guest_by_id, guest_ids) * 1e9:>7.0f} ns")
+    print(f"  active booking at T: {per_call(lambda g: index.active_booking(g, at), guest_ids) * 1e9:>7.0f} ns")
+    print(f"  property bookings:   {per_call(index.bookings_for_property, property_ids) * 1e9:>7.0f} ns")
+
+    # Correctness checks on a small hand-built index
+    small = GuestIndex.from_records(
+        [{"guest_id": "g1", "name": "Carlos", "phone_number": "+1 (415) 555-0123"}],
+        [
+            {"guest_id": "g1", "property_id": "p1", "check_in": "2025-06-10T15:00:00", "check_out": "2025-06-17T11:00:00"},
+            {"guest_id": "g1", "property_id": "p2", "check_in": "2025-08-01T15:00:00", "check_out": "2025-08-05T11:00:00"},
+            # UTC timestamps are compared as local times alongside the naive ones
+            {"guest_id": "g1", "property_id": "p3", "check_in": "2025-10-01T15:00:00Z", "check_out": "2025-10-04T11:00:00Z"},
+        ],
+    )
+    checks = {
+        "phone normalization": all(small.guest_by_phone(p) for p in ["4155550123", "+14155550123", "0014155550123"]),
+        "multiple bookings kept": len(small.bookings_for_guest("g1")) == 3,
+        "active during stay": small.active_booking("g1", datetime(2025, 6, 12)).property_id == "p1",
+        "next stay between stays": small.active_booking("g1", datetime(2025, 7, 1)).property_id == "p2",
+        "last stay after all": small.active_booking("g1", datetime(2026, 1, 1)).property_id == "p3",
+        "aware timestamps as local time": (
+            small.active_booking("g1", datetime(2025, 10, 2, tzinfo=timezone.utc)).property_id == "p3"
+            and small.bookings_for_guest("g1")[-1].check_in.tzinfo is None
+        ),
+        "property index": [b.guest_id for b in small.bookings_for_property("p2")] == ["g1"],
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Intent router benchmark.
+Classifies every prompt of the tool-selection evaluation sets
+(tests/evaluation/evaluation.py and evaluation_multilingual.py) with the intent
+router and reports how many LLM calls it saves. An agent turn costs one call,
+plus one more when it uses a tool; a routed lookup costs none. Checks that no
+prompt is routed to the wrong tool, that every routed prompt gets a templated
+reply in its language, and that none of the evaluation prompts are among the
+router's labelled examples. Then sends lookups and a non-lookup through /message,
+/message/stream and the WebSocket against a local stand-in for the Anthropic
+API to confirm lookups never reach the model and land in the session history.
+
+Run from the repository root:
+    python tests/performance/benchmark_intent_router.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+os.environ["INTENT_ROUTER_ENABLED"] = "true"
+
+import httpx
+import websockets
+
+from src.agents.router import IntentRouter
+from tests.evaluation.evaluation import TEST_CASES
+from tests.evaluation.evaluation_multilingual import MULTILINGUAL_TEST_CASES
+from tests.performance.benchmark_streaming_ttfb import start_api
+from tests.performance.fakes import FakeAnthropicServer
+
+EXAMPLES_FILE = "data/intents/router_examples.json"
+LOOKUP_CATEGORIES = ("guest_info", "booking_info")
+PHONE = "+14155550123"
+
+
+def evaluation_prompts() -> list:
+    """(set, language, category, prompt, expected_tools) for both evaluation sets."""
+    prompts = [("evaluation", "English", case["category"], case["prompt"], case["expected_tools"])
+               for case in TEST_CASES]
+    for language, categories in MULTILINGUAL_TEST_CASES.items():
+        for category, cases in categories.items():
+            prompts += [("multilingual", language, category, case["prompt"], case["expected_tools"])
+                        for case in cases]
+    return prompts
+
+
+def guests_by_language() -> dict:
+    with open("data/demo/guests.json", encoding="utf-8") as f:
+        guests = json.load(f)
+    with open("data/demo/bookings.json", encoding="utf-8") as f:
+        booking = json.load(f)[0]
+    by_language = {}
+    for guest in guests:
+        by_language.setdefault(guest["preferred_language"], guest)
+    return {language: (guest, booking) for language, guest in by_language.items()}
+
+
+def evaluate(router: IntentRouter, prompts: list) -> dict:
+    guests = guests_by_language()
+    totals = defaultdict(lambda: {"prompts": 0, "routed": 0, "misrouted": 0, "baseline_calls": 0, "routed_calls": 0})
+    missing_replies = []
+    for eval_set, language, category, prompt, expected in prompts:
+        decision = router.classify(prompt)
+        baseline = 1 + bool(expected)
+        keys = [eval_set]
+        if category in LOOKUP_CATEGORIES:
+            keys.append(f"{eval_set} lookups")
+        if eval_set == "multilingual":
+            keys.append(f"  {language}")
+        for key in keys:
+            row = totals[key]
+            row["prompts"] += 1
+            row["baseline_calls"] += baseline
+            if decision.tool:
+                row["routed"] += 1
+                row["misrouted"] += expected != [decision.tool]
+            else:
+                row["routed_calls"] += baseline
+        if decision.tool:
+            guest, booking = guests[language]
+            reply = router.answer(decision.intent, guest, booking)
+            if not reply or guest["name"] not in reply and booking["property_name"] not in reply:
+                missing_replies.append(prompt)
+    return {"totals": totals, "missing_replies": missing_replies}
+
+
+def classify_us(router: IntentRouter, prompts: list, repeat: int = 5) -> float:
+    messages = [prompt for _, _, _, prompt, _ in prompts]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            router.classify(message)
+    return (time.perf_counter() - start) / (repeat * len(messages)) * 1e6
+
+
+async def run_messages(url: str, llm: FakeAnthropicServer) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        lookup = (await client.post("/message", json={"message": "When do I check out?",
+                                                      "phone_number": PHONE})).json()
+        async with client.stream("POST", "/message/stream", json={"message": "Am I a VIP guest?",
+                                                                  "phone_number": PHONE}) as response:
+            streamed = [line async for line in response.aiter_lines() if line.startswith("event: ")]
+        async with websockets.connect(f"{url.replace('http', 'ws', 1)}/ws/{PHONE}") as ws:
+            await ws.send(json.dumps({"message": "What language do I prefer?"}))
+            frames = [json.loads(await ws.recv())]
+            while frames[-1]["event"] not in ("done", "error"):
+                frames.append(json.loads(await ws.recv()))
+        lookup_calls = len(llm.requests)
+        agent = (await client.post("/message", json={"message": "Can I get a late checkout?",
+                                                     "phone_number": PHONE})).json()
+    return {"lookup": lookup, "streamed": streamed, "frames": frames, "lookup_calls": lookup_calls, "agent": agent}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intent router benchmark")
+    parser.add_argument("--examples", default=EXAMPLES_FILE)
+    args = parser.parse_args()
+
+    router = IntentRouter.from_file(args.examples)
+    with open(args.examples, encoding="utf-8") as f:
+        examples = {phrase.casefold() for by_intent in json.load(f)["examples"].values()
+                    for phrases in by_intent.values() for phrase in phrases}
+    prompts = evaluation_prompts()
+    overlap = [prompt for _, _, _, prompt, _ in prompts if prompt.casefold() in examples]
+    result = evaluate(router, prompts)
+    latency = classify_us(router, prompts)
+
+    llm = FakeAnthropicServer(reply="Let me arrange that for you.").start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    server, thread, url = start_api(api.app)
+    try:
+        e2e = asyncio.run(run_messages(url, llm))
+        history = llm.requests[-1]["messages"] if llm.requests else []
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        llm.stop()
+
+    totals = result["totals"]
+    print("🧭 Intent Router Benchmark")
+    print("=" * 50)
+    print(f"{'set':<28} {'prompts':>7} {'routed':>7} {'wrong':>6} {'LLM calls':>14} {'saved':>7}")
+    for name, row in totals.items():
+        saved = 1 - row["routed_calls"] / row["baseline_calls"]
+        print(f"{name:<28} {row['prompts']:>7} {row['routed']:>7} {row['misrouted']:>6} "
+              f"{row['baseline_calls']:>6} → {row['routed_calls']:<5} {saved:>6.1%}")
+    print(f"Classification: {latency:.0f}µs per message")
+    print(f"End to end: 3 lookups made {e2e['lookup_calls']} LLM calls, "
+          f"the non-lookup made {len(llm.requests) - e2e['lookup_calls']}")
+
+    lookup, agent, frames = e2e["lookup"], e2e["agent"], e2e["frames"]
+    checks = {
+        "evaluation prompts are not router examples": not overlap,
+        "no prompt routed to the wrong tool": all(row["misrouted"] == 0 for row in totals.values()),
+        "LLM calls reduced on both sets": all(totals[name]["routed_calls"] < totals[name]["baseline_calls"]
+                                              for name in ("evaluation", "multilingual")),
+        "every routed prompt gets a reply in its language": not result["missing_replies"],
+        "lookups answered without the LLM": e2e["lookup_calls"] == 0,
+        "lookup reply from guest data": (lookup["tools_used"] == ["booking_details"]
+                                         and "2025-06-17 11:00" in lookup["response"]),
+        "streamed lookup emits token then done": e2e["streamed"] == ["event: token", "event: done"],
+        "WebSocket lookup answered": frames[-1]["event"] == "done" and "English" in frames[-1]["response"],
+        "non-lookup still runs the agent": agent["response"] == "Let me arrange that for you.",
+        "lookups kept in the session history": any("2025-06-17 11:00" in json.dumps(message)
+                                                   for message in history),
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    if overlap:
+        print(f"     overlapping prompts: {overlap}")
+    if result["missing_replies"]:
+        print(f"     no reply for: {result['missing_replies']}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Parallel tool execution benchmark.
+A local stand-in for the Anthropic API asks for three tools in one turn:
+escalate_to_manager (its webhook answers after 0.5s), property_info (the
+knowledge base search takes 0.3s) and booking_details (instant). Each
+execution mode runs the turn with those delays and again without them; the
+difference is the time spent waiting for the tools, which should match the
+slowest tool rather than the sum. Checks that tool results reach the model in
+the order it asked for them, although they finish in the opposite order, and
+that every escalation reaches the webhook over reused connections.
+
+Run from the repository root:
+    python tests/performance/benchmark_parallel_tools.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+import httpx
+
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONE = "+14155550123"
+ESCALATION_DELAY = 0.5
+RETRIEVAL_DELAY = 0.3
+TOOL_CALLS = [
+    {"name": "escalate_to_manager", "input": {"question": "Can you arrange a helicopter tour?"}},
+    {"name": "property_info", "input": {"query": "pool hours"}},
+    {"name": "booking_details", "input": {}},
+]
+REPEAT = 3
+# Scheduling and HTTP overhead allowed on top of the slowest tool
+TOLERANCE = 0.15
+
+
+async def send_turn(client: httpx.AsyncClient, stream: bool) -> float:
+    """One turn in a fresh session; returns its wall-clock seconds."""
+    await client.delete(f"/session/{PHONE}")
+    body = {"message": "Helicopter tour? Also pool hours and my booking.", "phone_number": PHONE}
+    start = time.perf_counter()
+    if stream:
+        async with client.stream("POST", "/message/stream", json=body) as response:
+            events = [line async for line in response.aiter_lines() if line.startswith("event: ")]
+        assert events[-1] == "event: done", events
+    else:
+        response = await client.post("/message", json=body)
+        response.raise_for_status()
+        assert response.json()["tools_used"] == [call["name"] for call in TOOL_CALLS], response.json()
+    return time.perf_counter() - start
+
+
+async def run(api, llm: FakeAnthropicServer, webhook: FakeAnthropicServer, slow: dict) -> dict:
+    modes = {
+        "serial (thread, no tool pool)": ("thread", None, False),
+        "thread": ("thread", api.tool_thread_pool, False),
+        "async": ("async", api.tool_thread_pool, False),
+        "async streaming": ("async", api.tool_thread_pool, True),
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        await send_turn(client, stream=False)
+        for name, (mode, pool, stream) in modes.items():
+            api.AGENT_EXECUTION_MODE = mode
+            api.tool_thread_pool = pool
+            timings = {}
+            for delayed in (False, True):
+                slow["enabled"] = delayed
+                webhook.delay = ESCALATION_DELAY if delayed else 0.0
+                timings[delayed] = statistics.median([await send_turn(client, stream) for _ in range(REPEAT)])
+            results[name] = {"turn": timings[True], "tools": timings[True] - timings[False]}
+            tool_results = [block["tool_use_id"] for block in llm.requests[-1]["messages"][-1]["content"]
+                            if block.get("type") == "tool_result"]
+            # Tool use ids end in the position of the call within the model turn
+            results[name]["ordered"] = tool_results == sorted(tool_results, key=lambda i: int(i.rsplit("_", 1)[1]))
+            results[name]["results_sent"] = len(tool_results)
+        api.tool_thread_pool = modes["thread"][1]
+    return results
+
+
+def main():
+    llm = FakeAnthropicServer(reply="All taken care of.", tool_call=TOOL_CALLS).start()
+    # Any endpoint that accepts a POST and answers after a delay stands in for the manager's webhook
+    webhook = FakeAnthropicServer().start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    os.environ["ESCALATION_WEBHOOK_URL"] = webhook.url
+    from src.api import main as api
+
+    slow = {"enabled": False}
+
+    def search(property_id: str, query: str) -> str:
+        if slow["enabled"]:
+            time.sleep(RETRIEVAL_DELAY)
+        return f"Information about {query}."
+
+    api.vector_store.get_property_info = search
+    try:
+        results = asyncio.run(run(api, llm, webhook, slow))
+    finally:
+        llm.stop()
+        webhook.stop()
+
+    slowest, total = max(ESCALATION_DELAY, RETRIEVAL_DELAY), ESCALATION_DELAY + RETRIEVAL_DELAY
+    print("⚡ Parallel Tool Execution Benchmark")
+    print("=" * 50)
+    print(f"Tools: escalation {ESCALATION_DELAY * 1000:.0f}ms, retrieval {RETRIEVAL_DELAY * 1000:.0f}ms, "
+          f"booking lookup ~0ms (slowest {slowest * 1000:.0f}ms, sum {total * 1000:.0f}ms)")
+    print(f"{'mode':<32} {'turn':>8} {'waiting on tools':>17}")
+    for name, row in results.items():
+        print(f"{name:<32} {row['turn'] * 1000:>6.0f}ms {row['tools'] * 1000:>15.0f}ms")
+    escalations = [body for body in webhook.requests if body.get("question")]
+    print(f"Webhook: {len(escalations)} escalations over {webhook.connections_opened} connections")
+
+    concurrent = [name for name in results if not name.startswith("serial")]
+    checks = {
+        "serial baseline waits for the sum": results["serial (thread, no tool pool)"]["tools"] >= total - TOLERANCE,
+        **{f"{name}: waits for the slowest tool only": slowest - TOLERANCE <= results[name]["tools"] <= slowest + TOLERANCE
+           for name in concurrent},
+        "results reach the model in request order": all(row["ordered"] and row["results_sent"] == len(TOOL_CALLS)
+                                                       for row in results.values()),
+        "every escalation reaches the webhook": (
+            len(escalations) == (1 + 2 * REPEAT * len(results))
+            and escalations[0]["question"] == TOOL_CALLS[0]["input"]["question"]
+        ),
+        # A few pooled connections rather than one per escalation
+        "escalations reuse webhook connections": webhook.connections_opened <= 4,
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
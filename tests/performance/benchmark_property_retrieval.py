@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for per-property retrieval in VectorStoreService.
+Indexes synthetic properties into a temporary Chroma store and compares query
+latency for an unfiltered search over the whole corpus (previous behaviour),
+a property_id metadata filter on the shared collection, and a dedicated
+per-property collection, at 1, 100 and 1,000 properties.
+
+Run from the repository root:
+    python tests/performance/benchmark_property_retrieval.py --chunks 20 --queries 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from src.api.main import VectorStoreService
+from tests.performance.fakes import HashEmbeddings
+
+TOPICS = ["wifi password", "pool hours", "checkout time", "breakfast menu", "parking spot",
+          "spa booking", "airport transfer", "quiet hours", "pet policy", "gym access"]
+
+
+def property_docs(property_id: str, chunks: int) -> list:
+    return [
+        Document(
+            page_content=f"Property {property_id} {TOPICS[i % len(TOPICS)]} details number {i}",
+            metadata={"property_id": property_id},
+        )
+        for i in range(chunks)
+    ]
+
+
+def timed(search, queries: int) -> float:
+    start = time.perf_counter()
+    for i in range(queries):
+        search(TOPICS[i % len(TOPICS)])
+    return (time.perf_counter() - start) / queries
+
+
+def run(properties: int, chunks: int, queries: int, embeddings) -> dict:
+    with tempfile.TemporaryDirectory() as persist_dir:
+        client = chromadb.PersistentClient(path=persist_dir)
+        shared = Chroma(client=client, collection_name="langchain", embedding_function=embeddings)
+        target = "p0"
+        for n in range(properties):
+            docs = property_docs(f"p{n}", chunks)
+            shared.add_documents(docs)
+        dedicated = Chroma(client=client, collection_name=f"{VectorStoreService.PROPERTY_COLLECTION_PREFIX}{target}",
+                           embedding_function=embeddings)
+        dedicated.add_documents(property_docs(target, chunks))
+
+        wrong_villa = sum(
+            doc.metadata["property_id"] != target
+            for doc in shared.similarity_search(TOPICS[0], k=4)
+        )
+        return {
+            "unfiltered": timed(lambda q: shared.similarity_search(q, k=4), queries),
+            "metadata_filter": timed(lambda q: shared.similarity_search(q, k=4, filter={"property_id": target}), queries),
+            "per_property": timed(lambda q: dedicated.similarity_search(q, k=4), queries),
+            "wrong_villa_hits": wrong_villa,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-property retrieval benchmark")
+    parser.add_argument("--chunks", type=int, default=20, help="Chunks per property")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000])
+    args = parser.parse_args()
+
+    embeddings = HashEmbeddings()
+    print("🏘️  Per-Property Retrieval Benchmark")
+    print("=" * 78)
+    print(f"{'properties':>10} {'corpus':>8} {'unfiltered':>12} {'metadata filter':>16} {'per-property':>14} {'wrong villa':>12}")
+    for size in args.sizes:
+        result = run(size, args.chunks, args.queries, embeddings)
+        print(f"{size:>10} {size * args.chunks:>8} "
+              f"{result['unfiltered'] * 1e3:>10.2f}ms {result['metadata_filter'] * 1e3:>14.2f}ms "
+              f"{result['per_property'] * 1e3:>12.2f}ms {result['wrong_villa_hits']:>10}/4")
+
+
+if __name__ == "__main__":
+    main()
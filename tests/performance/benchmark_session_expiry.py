@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for session expiry bookkeeping in MemoryService.
+Compares the per-request cost of the previous full scan of last_activity
+(run at the end of every /message) with the heap-based scheduler, where a
+request only touches its own deadline and a background sweep collects
+expired sessions, from 100 to 1,000,000 live sessions. Each cost is the
+median of several timed batches, and the check allows for timer noise at
+the microsecond scale.
+
+Run from the repository root:
+    python tests/performance/benchmark_session_expiry.py --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from src.api.main import MemoryService
+from src.agents.sessions import InProcessSessionBackend
+
+# The scheduler passes if its largest per-request cost stays within this factor
+# of its smallest, or below the floor, where timer and cache noise dominate
+GROWTH_LIMIT = 5
+NOISE_FLOOR_SECONDS = 20e-6
+
+
+def previous_cleanup(last_activity: dict, expiry: timedelta):
+    """The scan previously run by MemoryService.cleanup_expired on every request."""
+    now = datetime.utcnow()
+    return [phone for phone, last_time in last_activity.items() if now - last_time > expiry]
+
+
+def populate(sessions: int, idle: int):
+    """Sessions sharing one memory object; the first `idle` are already past their deadline."""
+    service = MemoryService(InProcessSessionBackend(ttl_seconds=3600))
+    shared_memory = service._new_memory()
+    deadline = time.monotonic() + service.expiry.total_seconds()
+    now = datetime.utcnow()
+    last_activity = {}
+    for i in range(sessions):
+        phone = f"+1555{i:07d}"
+        service.memory_store[phone] = shared_memory
+        service.expiry_schedule.touch(phone, deadline if i >= idle else 0)
+        last_activity[phone] = now
+    return service, last_activity
+
+
+def per_request(fn, requests: int, repeat: int = 1) -> float:
+    """Median seconds per call over `repeat` timed batches of `requests` calls."""
+    batches = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(requests):
+            fn(i)
+        batches.append((time.perf_counter() - start) / requests)
+    return statistics.median(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session expiry benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--scan-requests", type=int, default=20, help="Requests timed for the O(n) scan")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed batches per measurement; the median is kept")
+    args = parser.parse_args()
+
+    print("⏱️  Session Expiry Benchmark")
+    print("=" * 74)
+    print(f"{'sessions':>10} {'previous scan':>16} {'scheduler':>12} {'sweep 1% expired':>18}")
+    results = []
+    for size in args.sizes:
+        idle = max(size // 100, 1)
+        service, last_activity = populate(size, idle)
+        active = list(service.memory_store)[idle:]
+
+        def old_request(i):
+            phone = active[i % len(active)]
+            service.memory_store[phone]
+            last_activity[phone] = datetime.utcnow()
+            previous_cleanup(last_activity, service.expiry)
+
+        def new_request(i):
+            # Expiry is no longer part of the request path; only the deadline is touched
+            service.get_memory(active[i % len(active)])
+
+        old = per_request(old_request, min(args.scan_requests, args.requests))
+        new = per_request(new_request, args.requests, args.repeat)
+
+        # One background sweep collecting the 1% of sessions that went idle
+        start = time.perf_counter()
+        collected = service.cleanup_expired()
+        sweep = time.perf_counter() - start
+        assert collected == idle
+
+        results.append(new)
+        print(f"{size:>10} {old * 1e6:>14.1f}µs {new * 1e6:>10.2f}µs {sweep * 1e3:>16.2f}ms")
+
+    flat = max(results) <= max(min(results) * GROWTH_LIMIT, NOISE_FLOOR_SECONDS)
+    print(f"\n{'✅ PASS' if flat else '❌ FAIL'} - per-request cost "
+          f"{'stays flat' if flat else 'grows'} with the number of sessions")
+    return 0 if flat else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte benchmark for /message versus /message/stream.
+Serves the API with uvicorn against a local stand-in for the Anthropic API that
+streams its reply one word at a time, and measures when the first byte, the
+first response token and the final event reach the client. Also checks that a
+tool call is reported with tool_start/tool_end events and in the final
+tools_used summary.
+
+Run from the repository root:
+    python tests/performance/benchmark_streaming_ttfb.py --requests 5 --token-delay 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+
+import httpx
+import uvicorn
+
+from tests.performance.fakes import FakeAnthropicServer
+
+REPLY = ("Welcome back to Villa Azul! Your late checkout is confirmed for one o'clock, and I have let "
+         "housekeeping know so they can plan around it. Is there anything else I can arrange for today?")
+
+
+def start_api(app) -> tuple:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def parse_events(lines):
+    """Yield (event, data) pairs from SSE lines."""
+    event = None
+    for line in lines:
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+
+async def time_blocking(client, phone: str) -> dict:
+    start = time.perf_counter()
+    async with client.stream("POST", "/message", json={"message": "Can I check out late?", "phone_number": phone}) as r:
+        first_byte, body = None, b""
+        async for chunk in r.aiter_bytes():
+            first_byte = first_byte or time.perf_counter() - start
+            body += chunk
+    return {"first_byte": first_byte, "first_token": first_byte, "total": time.perf_counter() - start,
+            "response": json.loads(body)["response"]}
+
+
+async def time_streaming(client, phone: str) -> dict:
+    start = time.perf_counter()
+    timings = {"first_byte": None, "first_token": None}
+    events = []
+    async with client.stream("POST", "/message/stream",
+                             json={"message": "Can I check out late?", "phone_number": phone}) as r:
+        async def lines():
+            async for line in r.aiter_lines():
+                timings["first_byte"] = timings["first_byte"] or time.perf_counter() - start
+                yield line
+
+        async for event, data in _aiter(parse_events, lines()):
+            if event == "token" and timings["first_token"] is None:
+                timings["first_token"] = time.perf_counter() - start
+            events.append((event, data))
+    return {**timings, "total": time.perf_counter() - start, "events": events}
+
+
+async def _aiter(parser, lines):
+    buffered = []
+    async for line in lines:
+        buffered.append(line)
+        if line == "":
+            for item in parser(buffered):
+                yield item
+            buffered = []
+
+
+def report(name: str, runs: list):
+    def median_ms(key):
+        return statistics.median(run[key] for run in runs) * 1000
+    print(f"{name:<18} {median_ms('first_byte'):>12.0f}ms {median_ms('first_token'):>12.0f}ms "
+          f"{median_ms('total'):>10.0f}ms")
+
+
+async def run(url: str, requests: int) -> tuple:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        blocking = [await time_blocking(client, f"+1555000{i:04d}") for i in range(requests)]
+        streaming = [await time_streaming(client, f"+1555100{i:04d}") for i in range(requests)]
+    return blocking, streaming
+
+
+async def run_tool_call(url: str) -> list:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        return (await time_streaming(client, "+14155550123"))["events"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming TTFB benchmark")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--token-delay", type=float, default=0.05, help="Seconds between streamed words")
+    args = parser.parse_args()
+
+    llm = FakeAnthropicServer(reply=REPLY, token_delay=args.token_delay).start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    api_server, thread, url = start_api(api.app)
+    try:
+        blocking, streaming = asyncio.run(run(url, args.requests))
+        llm.tool_call = {"name": "booking_details", "input": {}}
+        tool_events = asyncio.run(run_tool_call(url))
+    finally:
+        api_server.should_exit = True
+        thread.join(timeout=10)
+        llm.stop()
+
+    print("📡 Streaming Time-to-First-Byte Benchmark")
+    print("=" * 60)
+    print(f"Reply: {len(REPLY.split())} words, {args.token_delay * 1000:.0f}ms between words (median of "
+          f"{args.requests})\n")
+    print(f"{'endpoint':<18} {'first byte':>14} {'first token':>14} {'total':>12}")
+    report("/message", blocking)
+    report("/message/stream", streaming)
+
+    events = streaming[-1]["events"]
+    done = events[-1][1] if events and events[-1][0] == "done" else {}
+    streamed_text = "".join(data["text"] for event, data in events if event == "token")
+    kinds = [event for event, _ in tool_events]
+    tool_done = tool_events[-1][1] if tool_events and tool_events[-1][0] == "done" else {}
+    checks = {
+        "tokens reassemble the reply": streamed_text == REPLY == done.get("response") == blocking[-1]["response"],
+        "tool_start then tool_end before the reply": (
+            "tool_start" in kinds and "tool_end" in kinds
+            and kinds.index("tool_start") < kinds.index("tool_end") < kinds.index("token")
+        ),
+        "tools_used in final event": tool_done.get("tools_used") == ["booking_details"],
+        "first token well before the full reply": (
+            statistics.median(r["first_token"] for r in streaming)
+            < statistics.median(r["total"] for r in blocking) / 2
+        ),
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for per-message tool setup.
+Compares rebuilding the 15 StructuredTool wrappers on every message against
+looking up the shared GuestToolRegistry and binding the guest via context.
+
+Run from the repository root:
+    python tests/performance/benchmark_tool_registry.py --iterations 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from src.agents.tools import GuestToolRegistry, create_guest_tools, guest_context
+from src.api.main import guest_service, vector_store
+
+PHONE = "+14155550123"
+
+
+def per_message_build(iterations: int) -> float:
+    """Previous behaviour: construct all tools for every message."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with guest_context(PHONE):
+            tools = create_guest_tools(guest_service, vector_store)
+    assert len(tools) == 15
+    return (time.perf_counter() - start) / iterations
+
+
+def registry_lookup(iterations: int) -> float:
+    """Current behaviour: build once, then look up and bind the guest per message."""
+    registry = GuestToolRegistry(guest_service, vector_store)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with guest_context(PHONE):
+            tools = registry.tools
+    assert len(tools) == 15
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool setup micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print("🔧 Per-Message Tool Setup Benchmark")
+    print("=" * 50)
+    build = per_message_build(args.iterations)
+    lookup = registry_lookup(args.iterations * 100)
+    print(f"Rebuild 15 tools per message: {build * 1e6:10.1f} µs/message")
+    print(f"Shared registry lookup:       {lookup * 1e6:10.1f} µs/message")
+    print(f"Speedup: {build / lookup:,.0f}x")
+
+    with guest_context(PHONE):
+        profile = GuestToolRegistry(guest_service, vector_store).get("guest_profile").invoke({})
+    assert "Carlos" in profile, "registry tools must resolve the guest from the request context"
+    print("✅ Registry tools resolve the bound guest")
+
+
+if __name__ == "__main__":
+    main()
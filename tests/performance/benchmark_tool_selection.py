@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tool selection benchmark.
+Sends every prompt of the tool-selection evaluation sets
+(tests/evaluation/evaluation.py and evaluation_multilingual.py) through /message
+against a local stand-in for the Anthropic API, once offering every tool and
+once offering the selected subset, each in a fresh session. Reports input
+tokens per LLM request (as the stand-in counts them, about four bytes per
+token) and selection accuracy: the share of prompts whose expected tools were
+all among the tools sent to the model. Also checks that the core tools are
+always offered first, ending in a prompt-cache breakpoint, that the system
+prompt names them, and that a follow-up keeps the tool of the previous turn.
+
+Run from the repository root:
+    python tests/performance/benchmark_tool_selection.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+os.environ["TOOL_SELECTION_ENABLED"] = "true"
+
+import httpx
+
+from tests.evaluation.evaluation import TEST_CASES
+from tests.evaluation.evaluation_multilingual import MULTILINGUAL_TEST_CASES
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONE = "+14155550123"
+MIN_ACCURACY = 0.98
+MIN_TOKEN_SAVING = 0.2
+# Matches no cleaning phrase by itself
+FOLLOW_UP = "Friday at 11 works"
+
+
+def evaluation_prompts() -> list:
+    """(set, language, prompt, expected_tools) for both evaluation sets."""
+    prompts = [("evaluation", "English", case["prompt"], case["expected_tools"]) for case in TEST_CASES]
+    for language, categories in MULTILINGUAL_TEST_CASES.items():
+        for cases in categories.values():
+            prompts += [("multilingual", language, case["prompt"], case["expected_tools"]) for case in cases]
+    return prompts
+
+
+async def send(client: httpx.AsyncClient, llm: FakeAnthropicServer, message: str, fresh: bool = True) -> dict:
+    """One /message turn; returns its input tokens and the tool names of its LLM request."""
+    if fresh:
+        await client.delete(f"/session/{PHONE}")
+    response = await client.post("/message", json={"message": message, "phone_number": PHONE})
+    response.raise_for_status()
+    request = llm.requests[-1]
+    return {
+        "input_tokens": response.json()["debug_info"]["token_usage"]["input_tokens"],
+        "tools": [tool["name"] for tool in request.get("tools", [])],
+        "cached_tools": [tool["name"] for tool in request.get("tools", []) if "cache_control" in tool],
+        "system": json.dumps(request.get("system"), ensure_ascii=False),
+    }
+
+
+async def run(api, llm: FakeAnthropicServer, prompts: list) -> dict:
+    selector = api.tool_selector
+    results = {"all": [], "selected": []}
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        for mode in ("all", "selected"):
+            api.tool_selector = selector if mode == "selected" else None
+            api.prompt_cache = api.PromptCache(core_tools=selector.core_tools if mode == "selected" else None)
+            start = time.perf_counter()
+            for _, _, prompt, _ in prompts:
+                results[mode].append(await send(client, llm, prompt))
+            results[f"{mode}_seconds"] = time.perf_counter() - start
+        results["request"] = await send(client, llm, "Could someone come and tidy up the villa?")
+        results["follow_up"] = await send(client, llm, FOLLOW_UP, fresh=False)
+    api.tool_selector = selector
+    return results
+
+
+def select_us(selector, prompts: list, repeat: int = 5) -> float:
+    messages = [prompt for _, _, prompt, _ in prompts]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            selector.select(message)
+    return (time.perf_counter() - start) / (repeat * len(messages)) * 1e6
+
+
+def main():
+    prompts = evaluation_prompts()
+    llm = FakeAnthropicServer(reply="Happy to help with that.").start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    try:
+        r = asyncio.run(run(api, llm, prompts))
+    finally:
+        llm.stop()
+    latency = select_us(api.tool_selector, prompts)
+
+    totals = defaultdict(lambda: {"prompts": 0, "covered": 0, "tools": 0, "all_tokens": 0, "selected_tokens": 0})
+    missed = []
+    for (eval_set, language, prompt, expected), every, selected in zip(prompts, r["all"], r["selected"]):
+        covered = set(expected) <= set(selected["tools"])
+        if not covered:
+            missed.append((language, prompt, expected, selected["tools"]))
+        for key in [eval_set] + ([f"  {language}"] if eval_set == "multilingual" else []):
+            row = totals[key]
+            row["prompts"] += 1
+            row["covered"] += covered
+            row["tools"] += len(selected["tools"])
+            row["all_tokens"] += every["input_tokens"]
+            row["selected_tokens"] += selected["input_tokens"]
+
+    print("🧰 Tool Selection Benchmark")
+    print("=" * 50)
+    print(f"{'set':<16} {'prompts':>7} {'accuracy':>9} {'tools':>6} {'input tokens/request':>22} {'saved':>7}")
+    for name, row in totals.items():
+        n = row["prompts"]
+        saved = 1 - row["selected_tokens"] / row["all_tokens"]
+        print(f"{name:<16} {n:>7} {row['covered'] / n:>9.1%} {row['tools'] / n:>6.1f} "
+              f"{row['all_tokens'] / n:>10.0f} → {row['selected_tokens'] / n:<9.0f} {saved:>6.1%}")
+    print(f"All tools offered: {len(r['all'][0]['tools'])}; selection: {latency:.0f}µs per message")
+    print(f"Follow-up offered: {r['follow_up']['tools']}")
+    for language, prompt, expected, offered in missed:
+        print(f"     missed {expected} for {language} {prompt!r}: offered {offered}")
+
+    core = list(api.tool_selector.core_tools)
+    core_note = f"{', '.join(core[:-1])} and {core[-1]} are always available"
+    checks = {
+        f"expected tools offered for at least {MIN_ACCURACY:.0%} of prompts": all(
+            totals[name]["covered"] / totals[name]["prompts"] >= MIN_ACCURACY for name in ("evaluation", "multilingual")
+        ),
+        f"input tokens cut by at least {MIN_TOKEN_SAVING:.0%}": all(
+            1 - totals[name]["selected_tokens"] / totals[name]["all_tokens"] >= MIN_TOKEN_SAVING
+            for name in ("evaluation", "multilingual")
+        ),
+        "every tool offered when selection is off": all(len(x["tools"]) == len(api.tool_registry.tools)
+                                                        for x in r["all"]),
+        "core tools always offered first": all(x["tools"][:len(core)] == core for x in r["selected"]),
+        "cache breakpoint after the core tools": all(x["cached_tools"] == core[-1:] for x in r["selected"]),
+        "system prompt names the core tools only when selecting": (
+            all(core_note in x["system"] for x in r["selected"])
+            and not any("Only the tools relevant" in x["system"] for x in r["all"])
+        ),
+        "request offers its tool": "schedule_cleaning" in r["request"]["tools"],
+        "follow-up keeps the previous turn's tool": ("schedule_cleaning" in r["follow_up"]["tools"]
+                                                     and "schedule_cleaning" not in api.tool_selector.select(FOLLOW_UP)),
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
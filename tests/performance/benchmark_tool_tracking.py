@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tool tracking benchmark.
+Sends /message requests against a local stand-in for the Anthropic API that
+calls booking_details once and then replies with text mentioning a spa and
+recommendations. Compares the tools_used reported by the ToolUsageTracker
+callback with what the previous substring heuristics would have reported for
+the same agent results, and the CPU time each spends per response.
+
+Run from the repository root:
+    python tests/performance/benchmark_tool_tracking.py --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import httpx
+
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONE = "+14155550123"
+TOOL = "booking_details"
+REPLY = ("Your booking at Villa Azul runs until Sunday. While you are here I recommend the spa, "
+         "and the best local options for dinner are a short walk away.")
+
+ALL_TOOLS = [
+    "guest_profile", "booking_details", "property_info", "schedule_cleaning",
+    "modify_checkout_time", "request_transport", "escalate_to_manager",
+    "restaurant_reservation", "grocery_delivery", "maintenance_request",
+    "activity_booking", "meal_delivery",
+    "spa_services", "private_chef", "local_recommendations",
+]
+
+TOOL_PATTERNS = {
+    "guest_profile": ["your name is", "you are", "vip guest", "carlos", "guest profile", "guest information"],
+    "booking_details": ["check out", "check-out", "reservation", "booking", "room type", "confirmation", "villa azul"],
+    "property_info": ["wifi", "pool", "gym", "amenities", "facilities", "restaurant", "spa", "property"],
+    "schedule_cleaning": ["cleaning scheduled", "housekeeping", "cleaning team", "room cleaning"],
+    "modify_checkout_time": ["checkout time", "checkout updated", "departure time", "late checkout"],
+    "request_transport": ["transport requested", "arranged your transportation", "car has been", "pickup", "airport"],
+    "escalate_to_manager": ["escalated", "property manager", "get back to you"],
+    "restaurant_reservation": ["reservation for", "restaurant", "dining", "table booked", "secured a reservation"],
+    "grocery_delivery": ["grocery delivery", "groceries", "arranged grocery", "food supplies", "beverage delivery"],
+    "maintenance_request": ["reported", "maintenance", "repair", "broken", "not working", "issue"],
+    "activity_booking": ["arranged", "activity", "tour", "experience", "excursion", "booked"],
+    "meal_delivery": ["ordered", "meal", "food delivery", "restaurant delivery", "takeout"],
+    "spa_services": ["spa", "massage", "wellness", "relaxation", "therapeutic"],
+    "private_chef": ["private chef", "chef", "culinary", "dining experience", "meal preparation"],
+    "local_recommendations": ["recommend", "suggest", "local", "area", "best", "options"],
+}
+
+
+def heuristic_tools(result: dict) -> list:
+    """The substring detection /message used before tool calls were tracked."""
+    tools_used = []
+    for step in result.get("intermediate_steps", []):
+        if isinstance(step, tuple) and len(step) >= 2:
+            action = step[0]
+            if hasattr(action, "tool"):
+                tools_used.append(action.tool)
+            elif hasattr(action, "log"):
+                log_text = action.log.lower()
+                for tool in ALL_TOOLS:
+                    if tool in log_text:
+                        tools_used.append(tool)
+                        break
+    if "output" in result:
+        response_text = str(result["output"]).lower()
+        for tool_name, patterns in TOOL_PATTERNS.items():
+            for pattern in patterns:
+                if pattern in response_text:
+                    tools_used.append(tool_name)
+                    break
+    return list(set(tools_used))
+
+
+async def run(api, requests: int) -> tuple:
+    from src.agents.callbacks import ToolUsageTracker
+
+    results, tracked = [], []
+    for i in range(requests):
+        phone = f"+1555200{i:04d}" if i else PHONE
+        agent = api.get_agent(phone)
+        tracker = ToolUsageTracker()
+        results.append(await api.run_agent(agent, phone, "When do I check out?", callbacks=[tracker]))
+        tracked.append(tracker)
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        response = await client.post("/message", json={"message": "When do I check out?", "phone_number": PHONE})
+        response.raise_for_status()
+    return results, tracked, response.json()
+
+
+def cpu_us(fn, items, repeat: int = 200) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.process_time() - start) / (repeat * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool tracking benchmark")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    llm = FakeAnthropicServer(reply=REPLY, tool_call={"name": TOOL, "input": {}}).start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    try:
+        results, tracked, message = asyncio.run(run(api, args.requests))
+    finally:
+        llm.stop()
+
+    heuristic = [heuristic_tools(result) for result in results]
+    false_positives = sorted({tool for tools in heuristic for tool in tools} - {TOOL})
+    heuristic_cost = cpu_us(heuristic_tools, results)
+    tracker_cost = cpu_us(lambda tracker: (tracker.tools_used, tracker.summary()), tracked)
+    calls = message["debug_info"].get("tool_calls", [])
+
+    print("🧰 Tool Tracking Benchmark")
+    print("=" * 50)
+    print(f"Responses: {args.requests}, each calling {TOOL} once")
+    print(f"Heuristic tools_used: {sorted(heuristic[0])}")
+    print(f"Tracked tools_used:   {tracked[0].tools_used}")
+    print(f"Heuristic false positives: {false_positives}")
+    print(f"CPU per response: heuristic {heuristic_cost:.1f}µs, tracker {tracker_cost:.1f}µs")
+    print(f"/message tool_calls: {calls}")
+
+    checks = {
+        "tracker reports exactly the tool called": all(t.tools_used == [TOOL] for t in tracked),
+        "heuristic over-reports on reply text": bool(false_positives),
+        "/message tools_used from tracker": message["tools_used"] == [TOOL],
+        "tool_calls carry latency and result size": (
+            len(calls) == 1 and calls[0]["tool"] == TOOL
+            and "latency_ms" in calls[0] and calls[0]["result_chars"] > 0
+        ),
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
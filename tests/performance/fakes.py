@@ -0,0 +1,239 @@
+"""
+Test doubles shared by the performance benchmarks.
+Stand-ins for the Claude chat model so the API can be exercised without network access.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional, Union
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeSlowChatModel(BaseChatModel):
+    """Chat model that answers with a fixed reply after a fixed delay."""
+
+    delay: float = 1.0
+    reply: str = "Of course! Happy to help."
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-slow-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+
+class FakeAnthropicServer:
+    """
+    Local stand-in for the Anthropic Messages API.
+
+    Counts TCP connections opened by clients and records every request body so
+    tests can assert on connection reuse and on the payload sent to the model.
+    Emulates prompt caching: the prefix up to the last ``cache_control`` marker
+    is billed as a cache write the first time and a cache read afterwards.
+    With ``tool_call`` ({"name": ..., "input": {...}}, or a list of them) the
+    model first asks for those tools in one turn and answers with ``reply``
+    once the tool results are sent back.
+    """
+
+    def __init__(self, reply: str = "Of course! Happy to help.", delay: float = 0.0,
+                 token_delay: float = 0.0, tool_call: Union[dict, List[dict], None] = None):
+        self.reply = reply
+        self.delay = delay
+        self.token_delay = token_delay
+        self.tool_call = tool_call
+        self.connections_opened = 0
+        self.requests: List[dict] = []
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAnthropicServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _usage(self, body: dict) -> dict:
+        """Token usage for a request, with cache reads for previously seen prefixes."""
+        blocks = list(body.get("tools") or [])
+        system = body.get("system") or []
+        blocks += [{"type": "text", "text": system}] if isinstance(system, str) else list(system)
+        marked = [i for i, block in enumerate(blocks) if "cache_control" in block]
+        total = len(json.dumps(body)) // 4
+        if not marked:
+            return {"input_tokens": total, "output_tokens": 5}
+        prefix = json.dumps(blocks[:marked[-1] + 1], sort_keys=True)
+        prefix_tokens = len(prefix) // 4
+        with self._lock:
+            hit = prefix in self._cached_prefixes
+            self._cached_prefixes.add(prefix)
+        return {
+            "input_tokens": max(total - prefix_tokens, 0),
+            "output_tokens": 5,
+            "cache_read_input_tokens": prefix_tokens if hit else 0,
+            "cache_creation_input_tokens": 0 if hit else prefix_tokens,
+        }
+
+    def _wants_tool(self, body: dict) -> bool:
+        """Whether to answer with tool_call: only until a tool result comes back."""
+        if not self.tool_call:
+            return False
+        last = (body.get("messages") or [{}])[-1].get("content")
+        return not (isinstance(last, list) and any(block.get("type") == "tool_result" for block in last))
+
+    def _tool_calls(self) -> List[dict]:
+        return self.tool_call if isinstance(self.tool_call, list) else [self.tool_call]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections_opened += 1
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append(body)
+                if server.delay:
+                    time.sleep(server.delay)
+                if body.get("stream"):
+                    self._stream(body)
+                    return
+                tool = server._wants_tool(body)
+                content = ([{"type": "tool_use", "id": f"toolu_{len(server.requests)}_{i}", **call}
+                            for i, call in enumerate(server._tool_calls())]
+                           if tool else [{"type": "text", "text": server.reply}])
+                payload = json.dumps({
+                    "id": f"msg_{len(server.requests)}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body.get("model", "claude-test"),
+                    "content": content,
+                    "stop_reason": "tool_use" if tool else "end_turn",
+                    "stop_sequence": None,
+                    "usage": server._usage(body),
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body):
+                """Reply as Anthropic server-sent events, one event per word."""
+                usage = server._usage(body)
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("transfer-encoding", "chunked")
+                self.end_headers()
+                self._event("message_start", {"type": "message_start", "message": {
+                    "id": f"msg_{len(server.requests)}", "type": "message", "role": "assistant",
+                    "model": body.get("model", "claude-test"), "content": [],
+                    "stop_reason": None, "stop_sequence": None, "usage": {**usage, "output_tokens": 0},
+                }})
+                tool = server._wants_tool(body)
+                if tool:
+                    for i, call in enumerate(server._tool_calls()):
+                        if i:
+                            self._event("content_block_stop", {"type": "content_block_stop", "index": i - 1})
+                        self._event("content_block_start", {"type": "content_block_start", "index": i, "content_block": {
+                            "type": "tool_use", "id": f"toolu_{len(server.requests)}_{i}",
+                            "name": call["name"], "input": {},
+                        }})
+                        self._event("content_block_delta", {"type": "content_block_delta", "index": i, "delta": {
+                            "type": "input_json_delta", "partial_json": json.dumps(call.get("input", {})),
+                        }})
+                    last = len(server._tool_calls()) - 1
+                else:
+                    last = 0
+                    self._event("content_block_start", {"type": "content_block_start", "index": 0,
+                                                        "content_block": {"type": "text", "text": ""}})
+                    for i, word in enumerate(server.reply.split(" ")):
+                        if i and server.token_delay:
+                            time.sleep(server.token_delay)
+                        text = word if i == 0 else f" {word}"
+                        self._event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                            "delta": {"type": "text_delta", "text": text}})
+                self._event("content_block_stop", {"type": "content_block_stop", "index": last})
+                self._event("message_delta", {"type": "message_delta",
+                                              "delta": {"stop_reason": "tool_use" if tool else "end_turn",
+                                                        "stop_sequence": None},
+                                              "usage": usage})
+                self._event("message_stop", {"type": "message_stop"})
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def _event(self, name, data):
+                chunk = f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words embeddings for benchmarks.
+    Similar texts share hashed word buckets, so similarity search behaves sensibly
+    without downloading the sentence-transformers model.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return self._embed(text)
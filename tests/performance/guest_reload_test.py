@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Guest data hot-reload check.
+Serves three guests from a temporary copy of the demo data against a local
+stand-in for the Anthropic API, then edits one guest's name on disk. Verifies
+the file watcher swaps in the new data without a restart, that only that
+guest's cached prompt and agent are dropped, that the next request uses the
+new name, and that a malformed file keeps the previous data.
+
+Run from the repository root:
+    python tests/performance/guest_reload_test.py
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import httpx
+
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONES = ["+14155550123", "+14155559876", "+14155551001"]
+EDITED_PHONE = PHONES[1]
+NEW_NAME = "María López-Reyes"
+
+
+def cached_keys(cache) -> list:
+    return list(cache._cache._entries)
+
+
+async def run(api, server, guests_path: str) -> bool:
+    ok = True
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        async def send(phone: str):
+            response = await client.post("/message", json={"message": "Hello!", "phone_number": phone})
+            response.raise_for_status()
+            return json.dumps(server.requests[-1]["system"], ensure_ascii=False)
+
+        for phone in PHONES:
+            await send(phone)
+        prompts_before = cached_keys(api.prompt_cache)
+        agents_before = cached_keys(api.agent_cache)
+
+        with open(guests_path, encoding="utf-8") as f:
+            guests = json.load(f)
+        edited = next(g for g in guests if g["phone_number"] == EDITED_PHONE)
+        edited["name"] = NEW_NAME
+        with open(guests_path, "w", encoding="utf-8") as f:
+            json.dump(guests, f, ensure_ascii=False)
+
+        watcher = asyncio.create_task(api.guest_service.watch(0.05))
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if api.guest_service.get_guest(EDITED_PHONE)["name"] == NEW_NAME:
+                break
+        watcher.cancel()
+
+        swapped = api.guest_service.get_guest(EDITED_PHONE)["name"] == NEW_NAME
+        prompts_after = cached_keys(api.prompt_cache)
+        agents_after = cached_keys(api.agent_cache)
+        dropped_prompts = [key[0] for key in prompts_before if key not in prompts_after]
+        dropped_agents = [key[0] for key in agents_before if key not in agents_after]
+        print(f"Watcher picked up edit:  {swapped}")
+        print(f"Prompts dropped:         {dropped_prompts} ({len(prompts_after)} kept)")
+        print(f"Agents dropped:          {dropped_agents} ({len(agents_after)} kept)")
+        ok &= swapped and dropped_prompts == [edited["guest_id"]] and dropped_agents == [EDITED_PHONE]
+
+        system = await send(EDITED_PHONE)
+        print(f"Next prompt uses name:   {NEW_NAME in system}")
+        ok &= NEW_NAME in system
+
+        with open(guests_path, "w", encoding="utf-8") as f:
+            f.write("[{\"guest_id\": ")
+        failed = await client.post("/admin/guests/reload")
+        kept = api.guest_service.get_guest(EDITED_PHONE) is not None
+        print(f"Malformed file:          reload returns {failed.status_code}, previous data kept = {kept}")
+        ok &= failed.status_code == 500 and kept
+
+        with open(guests_path, "w", encoding="utf-8") as f:
+            json.dump(guests, f, ensure_ascii=False)
+        reloaded = (await client.post("/admin/guests/reload")).json()
+        print(f"Admin reload:            {reloaded['guests_loaded']} guests in {reloaded['duration_ms']}ms")
+        ok &= reloaded["guests_loaded"] == len(guests)
+    return ok
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    guests_path = os.path.join(workdir, "guests.json")
+    bookings_path = os.path.join(workdir, "bookings.json")
+    shutil.copy(os.path.join(ROOT, "data/demo/guests.json"), guests_path)
+    shutil.copy(os.path.join(ROOT, "data/demo/bookings.json"), bookings_path)
+
+    server = FakeAnthropicServer().start()
+    os.environ["ANTHROPIC_API_URL"] = server.url
+    os.environ["GUESTS_FILE"] = guests_path
+    os.environ["BOOKINGS_FILE"] = bookings_path
+    from src.api import main as api
+
+    print("♻️  Guest Data Hot-Reload Check")
+    print("=" * 50)
+    try:
+        ok = asyncio.run(run(api, server, guests_path))
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Per-request latency breakdown check.
+Sends /message requests against a local stand-in for the Anthropic API that
+answers after a fixed delay and calls property_info once per turn, with the
+vector store backed by a temporary Chroma collection. Verifies the
+Server-Timing header splits each request into agent build, LLM round-trips,
+tool, retrieval and serialization time, that /debug/latency reports rolling
+p50/p95/p99 for each stage, and reports the cost of one span.
+
+Run from the repository root:
+    python tests/performance/latency_breakdown_test.py --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+import chromadb
+import httpx
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from tests.performance.fakes import FakeAnthropicServer, HashEmbeddings
+
+PHONES = ["+14155550123", "+14155559876"]
+PROPERTY_ID = "p1"
+LLM_DELAY = 0.05
+STAGES = ("total", "agent_build", "llm", "tool", "retrieval", "serialization")
+
+
+def attach_vector_store(api, persist_dir: str):
+    embeddings = HashEmbeddings()
+    client = chromadb.PersistentClient(path=persist_dir)
+    store = Chroma(client=client, embedding_function=embeddings,
+                   collection_name=f"{api.VectorStoreService.PROPERTY_COLLECTION_PREFIX}{PROPERTY_ID}")
+    store.add_documents([Document(page_content="The WiFi password is omotenashi2024.",
+                                  metadata={"property_id": PROPERTY_ID})])
+    service = api.vector_store
+    service.persist_directory = persist_dir
+    service._embeddings = embeddings
+    service._vectorstore = Chroma(client=client, embedding_function=embeddings)
+    service._property_collections = service._list_property_collections(service._vectorstore)
+
+
+def parse_server_timing(header: str) -> dict:
+    """{name: (dur_ms, calls)} from a Server-Timing header."""
+    metrics = {}
+    for metric in filter(None, (part.strip() for part in header.split(","))):
+        name, *params = metric.split(";")
+        duration = next(float(p[4:]) for p in params if p.startswith("dur="))
+        calls = re.search(r'desc="(\d+) calls"', metric)
+        metrics[name] = (duration, int(calls.group(1)) if calls else 1)
+    return metrics
+
+
+async def run(api, requests: int) -> tuple:
+    timings = []
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        for i in range(requests):
+            response = await client.post("/message", json={"message": f"What is the WiFi password? ({i})",
+                                                           "phone_number": PHONES[i % len(PHONES)]})
+            response.raise_for_status()
+            timings.append((parse_server_timing(response.headers.get("server-timing", "")), response.json()))
+        latency = (await client.get("/debug/latency")).json()
+    return timings, latency
+
+
+def span_cost_us(tracer, spans: int = 5000) -> float:
+    with tracer.request("span-cost"):
+        start = time.perf_counter()
+        for _ in range(spans):
+            with tracer.span("serialization"):
+                pass
+        return (time.perf_counter() - start) / spans * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency breakdown check")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    llm = FakeAnthropicServer(delay=LLM_DELAY, tool_call={"name": "property_info",
+                                                          "input": {"query": "wifi password"}}).start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    with tempfile.TemporaryDirectory() as persist_dir:
+        attach_vector_store(api, persist_dir)
+        try:
+            timings, latency = asyncio.run(run(api, args.requests))
+        finally:
+            llm.stop()
+    cost = span_cost_us(api.request_tracer)
+
+    print("⏱️  Request Latency Breakdown Check")
+    print("=" * 50)
+    first, _ = timings[0]
+    print("First request Server-Timing:")
+    for name, (duration, calls) in first.items():
+        print(f"  {name:<14} {duration:>8.1f}ms" + (f" ({calls} calls)" if calls > 1 else ""))
+    print(f"\n/debug/latency over {args.requests} requests:")
+    print(f"  {'stage':<14} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in latency["stages"].items():
+        print(f"  {name:<14} {stats['count']:>6} {stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms "
+              f"{stats['p99_ms']:>7.1f}ms")
+    print(f"Span overhead: {cost:.1f}µs per span")
+
+    stages_seen = set().union(*(metrics for metrics, _ in timings))
+    checks = {
+        "Server-Timing covers every stage": stages_seen >= set(STAGES),
+        "agent built once per guest": sum("agent_build" in metrics for metrics, _ in timings) == len(PHONES),
+        "two LLM round-trips per request": all(metrics["llm"][1] == 2 for metrics, _ in timings),
+        "LLM time accounts for the model delay": all(metrics["llm"][0] >= 2 * LLM_DELAY * 1000
+                                                     for metrics, _ in timings),
+        "stages fit inside the request total": all(
+            max(duration for name, (duration, _) in metrics.items() if name != "total") <= metrics["total"][0]
+            for metrics, _ in timings
+        ),
+        "response body unchanged": all(body["tools_used"] == ["property_info"] for _, body in timings),
+        "rolling percentiles per stage": all(
+            {"p50_ms", "p95_ms", "p99_ms"} <= set(latency["stages"].get(name, {})) for name in STAGES
+        ) and latency["stages"]["total"]["count"] == args.requests,
+        "per-tool percentiles": "property_info" in latency["tools"],
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
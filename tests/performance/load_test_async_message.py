@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Load test for the async /message execution path.
+Fires N concurrent guests at the API against a stubbed slow LLM and checks that
+they are served in about the time of a single LLM call rather than N of them.
+
+Run from the repository root:
+    python tests/performance/load_test_async_message.py --guests 20 --delay 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import httpx
+
+from src.api import main
+from tests.performance.fakes import FakeSlowChatModel
+
+
+async def run_load_test(guests: int, delay: float) -> float:
+    """Send one message per guest concurrently and return the wall-clock time."""
+    fake_llm = FakeSlowChatModel(delay=delay)
+    main.get_shared_llm = lambda: fake_llm
+
+    with open("data/demo/guests.json", "r", encoding="utf-8") as f:
+        phones = [g["phone_number"] for g in json.load(f)][:guests]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        async def send(phone):
+            response = await client.post("/message", json={"message": "Hello!", "phone_number": phone})
+            response.raise_for_status()
+            return response.json()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(send(phone) for phone in phones))
+        elapsed = time.perf_counter() - start
+
+    assert len(results) == len(phones)
+    assert fake_llm.calls == len(phones)
+    return elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Concurrent /message load test")
+    parser.add_argument("--guests", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds per stubbed LLM call")
+    args = parser.parse_args()
+
+    print("⚡ Async /message Load Test")
+    print("=" * 50)
+    elapsed = asyncio.run(run_load_test(args.guests, args.delay))
+    serial = args.guests * args.delay
+    print(f"Guests served: {args.guests}")
+    print(f"Stubbed LLM latency: {args.delay:.2f}s")
+    print(f"Wall-clock: {elapsed:.2f}s (serial would be {serial:.2f}s)")
+
+    # Allow generous overhead for agent construction on a cold cache
+    if elapsed < args.delay * 2:
+        print("✅ PASS - concurrent guests served in about one LLM call")
+        return 0
+    print("❌ FAIL - requests were serialized")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Conversation memory growth check.
+Replays a long conversation for one chatty guest through the API, against a
+local stand-in for the Anthropic API, in "buffer" and "window" memory modes.
+Compares the history resent to the model on the last turn and the history held
+in memory, and checks /session and /debug/status report the session size.
+
+Run from the repository root:
+    python tests/performance/memory_growth_test.py --turns 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import httpx
+
+from src.agents.memory import SUMMARY_PREFIX
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONE = "+14155550123"
+REPLY = "Certainly! " + "Here are the details you asked about, with a few local tips as well. " * 6
+
+
+async def converse(api, server, mode: str, turns: int) -> dict:
+    api.MEMORY_MODE = mode
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        await client.delete(f"/session/{PHONE}")
+        for turn in range(turns):
+            message = f"Question {turn}: could you tell me more about the restaurants near the villa?"
+            response = await client.post("/message", json={"message": message, "phone_number": PHONE})
+            response.raise_for_status()
+        session = (await client.get(f"/session/{PHONE}")).json()
+        status = (await client.get("/debug/status")).json()
+    last_request = server.requests[-1]
+    return {
+        "sent_messages": len(last_request["messages"]),
+        "sent_bytes": len(json.dumps(last_request["messages"])),
+        "sent_summary": SUMMARY_PREFIX in json.dumps(last_request["messages"]),
+        "session": session,
+        "status": status["memory"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation memory growth check")
+    parser.add_argument("--turns", type=int, default=60)
+    args = parser.parse_args()
+
+    server = FakeAnthropicServer(reply=REPLY).start()
+    os.environ["ANTHROPIC_API_URL"] = server.url
+    from src.api import main as api
+
+    print("🧠 Conversation Memory Growth Check")
+    print("=" * 50)
+    try:
+        results = {mode: asyncio.run(converse(api, server, mode, args.turns)) for mode in ("buffer", "window")}
+    finally:
+        server.stop()
+
+    for mode, result in results.items():
+        size = result["session"]["history_size"]
+        print(f"{mode:>6}: last request {result['sent_messages']:>4} messages / {result['sent_bytes']:>7} bytes, "
+              f"held {size['messages']:>4} messages / ~{size['estimated_tokens']} tokens, "
+              f"summarized {size['summarized_turns']} turns")
+
+    window = results["window"]
+    window_size = window["session"]["history_size"]
+    ok = True
+    ok &= window["sent_bytes"] < results["buffer"]["sent_bytes"] / 3
+    ok &= window_size["estimated_tokens"] <= api.MEMORY_MAX_TOKENS
+    ok &= window_size["summarized_turns"] > 0 and bool(window["session"]["summary"])
+    ok &= window["sent_summary"]
+    ok &= window["status"]["sessions"] >= 1 and window["status"]["estimated_tokens"] > 0
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
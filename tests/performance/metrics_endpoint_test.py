@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Prometheus /metrics check.
+Sends /message requests that call property_info against a local stand-in for
+the Anthropic API and verifies /metrics reports request counts and latency per
+route template, agent iterations, tool calls and latency, LLM tokens,
+retrieval latency and the session count. Then serves the API with gunicorn and
+two workers in multiprocess mode and checks every scrape reports the totals of
+both workers. Reports the cost of recording one agent run.
+
+Needs gunicorn for the multiprocess part. Run from the repository root:
+    python tests/performance/metrics_endpoint_test.py --requests 10
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from tests.performance.fakes import FakeAnthropicServer
+from tests.performance.latency_breakdown_test import attach_vector_store
+
+PHONES = ["+14155550123", "+14155559876"]
+TOOL_CALL = {"name": "property_info", "input": {"query": "wifi password"}}
+
+
+def samples(text: str) -> dict:
+    """{(sample name, frozenset(labels)): value} from the Prometheus text format."""
+    return {
+        (sample.name, frozenset(sample.labels.items())): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def value(metrics: dict, name: str, **labels) -> float:
+    return metrics.get((name, frozenset(labels.items())), 0.0)
+
+
+async def run_in_process(api, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        for i in range(requests):
+            response = await client.post("/message", json={"message": f"WiFi password? ({i})",
+                                                           "phone_number": PHONES[i % len(PHONES)]})
+            response.raise_for_status()
+        await client.get(f"/session/{PHONES[0]}")
+        scrape = await client.get("/metrics")
+    return {"content_type": scrape.headers["content-type"], "metrics": samples(scrape.text)}
+
+
+def record_cost_us(api, runs: int = 20000) -> float:
+    from src.agents.callbacks import TokenUsageTracker, ToolUsageTracker
+
+    tokens, tools = TokenUsageTracker(), ToolUsageTracker()
+    tokens.llm_calls, tokens.input_tokens, tokens.output_tokens = 2, 1800, 120
+    tools.calls = [{"tool": "property_info", "args": {}, "latency_ms": 3.2, "result_chars": 40}]
+    start = time.perf_counter()
+    for _ in range(runs):
+        api.record_agent_run(tokens, tools)
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def run_gunicorn(llm_url: str, requests: int, workers: int = 2) -> tuple:
+    """Serve the API with gunicorn in multiprocess mode; return (scrapes, pids answering /metrics)."""
+    metrics_dir = tempfile.mkdtemp(prefix="omotenashi-metrics-")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": metrics_dir, "ANTHROPIC_API_URL": llm_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "infrastructure/docker/gunicorn.conf.py",
+         "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+         "--worker-class", "uvicorn.workers.UvicornWorker", "src.api.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 120
+        while True:
+            try:
+                if httpx.get(f"{url}/health/live", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.time() > deadline or server.poll() is not None:
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.25)
+        # A fresh connection per request lets the kernel spread them across workers
+        for i in range(requests):
+            httpx.post(f"{url}/message", json={"message": f"Hello ({i})", "phone_number": PHONES[i % len(PHONES)]},
+                       timeout=30).raise_for_status()
+        scrapes = [samples(httpx.get(f"{url}/metrics", timeout=10).text) for _ in range(6)]
+        worker_files = {name.rsplit("_", 1)[-1] for name in os.listdir(metrics_dir) if name.endswith(".db")}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    return scrapes, len(worker_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prometheus metrics check")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    llm = FakeAnthropicServer(tool_call=TOOL_CALL).start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    try:
+        with tempfile.TemporaryDirectory() as persist_dir:
+            attach_vector_store(api, persist_dir)
+            single = asyncio.run(run_in_process(api, args.requests))
+        llm.tool_call = None
+        has_gunicorn = shutil.which("gunicorn") is not None
+        scrapes, worker_files = run_gunicorn(llm.url, args.requests) if has_gunicorn else ([], 0)
+    finally:
+        llm.stop()
+    cost = record_cost_us(api)
+
+    m = single["metrics"]
+    n = args.requests
+    print("📈 Prometheus Metrics Check")
+    print("=" * 50)
+    print(f"/message requests:        {value(m, 'concierge_http_requests_total', method='POST', endpoint='/message', status='200'):.0f}")
+    print(f"Agent iterations (sum):   {value(m, 'concierge_agent_iterations_sum'):.0f} over "
+          f"{value(m, 'concierge_agent_iterations_count'):.0f} messages")
+    print(f"property_info calls:      {value(m, 'concierge_tool_calls_total', tool='property_info', status='ok'):.0f}")
+    print(f"LLM tokens in/out:        {value(m, 'concierge_llm_tokens_total', type='input'):.0f} / "
+          f"{value(m, 'concierge_llm_tokens_total', type='output'):.0f}")
+    print(f"Recording one agent run:  {cost:.1f}µs")
+    if scrapes:
+        totals = [value(s, "concierge_http_requests_total", method="POST", endpoint="/message", status="200")
+                  for s in scrapes]
+        print(f"gunicorn: {worker_files} workers wrote samples; /message count per scrape: {totals}")
+    else:
+        print("⏭️  gunicorn not installed, skipping the multiprocess part")
+
+    checks = {
+        "Prometheus text format": single["content_type"].startswith("text/plain"),
+        "requests by route template": (
+            value(m, "concierge_http_requests_total", method="POST", endpoint="/message", status="200") == n
+            and value(m, "concierge_http_requests_total", method="GET", endpoint="/session/{phone}",
+                      status="200") == 1
+        ),
+        "latency histogram per endpoint": value(m, "concierge_http_request_duration_seconds_count",
+                                                method="POST", endpoint="/message") == n,
+        "two agent iterations per message": (value(m, "concierge_agent_iterations_count") == n
+                                             and value(m, "concierge_agent_iterations_sum") == 2 * n),
+        "tool calls and latency": (
+            value(m, "concierge_tool_calls_total", tool="property_info", status="ok") == n
+            and value(m, "concierge_tool_duration_seconds_count", tool="property_info") == n
+        ),
+        "input and output tokens": all(value(m, "concierge_llm_tokens_total", type=kind) > 0
+                                       for kind in ("input", "output")),
+        "retrieval latency": value(m, "concierge_retrieval_duration_seconds_count") == n,
+        "session count": value(m, "concierge_sessions") == len(PHONES),
+    }
+    if scrapes:
+        checks["every scrape aggregates all workers"] = worker_files > 1 and all(t == n for t in totals)
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
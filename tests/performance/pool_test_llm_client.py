@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Connection pooling check for the shared Claude client.
+Points the pooled client at a local stand-in for the Anthropic API that counts
+TCP connection opens, then verifies that repeated and concurrent calls reuse
+keep-alive connections and that outgoing requests carry the configured
+connect and read timeouts.
+
+Run from the repository root:
+    python tests/performance/pool_test_llm_client.py --calls 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from tests.performance.fakes import FakeAnthropicServer
+
+CONNECT_TIMEOUT = 2.5
+READ_TIMEOUT = 45.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared Claude client pooling check")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    server = FakeAnthropicServer(delay=0.05).start()
+    os.environ["ANTHROPIC_API_URL"] = server.url
+    os.environ["LLM_MAX_CONNECTIONS"] = str(args.concurrency)
+    os.environ["LLM_CONNECT_TIMEOUT_SECONDS"] = str(CONNECT_TIMEOUT)
+    os.environ["LLM_READ_TIMEOUT_SECONDS"] = str(READ_TIMEOUT)
+
+    from src.agents import llm as llm_module
+
+    print("🔌 Shared Claude Client Pooling Check")
+    print("=" * 50)
+    failures = 0
+    try:
+        llm = llm_module.get_shared_llm()
+        assert llm is llm_module.get_shared_llm(), "shared client must be a singleton"
+
+        # The timeouts the transport actually applies travel in each request's extensions
+        sent_timeouts = []
+
+        async def record_async(request):
+            sent_timeouts.append(request.extensions["timeout"])
+
+        pool = llm_module._get_pool()
+        pool.sync_client.event_hooks = {"request": [lambda request: sent_timeouts.append(request.extensions["timeout"])]}
+        pool.async_client.event_hooks = {"request": [record_async]}
+
+        for _ in range(args.calls):
+            llm.invoke("Hello")
+        sequential_opens = server.connections_opened
+        print(f"Sequential: {args.calls} calls -> {sequential_opens} connection(s) opened")
+        if sequential_opens != 1:
+            failures += 1
+            print("❌ FAIL - sequential calls should reuse one keep-alive connection")
+
+        async def burst():
+            await asyncio.gather(*(llm.ainvoke("Hello") for _ in range(args.calls)))
+            await asyncio.gather(*(llm.ainvoke("Hello") for _ in range(args.calls)))
+            stats = llm_module.get_pool_stats()
+            await llm_module.close_shared_llm()
+            return stats
+
+        before = server.connections_opened
+        stats = asyncio.run(burst())
+        concurrent_opens = server.connections_opened - before
+        print(f"Concurrent: 2 x {args.calls} calls -> {concurrent_opens} connection(s) opened "
+              f"(max_connections={args.concurrency})")
+        if concurrent_opens > args.concurrency:
+            failures += 1
+            print("❌ FAIL - pool opened more connections than its limit")
+
+        applied = {(t["connect"], t["read"]) for t in sent_timeouts}
+        print(f"Request timeouts (connect, read): {sorted(applied)} over {len(sent_timeouts)} requests")
+        if len(sent_timeouts) != 3 * args.calls or applied != {(CONNECT_TIMEOUT, READ_TIMEOUT)}:
+            failures += 1
+            print(f"❌ FAIL - every request should carry connect={CONNECT_TIMEOUT}s and read={READ_TIMEOUT}s")
+
+        print(f"Pool stats: {stats}")
+        if stats["connections_opened"] != server.connections_opened or stats["requests_sent"] != 3 * args.calls:
+            failures += 1
+            print("❌ FAIL - pool stats should count every connection the server accepted and every request")
+    finally:
+        server.stop()
+
+    if failures:
+        return 1
+    print("✅ PASS - Claude requests reuse pooled connections")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL guest backend check.
+Starts a throwaway PostgreSQL cluster, loads the demo guests and bookings with
+data/migrations/migration_strategy.py, and verifies PostgresGuestService returns
+the same guests and current bookings as the JSON GuestService, serves repeat
+lookups from its read-through cache, picks up edits after the TTL or a reload,
+keeps serving cached records when the database goes away, and drives a /message
+request end to end. Reports cached versus database lookup latency.
+
+Needs asyncpg and the PostgreSQL server binaries (initdb, pg_ctl) on PATH or in
+PG_BIN. When run as root the server runs as PG_RUN_AS (default "nobody").
+Run from the repository root:
+    python tests/performance/postgres_guest_service_test.py
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import httpx
+
+from tests.performance.fakes import FakeAnthropicServer
+
+# PostgreSQL version of the tables in docs/architecture/DATABASE_SCHEMA.md used by the migration
+SCHEMA = """
+CREATE TABLE properties (
+    property_id VARCHAR(50) PRIMARY KEY,
+    property_name VARCHAR(255) NOT NULL,
+    property_type VARCHAR(100) DEFAULT 'vacation_rental',
+    location VARCHAR(255),
+    amenities JSON,
+    max_guests INTEGER
+);
+CREATE TABLE guests (
+    guest_id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    phone_number VARCHAR(20) NOT NULL UNIQUE CHECK (phone_number ~ '^\\+[0-9]+$'),
+    email VARCHAR(255),
+    preferred_language VARCHAR(20) NOT NULL DEFAULT 'English',
+    vip_status BOOLEAN DEFAULT FALSE,
+    dietary_restrictions TEXT,
+    accessibility_needs TEXT,
+    emergency_contact JSON,
+    guest_preferences JSON,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE TABLE bookings (
+    booking_id VARCHAR(50) PRIMARY KEY,
+    guest_id VARCHAR(50) NOT NULL REFERENCES guests(guest_id) ON DELETE CASCADE,
+    property_id VARCHAR(50) NOT NULL REFERENCES properties(property_id) ON DELETE CASCADE,
+    check_in_date TIMESTAMP NOT NULL,
+    check_out_date TIMESTAMP NOT NULL,
+    number_of_guests INTEGER DEFAULT 1,
+    room_type VARCHAR(100),
+    booking_status VARCHAR(20) DEFAULT 'confirmed',
+    total_amount DECIMAL(10,2),
+    currency VARCHAR(3) DEFAULT 'USD',
+    special_requests TEXT,
+    booking_source VARCHAR(100),
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX idx_bookings_guest_id ON bookings (guest_id);
+CREATE INDEX idx_bookings_property_id ON bookings (property_id);
+INSERT INTO properties (property_id, property_name) VALUES ('p1', 'Villa Azul');
+"""
+
+GUEST_FIELDS = ("guest_id", "name", "phone_number", "preferred_language", "vip_status")
+BOOKING_FIELDS = ("guest_id", "property_id", "check_in", "check_out", "special_requests")
+
+
+class LocalPostgres:
+    """A PostgreSQL cluster in a temporary directory, stopped and removed on exit."""
+
+    def __init__(self, bin_dir: str):
+        self.bin_dir = bin_dir
+        self.workdir = tempfile.mkdtemp(prefix="omotenashi-pg-")
+        self.data_dir = os.path.join(self.workdir, "data")
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"postgresql://postgres@127.0.0.1:{self.port}/postgres"
+        self.run_as = []
+        if os.geteuid() == 0:
+            # PostgreSQL refuses to run as root
+            user = os.getenv("PG_RUN_AS", "nobody")
+            shutil.chown(self.workdir, user)
+            self.run_as = ["runuser", "-u", user, "--"]
+
+    def _run(self, tool: str, *args: str):
+        subprocess.run(self.run_as + [os.path.join(self.bin_dir, tool), *args],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def start(self) -> "LocalPostgres":
+        self._run("initdb", "-D", self.data_dir, "-U", "postgres", "--auth=trust", "-E", "UTF8")
+        options = f"-p {self.port} -k {self.workdir} -c listen_addresses=127.0.0.1"
+        self._run("pg_ctl", "-D", self.data_dir, "-o", options, "-l", os.path.join(self.workdir, "log"), "-w", "start")
+        return self
+
+    def stop(self):
+        try:
+            self._run("pg_ctl", "-D", self.data_dir, "-m", "immediate", "-w", "stop")
+        except subprocess.CalledProcessError:
+            pass
+
+    def remove(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def find_pg_bin():
+    bin_dir = os.getenv("PG_BIN")
+    if bin_dir:
+        return bin_dir
+    initdb = shutil.which("initdb")
+    return os.path.dirname(initdb) if initdb else None
+
+
+async def load_demo_data(database_url: str):
+    from data.migrations.migration_strategy import OmotenashiDataMigration
+
+    with open(os.path.join(ROOT, "data/demo/guests.json"), encoding="utf-8") as f:
+        guests = json.load(f)
+    with open(os.path.join(ROOT, "data/demo/bookings.json"), encoding="utf-8") as f:
+        bookings = json.load(f)
+
+    migration = OmotenashiDataMigration(database_url)
+    await migration.connect()
+    try:
+        async with migration.pool.acquire() as conn:
+            await conn.execute(SCHEMA)
+        await migration.migrate_guests(guests)
+        await migration.migrate_bookings(bookings)
+    finally:
+        await migration.close()
+    return guests
+
+
+def subset(record, fields):
+    return {name: record.get(name) for name in fields} if record else None
+
+
+def timed(fn, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+async def send_message(api, server, phone: str) -> str:
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        response = await client.post("/message", json={"message": "Hello!", "phone_number": phone})
+        response.raise_for_status()
+    return json.dumps(server.requests[-1]["system"], ensure_ascii=False)
+
+
+def run_checks(postgres: LocalPostgres, guests: list) -> bool:
+    server = FakeAnthropicServer().start()
+    os.environ["ANTHROPIC_API_URL"] = server.url
+    os.environ["GUEST_DATA_BACKEND"] = "postgres"
+    os.environ["DATABASE_URL"] = postgres.url
+    from src.api import main as api
+    from src.models.guest_repository import PostgresGuestService
+
+    json_service = api.GuestService()
+    service = PostgresGuestService(postgres.url, cache_ttl_seconds=0.5)
+    phones = [g["phone_number"] for g in guests]
+    checks = {}
+    try:
+        same = True
+        for phone in phones:
+            expected_guest, expected_booking = json_service.get_guest_and_booking(phone)
+            guest, booking = service.get_guest_and_booking(phone)
+            same &= subset(guest, GUEST_FIELDS) == subset(expected_guest, GUEST_FIELDS)
+            same &= subset(booking, BOOKING_FIELDS) == subset(expected_booking, BOOKING_FIELDS)
+        checks["same guests and bookings as JSON"] = same
+        asyncio.run(service.prefetch_counts())
+        checks["counts"] = (service.guest_count, service.booking_count) == (json_service.guest_count,
+                                                                            json_service.booking_count)
+        checks["property name joined"] = service.get_guest_and_booking(phones[0])[1]["property_name"] == "Villa Azul"
+        checks["unknown phone"] = service.get_guest("+15550000000") is None
+
+        uncached_phone = phones[-1]
+        service.reload()
+        database = timed(lambda p: (service.reload(), service.get_guest(p)), [uncached_phone] * 200)
+        for phone in phones:
+            service.get_guest(phone)
+        queries = service.queries
+        cached = timed(service.get_guest, phones * 20)
+        checks["repeat lookups served from cache"] = service.queries == queries
+
+        async def edit_name():
+            import asyncpg
+            conn = await asyncpg.connect(postgres.url)
+            await conn.execute("UPDATE guests SET name = 'Carlos M. Marin' WHERE phone_number = $1", phones[0])
+            await conn.close()
+
+        asyncio.run(edit_name())
+        stale = service.get_guest(phones[0])["name"]
+        time.sleep(0.6)
+        checks["edit visible after TTL"] = (stale, service.get_guest(phones[0])["name"]) == (
+            "Carlos Marin", "Carlos M. Marin")
+
+        system = asyncio.run(send_message(api, server, phones[0]))
+        checks["/message prompt from database"] = "Carlos M. Marin" in system
+
+        service.get_guest(phones[1])
+        postgres.stop()
+        time.sleep(0.6)
+        try:
+            checks["expired records served while database is down"] = service.get_guest(phones[1]) is not None
+        except Exception:
+            checks["expired records served while database is down"] = False
+    finally:
+        service.close()
+        api.guest_service.close()
+        server.stop()
+
+    print(f"Lookup latency: cached {cached * 1e6:.1f}µs, database {database * 1e6:.0f}µs "
+          f"({database / cached:.0f}x)")
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    return all(checks.values())
+
+
+def main():
+    print("🐘 PostgreSQL Guest Service Check")
+    print("=" * 50)
+    bin_dir = find_pg_bin()
+    if not bin_dir:
+        print("⏭️  SKIP - PostgreSQL server binaries not found (put initdb on PATH or set PG_BIN)")
+        return 0
+
+    postgres = LocalPostgres(bin_dir).start()
+    try:
+        guests = asyncio.run(load_demo_data(postgres.url))
+        ok = run_checks(postgres, guests)
+    finally:
+        postgres.stop()
+        postgres.remove()
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+PostgresGuestService check against a stubbed asyncpg pool.
+Runs without a PostgreSQL server: a stand-in pool answers the repository's
+statements from in-memory rows, optionally after a delay. Verifies lookups by
+any phone formatting query the normalized number once and are then served
+from the cache, that counts and the guest list are fetched without blocking
+the event loop, and that a query slower than the timeout fails fast or falls
+back to the expired cached records.
+
+Run from the repository root:
+    python tests/performance/postgres_guest_stub_test.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.models.guest_repository import (
+    ALL_GUESTS_SQL, BOOKINGS_BY_PROPERTY_SQL, COUNTS_SQL, GUEST_BY_ID_SQL, GUEST_BY_PHONE_SQL, PostgresGuestService,
+)
+
+QUERY_TIMEOUT = 0.1
+GUESTS = [
+    {"guest_id": "g1", "name": "Carlos Marin", "phone_number": "+14155550123", "preferred_language": "English",
+     "vip_status": True, "email": None, "dietary_restrictions": None, "accessibility_needs": None},
+    {"guest_id": "g2", "name": "Maria Garcia", "phone_number": "+14155559876", "preferred_language": "Spanish",
+     "vip_status": False, "email": None, "dietary_restrictions": None, "accessibility_needs": None},
+]
+BOOKINGS = [
+    {"booking_id": "b1", "guest_id": "g1", "property_id": "p1", "property_name": "Villa Azul",
+     "check_in_date": datetime(2025, 6, 10, 15, tzinfo=timezone.utc),
+     "check_out_date": datetime(2025, 6, 17, 11, tzinfo=timezone.utc), "special_requests": None,
+     "room_type": "Standard", "number_of_guests": 2, "booking_status": "confirmed"},
+]
+
+
+class StubPool:
+    """Answers the repository's statements from GUESTS and BOOKINGS, like asyncpg.Pool.fetch."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.calls = []
+
+    async def fetch(self, sql: str, *args) -> list:
+        self.calls.append((sql, args))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if sql in (GUEST_BY_PHONE_SQL, GUEST_BY_ID_SQL):
+            field = "phone_number" if sql == GUEST_BY_PHONE_SQL else "guest_id"
+            rows = []
+            for guest in (g for g in GUESTS if g[field] == args[0]):
+                bookings = [b for b in BOOKINGS if b["guest_id"] == guest["guest_id"]]
+                rows += [{**guest, **b} for b in bookings] or [{**guest, "booking_id": None}]
+            return rows
+        if sql == BOOKINGS_BY_PROPERTY_SQL:
+            return [b for b in BOOKINGS if b["property_id"] == args[0]]
+        if sql == ALL_GUESTS_SQL:
+            return list(GUESTS)
+        if sql == COUNTS_SQL:
+            return [(len(GUESTS), len(BOOKINGS))]
+        raise AssertionError(f"unexpected statement: {sql}")
+
+    async def close(self):
+        pass
+
+
+async def loop_stall(coro) -> tuple:
+    """Await coro while ticking the event loop; returns its result and the longest gap between ticks."""
+    gaps, done = [], False
+
+    async def tick():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(tick())
+    try:
+        result = await coro
+    finally:
+        done = True
+        await ticker
+    return result, max(gaps, default=0.0)
+
+
+async def async_checks(service: PostgresGuestService, pool: StubPool, checks: dict):
+    pool.delay = QUERY_TIMEOUT
+    await service.prefetch_counts()
+    calls = len(pool.calls)
+    counts = (service.guest_count, service.booking_count)
+    checks["counts prefetched, then read from the cache"] = counts == (2, 1) and len(pool.calls) == calls
+
+    guests, stall = await loop_stall(service.aall_guests())
+    checks["guest list fetched without blocking the loop"] = (
+        [g["guest_id"] for g in guests] == ["g1", "g2"] and stall < QUERY_TIMEOUT / 2
+    )
+
+    await asyncio.sleep(service.cache_ttl_seconds)
+    pool.delay = QUERY_TIMEOUT * 3
+    start = time.perf_counter()
+    try:
+        await service.aall_guests()
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    waited = time.perf_counter() - start
+    await service.prefetch_counts()
+    checks["async query times out"] = timed_out and waited < QUERY_TIMEOUT * 2.5
+    checks["counts kept when a recount times out"] = (service.guest_count, service.booking_count) == counts
+
+
+def main():
+    print("🐘 PostgreSQL Guest Service Check (stubbed pool)")
+    print("=" * 50)
+    service = PostgresGuestService("postgresql://stub", cache_ttl_seconds=0.2, query_timeout=QUERY_TIMEOUT)
+    pool = StubPool()
+    service._pool = pool
+    checks = {}
+    try:
+        guest, booking = service.get_guest_and_booking("(415) 555-0123")
+        checks["lookup by any formatting"] = guest["guest_id"] == "g1" and booking["property_name"] == "Villa Azul"
+        checks["queried with the normalized phone"] = pool.calls[-1] == (GUEST_BY_PHONE_SQL, ("+14155550123",))
+        checks["aware booking times as local time"] = datetime.fromisoformat(booking["check_in"]).tzinfo is None
+
+        calls = len(pool.calls)
+        service.get_guest("+14155550123")
+        service.get_bookings("g1")
+        service.get_version("001 415 555 0123")
+        checks["repeat lookups served from cache"] = len(pool.calls) == calls
+
+        service.get_guest("+15550000000")
+        service.get_guest("+15550000000")
+        checks["unknown phone cached"] = service.get_guest("+15550000000") is None and len(pool.calls) == calls + 1
+        checks["property bookings"] = [b["guest_id"] for b in service.get_property_bookings("p1")] == ["g1"]
+
+        asyncio.run(async_checks(service, pool, checks))
+
+        # The database stops answering in time once the cached records have expired
+        time.sleep(service.cache_ttl_seconds)
+        start = time.perf_counter()
+        stale = service.get_guest("+14155550123")
+        waited = time.perf_counter() - start
+        checks["expired records served on timeout"] = (stale is not None and stale["name"] == "Carlos Marin"
+                                                       and waited < QUERY_TIMEOUT * 2.5)
+        try:
+            service.get_guest("+14155559876")
+            checks["uncached lookup raises on timeout"] = False
+        except TimeoutError:
+            checks["uncached lookup raises on timeout"] = True
+    finally:
+        # Let the timed-out stub queries finish before the pool's loop stops
+        time.sleep(pool.delay)
+        service.close()
+
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Provider-side prompt caching check.
+Sends messages for several guests through the API to a local stand-in for the
+Anthropic API that records cache_control markers. Verifies that the static
+instruction prefix is marked and identical across guests, and that the cached
+versus uncached input tokens are reported per request.
+
+Run from the repository root:
+    python tests/performance/prompt_caching_test.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import httpx
+
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONES = ["+14155550123", "+14155559876", "+14155551001"]
+
+
+async def send_messages(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        responses = []
+        for phone in PHONES:
+            response = await client.post("/message", json={"message": "Hello!", "phone_number": phone})
+            response.raise_for_status()
+            responses.append(response.json())
+        return responses
+
+
+def main():
+    server = FakeAnthropicServer().start()
+    os.environ["ANTHROPIC_API_URL"] = server.url
+    os.environ["PROMPT_CACHING_ENABLED"] = "true"
+
+    from src.api import main as api
+
+    print("🗄️  Prompt Caching Check")
+    print("=" * 50)
+    try:
+        responses = asyncio.run(send_messages(api.app))
+    finally:
+        server.stop()
+
+    failures = 0
+    static_blocks = []
+    for body in server.requests:
+        system = body.get("system") or []
+        marked = [block for block in system if isinstance(block, dict) and "cache_control" in block]
+        if len(marked) != 1 or system.index(marked[0]) != 0:
+            failures += 1
+            print("❌ FAIL - expected exactly one cache marker, on the first system block")
+        static_blocks.append(marked[0]["text"] if marked else None)
+    print(f"Requests recorded: {len(server.requests)}")
+    if len(set(static_blocks)) != 1:
+        failures += 1
+        print("❌ FAIL - static prefix differs between guests")
+    else:
+        print(f"Static prefix identical across {len(PHONES)} guests ({len(static_blocks[0])} chars)")
+
+    for phone, data in zip(PHONES, responses):
+        usage = data["debug_info"]["token_usage"]
+        print(f"{phone}: cached={usage['cached_input_tokens']} "
+              f"cache_write={usage['cache_creation_input_tokens']} uncached={usage['uncached_input_tokens']}")
+    if responses[0]["debug_info"]["token_usage"]["cache_creation_input_tokens"] == 0:
+        failures += 1
+        print("❌ FAIL - first request should write the cache")
+    if any(r["debug_info"]["token_usage"]["cached_input_tokens"] == 0 for r in responses[1:]):
+        failures += 1
+        print("❌ FAIL - later guests should read the shared prefix from cache")
+
+    if failures:
+        return 1
+    print("✅ PASS - static instructions and tools are served from the prompt cache")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
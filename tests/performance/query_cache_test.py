@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Check for the per-property query-result cache in VectorStoreService.
+Replays a stream of repeated guest questions against a temporary Chroma store
+and reports exact and near-duplicate hit ratios, the number of Chroma searches
+avoided, and that re-indexing a property invalidates only that property.
+
+Run from the repository root:
+    python tests/performance/query_cache_test.py --queries 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from src.api.main import VectorStoreService
+from tests.performance.fakes import HashEmbeddings
+
+QUESTIONS = [
+    "What is the WiFi password?", "what is the wifi password", "WiFi password?",
+    "When does the pool open and close each day", "When does the pool open and close each day please",
+    "What time is checkout?", "What time is check-out", "Is breakfast included with the stay?",
+    "Where can I park the car?", "Are pets allowed at the villa?",
+]
+
+
+def index_property(persist_dir: str, property_id: str, label: str = ""):
+    """Replace a property's collection and version marker as scripts/index_property.py does."""
+    client = chromadb.PersistentClient(path=persist_dir)
+    name = f"{VectorStoreService.PROPERTY_COLLECTION_PREFIX}{property_id}"
+    if name in {getattr(c, "name", c) for c in client.list_collections()}:
+        client.delete_collection(name)
+    store = Chroma(client=client, embedding_function=HashEmbeddings(), collection_name=name)
+    store.add_documents([
+        Document(page_content=f"{property_id}{label}: {question}", metadata={"property_id": property_id})
+        for question in QUESTIONS
+    ])
+    versions_dir = os.path.join(persist_dir, VectorStoreService.PROPERTY_VERSIONS_DIR)
+    os.makedirs(versions_dir, exist_ok=True)
+    marker = os.path.join(versions_dir, property_id)
+    with open(f"{marker}.tmp", "w") as f:
+        f.write(str(store._collection.id))
+    os.replace(f"{marker}.tmp", marker)
+
+
+def build_service(persist_dir: str, properties: list, threshold: float) -> VectorStoreService:
+    embeddings = HashEmbeddings()
+    client = chromadb.PersistentClient(path=persist_dir)
+    for property_id in properties:
+        store = Chroma(client=client, embedding_function=embeddings,
+                       collection_name=f"{VectorStoreService.PROPERTY_COLLECTION_PREFIX}{property_id}")
+        store.add_documents([
+            Document(page_content=f"{property_id}: {question}", metadata={"property_id": property_id})
+            for question in QUESTIONS
+        ])
+
+    service = VectorStoreService(persist_directory=persist_dir)
+    service.query_cache.similarity_threshold = threshold
+    service._embeddings = embeddings
+    service._vectorstore = Chroma(client=client, embedding_function=embeddings)
+    service._property_collections = service._list_property_collections(service._vectorstore)
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Property query cache check")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--properties", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.9,
+                        help="Near-duplicate threshold (bag-of-words test embeddings score lower than MiniLM)")
+    args = parser.parse_args()
+
+    properties = [f"p{n}" for n in range(args.properties)]
+    rng = random.Random(7)
+    ok = True
+
+    print("🔎 Property Query Cache Check")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as persist_dir:
+        service = build_service(persist_dir, properties, args.threshold)
+
+        start = time.perf_counter()
+        for _ in range(args.queries):
+            service.get_property_info(rng.choice(properties), rng.choice(QUESTIONS))
+        elapsed = time.perf_counter() - start
+
+        stats = service.query_cache.stats()
+        print(f"Queries:            {args.queries}")
+        print(f"Chroma searches:    {stats['misses']}")
+        print(f"Exact hits:         {stats['exact_hits']}")
+        print(f"Near-duplicates:    {stats['semantic_hits']}")
+        print(f"Hit ratio:          {stats['hit_ratio']:.1%}")
+        print(f"Mean latency:       {elapsed / args.queries * 1e3:.3f}ms")
+        ok &= stats["misses"] < len(QUESTIONS) * len(properties)
+        ok &= stats["semantic_hits"] > 0
+
+        print("\n🔄 Re-index p0")
+        print("=" * 50)
+        before = service.query_cache.stats()["entries"]
+        removed = service.invalidate_property("p0")
+        misses = service.query_cache.stats()["misses"]
+        service.get_property_info("p0", QUESTIONS[0])
+        service.get_property_info("p1", QUESTIONS[0])
+        searched = service.query_cache.stats()["misses"] - misses
+        print(f"Entries removed:    {removed} of {before}")
+        print(f"Chroma searches:    {searched} (p0 only)")
+        ok &= removed > 0 and searched == 1
+
+        print("\n🔁 Re-index seen by another worker")
+        print("=" * 50)
+        # A second service stands in for a worker that never receives the POST
+        other = build_service(persist_dir, [], args.threshold)
+        before = other.get_property_info("p1", QUESTIONS[0])
+        index_property(persist_dir, "p1", label=" v2")
+        index_property(persist_dir, "p_new")
+        after = other.get_property_info("p1", QUESTIONS[0])
+        added = other.get_property_info("p_new", QUESTIONS[0])
+        print(f"p1 before:          {before.splitlines()[0]}")
+        print(f"p1 after:           {after.splitlines()[0]}")
+        print(f"New property:       {added.splitlines()[0]}")
+        ok &= before.startswith("p1:") and after.startswith("p1 v2:") and added.startswith("p_new:")
+        ok &= other._property_store("p_new") is not None
+
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Response cache check.
+Sends /message turns against a local stand-in for the Anthropic API that
+answers after a fixed delay, with the vector store backed by a temporary
+Chroma collection. Verifies that greetings and property FAQs are answered
+from the cache for every guest sharing the property, language and VIP status
+(with their own name), and that turns calling booking tools, messages with
+digits, replies quoting personal details, follow-ups in a different context,
+expired entries and re-indexed properties all reach the agent, including a
+re-index this worker was never notified of.
+
+Run from the repository root:
+    python tests/performance/response_cache_test.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+os.environ["RESPONSE_CACHE_ENABLED"] = "true"
+os.environ["GUEST_DATA_WATCH_INTERVAL_SECONDS"] = "0"
+
+import httpx
+
+from tests.performance.fakes import FakeAnthropicServer
+from tests.performance.latency_breakdown_test import PROPERTY_ID, attach_vector_store
+
+LLM_DELAY = 0.1
+CARLOS = "+14155550123"      # English, VIP, staying at p1
+MICHAEL = "+14155551025"     # English, VIP, staying at p1 (booking added below)
+MARIA = "+14155559876"       # Spanish, staying at p1
+
+
+def write_guest_data(data_dir: str):
+    """Demo guests plus a p1 booking for a second English-speaking VIP guest."""
+    with open("data/demo/guests.json", encoding="utf-8") as f:
+        guests = json.load(f)
+    with open("data/demo/bookings.json", encoding="utf-8") as f:
+        bookings = json.load(f)
+    bookings.append({"guest_id": "g27", "property_id": PROPERTY_ID, "property_name": "Villa Azul",
+                     "check_in": "2025-07-01T15:00:00", "check_out": "2025-07-05T11:00:00",
+                     "special_requests": ""})
+    for name, records in (("guests.json", guests), ("bookings.json", bookings)):
+        with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+            json.dump(records, f)
+
+
+def replace_version_marker(api, persist_dir: str, property_id: str):
+    """Replace a property's index version marker as scripts/index_property.py does after re-indexing."""
+    versions_dir = os.path.join(persist_dir, api.VectorStoreService.PROPERTY_VERSIONS_DIR)
+    os.makedirs(versions_dir, exist_ok=True)
+    marker = os.path.join(versions_dir, property_id)
+    with open(f"{marker}.tmp", "w") as f:
+        f.write(str(time.time_ns()))
+    os.replace(f"{marker}.tmp", marker)
+
+
+class Turns:
+    """Sends /message turns, counting the LLM requests and time each one takes."""
+
+    def __init__(self, client: httpx.AsyncClient, llm: FakeAnthropicServer):
+        self.client = client
+        self.llm = llm
+
+    async def send(self, phone: str, message: str, fresh: bool = True) -> dict:
+        if fresh:
+            await self.client.delete(f"/session/{phone}")
+        before = len(self.llm.requests)
+        start = time.perf_counter()
+        response = await self.client.post("/message", json={"message": message, "phone_number": phone})
+        response.raise_for_status()
+        body = response.json()
+        body["llm_calls"] = len(self.llm.requests) - before
+        body["ms"] = (time.perf_counter() - start) * 1000
+        return body
+
+
+async def run(api, llm: FakeAnthropicServer, persist_dir: str) -> dict:
+    results = {}
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        turns = Turns(client, llm)
+
+        llm.reply = "Welcome to Villa Azul, Carlos Marin! How may I help you today?"
+        results["greeting_miss"] = await turns.send(CARLOS, "Hello!")
+        results["greeting_hit"] = await turns.send(CARLOS, "hello")
+        results["greeting_other_guest"] = await turns.send(MICHAEL, "Hello!!")
+        results["greeting_other_language"] = await turns.send(MARIA, "Hello!")
+        results["greeting_follow_up"] = await turns.send(CARLOS, "Hello!", fresh=False)
+
+        llm.tool_call = {"name": "property_info", "input": {"query": "wifi password"}}
+        llm.reply = "The WiFi password is omotenashi2024."
+        results["faq_miss"] = await turns.send(CARLOS, "What is the WiFi password?")
+        results["faq_hit"] = await turns.send(MICHAEL, "What is the WiFi password?")
+
+        llm.tool_call = {"name": "schedule_cleaning", "input": {"cleaning_time": "tomorrow afternoon"}}
+        llm.reply = "Housekeeping is booked for tomorrow afternoon."
+        results["booking_first"] = await turns.send(CARLOS, "Please clean my room tomorrow afternoon")
+        results["booking_again"] = await turns.send(CARLOS, "Please clean my room tomorrow afternoon")
+
+        llm.tool_call = None
+        lookups = api.response_cache.hits + api.response_cache.misses
+        results["digits"] = await turns.send(CARLOS, "Can you clean my room at 2 PM?")
+        results["digits_lookups"] = api.response_cache.hits + api.response_cache.misses - lookups
+
+        llm.reply = "You check out on June 17, Carlos."
+        results["personal_first"] = await turns.send(CARLOS, "When do I leave?")
+        results["personal_again"] = await turns.send(CARLOS, "When do I leave?")
+
+        api.response_cache.ttl_seconds = 0.2
+        llm.reply = "Good evening! Anything I can arrange?"
+        await turns.send(CARLOS, "Good evening")
+        await asyncio.sleep(0.3)
+        results["expired"] = await turns.send(CARLOS, "Good evening")
+
+        api.response_cache.ttl_seconds = 60
+        reindexed = (await client.post(f"/admin/properties/{PROPERTY_ID}/reindexed")).json()
+        results["reindexed_removed"] = reindexed["entries_removed"]
+        llm.tool_call = {"name": "property_info", "input": {"query": "wifi password"}}
+        llm.reply = "The WiFi password is omotenashi2024."
+        results["after_reindex"] = await turns.send(CARLOS, "What is the WiFi password?")
+        # Re-indexed as seen by a worker that does not receive the POST: only the version marker changes
+        results["before_marker"] = await turns.send(CARLOS, "What is the WiFi password?")
+        replace_version_marker(api, persist_dir, PROPERTY_ID)
+        results["after_marker"] = await turns.send(CARLOS, "What is the WiFi password?")
+        results["stats"] = (await client.get("/debug/status")).json()["response_cache"]
+    return results
+
+
+def main():
+    llm = FakeAnthropicServer(delay=LLM_DELAY).start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as persist_dir:
+        write_guest_data(data_dir)
+        os.environ["GUESTS_FILE"] = os.path.join(data_dir, "guests.json")
+        os.environ["BOOKINGS_FILE"] = os.path.join(data_dir, "bookings.json")
+        from src.api import main as api
+
+        attach_vector_store(api, persist_dir)
+        try:
+            r = asyncio.run(run(api, llm, persist_dir))
+        finally:
+            llm.stop()
+
+    print("🗄️  Response Cache Check")
+    print("=" * 50)
+    for name in ("greeting_miss", "greeting_hit", "faq_miss", "faq_hit"):
+        print(f"{name:<22} {r[name]['llm_calls']} LLM calls  {r[name]['ms']:>7.1f}ms  {r[name]['response']!r}")
+    print(f"Other guest greeted as: {r['greeting_other_guest']['response']!r}")
+    print(f"Cache stats: {r['stats']}")
+
+    checks = {
+        "greeting answered from the cache": (r["greeting_miss"]["llm_calls"] == 1
+                                             and r["greeting_hit"]["llm_calls"] == 0),
+        "shared with same-profile guests by name": (
+            r["greeting_other_guest"]["llm_calls"] == 0
+            and r["greeting_other_guest"]["response"].startswith("Welcome to Villa Azul, Michael Smith!")
+        ),
+        "other language reaches the agent": r["greeting_other_language"]["llm_calls"] == 1,
+        "follow-up in another context reaches the agent": r["greeting_follow_up"]["llm_calls"] == 1,
+        "property FAQ cached with its tool": (r["faq_miss"]["llm_calls"] == 2 and r["faq_hit"]["llm_calls"] == 0
+                                              and r["faq_hit"]["tools_used"] == ["property_info"]),
+        "booking tool turns never cached": (r["booking_first"]["llm_calls"] == 2
+                                            and r["booking_again"]["llm_calls"] == 2),
+        "messages with digits bypass the cache": r["digits"]["llm_calls"] == 1 and r["digits_lookups"] == 0,
+        "replies with personal details not cached": r["personal_again"]["llm_calls"] == 1,
+        "entries expire after the TTL": r["expired"]["llm_calls"] == 1,
+        "re-indexing the property drops its replies": (r["reindexed_removed"] > 0
+                                                       and r["after_reindex"]["llm_calls"] == 2),
+        "re-index marker drops replies without the POST": (r["before_marker"]["llm_calls"] == 0
+                                                           and r["after_marker"]["llm_calls"] == 2),
+        "hits skip the LLM delay": r["greeting_hit"]["ms"] < LLM_DELAY * 1000,
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
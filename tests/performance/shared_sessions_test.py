@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared session store check for the Redis session backend.
+Alternates one guest's messages between two simulated workers (separate
+MemoryService instances) sharing a Redis stand-in, against a local stand-in
+for the Anthropic API. Verifies each worker sends the full conversation, that
+session keys carry a native TTL, that a delete on one worker is seen by the
+other, and compares the stored payload size with LangChain's message dicts.
+Also runs one guest's turns on both workers at once, checking that the
+backend lock keeps both exchanges (without it the later save drops the
+other), and that a stream whose client disconnects still finishes and
+persists its turn.
+
+Requires fakeredis (pip install fakeredis). Run from the repository root:
+    python tests/performance/shared_sessions_test.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from contextlib import aclosing, nullcontext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+import fakeredis
+import httpx
+from langchain_core.messages import messages_to_dict
+
+from src.agents.sessions import RedisSessionBackend
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONE = "+14155550123"
+
+
+async def concurrent_turns(workers: list, locked: bool) -> int:
+    """Run one turn for the guest on each worker at once; returns how many exchanges were stored."""
+    async def turn(worker, n: int):
+        async with worker.backend.lock(PHONE) if locked else nullcontext():
+            memory = await worker.sync(PHONE)
+            await asyncio.sleep(0.05)  # the agent's LLM call
+            memory.save_context({"input": f"concurrent turn {n}"}, {"output": "Noted."})
+            await worker.persist(PHONE)
+
+    for worker in workers:
+        await worker.delete_session(PHONE)
+    await asyncio.gather(*(turn(worker, n) for n, worker in enumerate(workers)))
+    state = await workers[0].backend.load(PHONE)
+    return json.dumps(state).count("concurrent turn")
+
+
+async def run(api, server) -> bool:
+    redis_server = fakeredis.FakeServer()
+    ttl = int(api.MEMORY_EXPIRY_HOURS * 3600)
+    workers = [
+        api.MemoryService(RedisSessionBackend(None, ttl, client=fakeredis.FakeAsyncRedis(server=redis_server)))
+        for _ in range(2)
+    ]
+    inspector = fakeredis.FakeAsyncRedis(server=redis_server)
+    ok = True
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        async def send(worker: int, message: str):
+            api.memory_service = workers[worker]
+            response = await client.post("/message", json={"message": message, "phone_number": PHONE})
+            response.raise_for_status()
+            return json.dumps(server.requests[-1]["messages"])
+
+        for turn in range(4):
+            worker = turn % 2
+            sent = await send(worker, f"Turn {turn}: remember the code word lantern-{turn}")
+            seen = all(f"lantern-{earlier}" in sent for earlier in range(turn))
+            print(f"Turn {turn} on worker {'AB'[worker]}: earlier turns sent to model = {seen}")
+            ok &= seen
+
+        key = f"{workers[0].backend.prefix}{PHONE}"
+        key_ttl = await inspector.ttl(key)
+        payload = await inspector.get(key)
+        langchain_json = json.dumps(messages_to_dict(workers[1].memory_store[PHONE].chat_memory.messages))
+        print(f"\nKey TTL:            {key_ttl}s (expected {ttl}s)")
+        print(f"Stored payload:     {len(payload)} bytes (LangChain message dicts: {len(langchain_json)} bytes)")
+        ok &= 0 < key_ttl <= ttl and len(payload) < len(langchain_json)
+
+        api.memory_service = workers[1]
+        session = (await client.get(f"/session/{PHONE}")).json()
+        print(f"Session on B:       {len(session['messages'])} messages")
+        ok &= len(session["messages"]) == 8
+
+        stored = {locked: await concurrent_turns(workers, locked) for locked in (False, True)}
+        print(f"Concurrent turns:   {stored[True]}/2 kept with the lock, {stored[False]}/2 without")
+        ok &= stored[True] == 2 and stored[False] == 1
+
+        # A client that disconnects after the first token of the reply
+        api.memory_service = workers[0]
+        await workers[0].delete_session(PHONE)
+        agent = api.get_agent(PHONE)
+        async with aclosing(api.stream_agent(agent, PHONE, "Remember the code word harbor")) as events:
+            async for event in events:
+                if event["event"] == "on_chat_model_stream":
+                    break
+        await asyncio.wait(api.streamed_turns, timeout=5)
+        persisted = "harbor" in json.dumps(await workers[1].backend.load(PHONE))
+        lock_free = not await inspector.exists(f"{workers[0].backend.prefix}lock:{PHONE}")
+        print(f"Closed stream:      turn persisted = {persisted}, session lock released = {lock_free}")
+        ok &= persisted and lock_free
+
+        api.memory_service = workers[0]
+        await client.delete(f"/session/{PHONE}")
+        api.memory_service = workers[1]
+        after_delete = await client.get(f"/session/{PHONE}")
+        status = (await client.get("/debug/status")).json()["memory"]
+        print(f"After delete on A:  B returns {after_delete.status_code}, stored sessions {status['stored_sessions']}")
+        ok &= after_delete.status_code == 404 and status["stored_sessions"] == 0
+    return ok
+
+
+def main():
+    server = FakeAnthropicServer().start()
+    os.environ["ANTHROPIC_API_URL"] = server.url
+    from src.api import main as api
+
+    print("🔁 Shared Session Store Check")
+    print("=" * 50)
+    try:
+        ok = asyncio.run(run(api, server))
+    finally:
+        server.stop()
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
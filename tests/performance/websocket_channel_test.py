@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+WebSocket conversation channel check.
+Serves the API with uvicorn against a local stand-in for the Anthropic API and
+holds several turns on one /ws/{phone} connection. Verifies replies are pushed
+as streamed tokens, that the guest's agent is resolved once per connection and
+the conversation memory carries across turns, and compares per-turn latency
+with one HTTP /message request per turn. Then drives a ConversationChannel
+against a socket that stops accepting frames, checking the send queue stays
+bounded while the producer waits, frames arrive in order once the socket
+resumes, and a socket that never resumes is closed after the send timeout.
+
+Run from the repository root:
+    python tests/performance/websocket_channel_test.py --turns 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("VECTOR_STORE_WARMUP", "false")
+os.environ.setdefault("WS_SEND_QUEUE_SIZE", "16")
+
+import httpx
+import websockets
+
+from tests.performance.benchmark_streaming_ttfb import start_api
+from tests.performance.fakes import FakeAnthropicServer
+
+PHONE = "+14155550123"
+
+
+class StalledSocket:
+    """WebSocket stand-in whose sends block until resume() is called."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self._resumed = asyncio.Event()
+
+    def resume(self):
+        self._resumed.set()
+
+    async def send_text(self, payload: str):
+        await self._resumed.wait()
+        self.sent.append(json.loads(payload))
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def ws_turn(ws, message: str) -> tuple:
+    """Send one message and collect (tokens, final event)."""
+    await ws.send(json.dumps({"message": message}))
+    return await read_reply(ws)
+
+
+async def read_reply(ws) -> tuple:
+    tokens = []
+    while True:
+        frame = json.loads(await ws.recv())
+        if frame["event"] == "token":
+            tokens.append(frame["text"])
+        elif frame["event"] in ("done", "error"):
+            return tokens, frame
+
+
+async def conversation(url: str, turns: int, agent_builds: dict) -> dict:
+    ws_url = url.replace("http://", "ws://")
+    ws_times, http_times = [], []
+    async with websockets.connect(f"{ws_url}/ws/{PHONE}") as ws:
+        finals = []
+        for i in range(turns):
+            start = time.perf_counter()
+            tokens, final = await ws_turn(ws, f"Turn {i}")
+            ws_times.append(time.perf_counter() - start)
+            finals.append((tokens, final))
+    ws_builds = agent_builds["count"]
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        session = (await client.get(f"/session/{PHONE}")).json()
+        for i in range(turns):
+            start = time.perf_counter()
+            response = await client.post("/message", json={"message": f"Turn {i}", "phone_number": "+14155559876"})
+            response.raise_for_status()
+            http_times.append(time.perf_counter() - start)
+    return {"finals": finals, "session": session, "ws": ws_times, "http": http_times, "ws_builds": ws_builds}
+
+
+async def stalled_client(api, frames: int) -> dict:
+    socket = StalledSocket()
+    channel = api.ConversationChannel(socket, PHONE)
+    sender = asyncio.create_task(channel.send_loop())
+
+    async def produce():
+        for i in range(frames):
+            await channel.push("token", {"text": str(i)})
+
+    producer = asyncio.create_task(produce())
+    await asyncio.sleep(0.2)
+    stalled = {"queued": channel.outbox.qsize(), "producer_waiting": not producer.done()}
+    socket.resume()
+    await producer
+    while channel.outbox.qsize():
+        await asyncio.sleep(0.01)
+    sender.cancel()
+    in_order = [frame["text"] for frame in socket.sent] == [str(i) for i in range(frames)]
+
+    # A socket that never resumes is dropped after the send timeout
+    api.WS_SEND_TIMEOUT_SECONDS, timeout = 0.2, api.WS_SEND_TIMEOUT_SECONDS
+    try:
+        stuck = StalledSocket()
+        channel = api.ConversationChannel(stuck, PHONE)
+        await channel.push("token", {"text": "hello"})
+        await asyncio.wait_for(channel.send_loop(), 5)
+    finally:
+        api.WS_SEND_TIMEOUT_SECONDS = timeout
+    return {**stalled, "in_order": in_order, "closed_with": stuck.closed_with}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket channel check")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=200, help="Frames pushed to the stalled client")
+    args = parser.parse_args()
+
+    llm = FakeAnthropicServer().start()
+    os.environ["ANTHROPIC_API_URL"] = llm.url
+    from src.api import main as api
+
+    agent_builds = {"count": 0}
+    original_get_agent = api.get_agent
+
+    def counting_get_agent(*a, **kw):
+        agent_builds["count"] += 1
+        return original_get_agent(*a, **kw)
+
+    api.get_agent = counting_get_agent
+    server, thread, url = start_api(api.app)
+    try:
+        result = asyncio.run(conversation(url, args.turns, agent_builds))
+        ws_builds = result["ws_builds"]
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        llm.stop()
+
+    print("🔌 WebSocket Conversation Channel Check")
+    print("=" * 50)
+    print(f"Per-turn latency (median of {args.turns}): WebSocket {statistics.median(result['ws']) * 1000:.1f}ms, "
+          f"HTTP /message {statistics.median(result['http']) * 1000:.1f}ms")
+    print(f"Agent resolutions on the WebSocket: {ws_builds} for {args.turns} turns")
+    stalled = asyncio.run(stalled_client(api, args.frames))
+    print(f"Stalled client: {stalled['queued']} frames queued (limit {api.WS_SEND_QUEUE_SIZE}) "
+          f"while {args.frames} were produced; closed with code {stalled['closed_with']} after the send timeout")
+
+    checks = {
+        "replies pushed as tokens": all(
+            "".join(tokens) == final.get("response") and final["event"] == "done"
+            for tokens, final in result["finals"]
+        ),
+        "agent resolved once per connection": ws_builds == 1,
+        "memory carried across turns": len(result["session"]["messages"]) >= 2 * min(args.turns, 6),
+        "send queue bounded, producer waits": stalled["queued"] == api.WS_SEND_QUEUE_SIZE and stalled["producer_waiting"],
+        "frames delivered in order after resuming": stalled["in_order"],
+        "stuck client disconnected": stalled["closed_with"] == 1013,
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    ok = all(checks.values())
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())